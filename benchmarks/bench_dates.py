@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: EXIF date parsing
+Compares the original strptime loop with metafinder.dates
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from metafinder import dates
+
+
+def legacy_parse_exif_date(date_str):
+    """The pre-dates.py parser, kept verbatim for comparison"""
+    if not date_str:
+        return None
+
+    formats = [
+        '%Y:%m:%d %H:%M:%S',
+        '%Y-%m-%d %H:%M:%S',
+        '%Y:%m:%d %H:%M:%S%z',
+        '%Y-%m-%dT%H:%M:%S',
+        '%Y-%m-%dT%H:%M:%SZ',
+    ]
+
+    for fmt in formats:
+        try:
+            dt = datetime.strptime(date_str[:19], fmt[:19])
+            return dt.timestamp()
+        except (ValueError, TypeError):
+            continue
+
+    return None
+
+
+def make_corpus(count: int, distinct: int, seed: int = 42):
+    """
+    Build a list of date strings shaped like ExifTool output
+
+    Photo libraries repeat timestamps heavily (bursts, sidecars, the same
+    CreateDate in several tags), so `distinct` controls the cache hit rate.
+    """
+    rng = random.Random(seed)
+    shapes = [
+        '{y}:{mo:02d}:{d:02d} {h:02d}:{mi:02d}:{s:02d}',
+        '{y}:{mo:02d}:{d:02d} {h:02d}:{mi:02d}:{s:02d}+02:00',
+        '{y}:{mo:02d}:{d:02d} {h:02d}:{mi:02d}:{s:02d}.{ms:03d}',
+        '{y}-{mo:02d}-{d:02d}T{h:02d}:{mi:02d}:{s:02d}Z',
+        '{y}-{mo:02d}-{d:02d}T{h:02d}:{mi:02d}:{s:02d}',
+    ]
+
+    pool = []
+    for _ in range(distinct):
+        shape = rng.choice(shapes)
+        pool.append(shape.format(
+            y=rng.randint(2000, 2025), mo=rng.randint(1, 12), d=rng.randint(1, 28),
+            h=rng.randint(0, 23), mi=rng.randint(0, 59), s=rng.randint(0, 59),
+            ms=rng.randint(0, 999)
+        ))
+
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def bench(func, corpus):
+    """Time one pass over the corpus"""
+    start = time.perf_counter()
+    for value in corpus:
+        func(value)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark EXIF date parsing')
+    parser.add_argument('--count', type=int, default=200000, help='Dates to parse')
+    parser.add_argument('--distinct', type=int, default=20000, help='Distinct date strings')
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.count, args.distinct)
+
+    def uncached(value):
+        dt = dates.parse_exif_datetime.__wrapped__(value)
+        return dt.timestamp() if dt else None
+
+    results = [
+        ('legacy strptime loop', bench(legacy_parse_exif_date, corpus)),
+        ('regex, uncached', bench(uncached, corpus)),
+        ('regex + memoization', bench(dates.parse_exif_date, corpus)),
+    ]
+
+    baseline = results[0][1]
+    print(f"Parsing {args.count} dates ({args.distinct} distinct)")
+    for name, seconds in results:
+        rate = args.count / seconds if seconds > 0 else 0
+        print(f"  {name:<22} {seconds:8.3f}s  {rate:12,.0f}/s  {baseline / seconds:6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: dict records vs FileRecord
+Measures the per-record container overhead of large result lists
+"""
+
+import sys
+import gc
+import argparse
+import tracemalloc
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from metafinder.records import FileRecord
+
+
+def make_values(i: int) -> dict:
+    """One row's worth of values, shaped like a search_files row"""
+    return {
+        'id': i,
+        'path': f'/photos/2024/{i:07d}.jpg',
+        'name': f'{i:07d}.jpg',
+        'extension': '.jpg',
+        'size': 3_000_000 + i,
+        'created': 1700000000.0 + i,
+        'modified': 1700000000.0 + i,
+        'accessed': 1700000000.0 + i,
+        'file_type': 'image',
+        'author': 'Jane Doe',
+        'title': None,
+        'date_taken': 1700000000.0 + i,
+        'camera_make': 'Canon',
+        'camera_model': 'EOS R5',
+        'metadata': None,
+        'searchable_text': '',
+        'scan_date': 1700000000.0,
+        'file_hash': None,
+    }
+
+
+def measure(count: int, factory) -> int:
+    """
+    Bytes allocated to hold `count` records built by factory
+
+    Field values are built up front and shared between both variants, so
+    the difference is purely the record container.
+    """
+    values = [make_values(i) for i in range(count)]
+    gc.collect()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [factory(v) for v in values]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del records
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark record memory usage')
+    parser.add_argument('--count', type=int, default=1_000_000, help='Records to build')
+    args = parser.parse_args()
+
+    dict_bytes = measure(args.count, dict)
+    record_bytes = measure(args.count, lambda v: FileRecord(**v))
+
+    print(f"Holding {args.count:,} records")
+    print(f"  dict        {dict_bytes / 1024 ** 2:9.1f} MiB  {dict_bytes / args.count:7.1f} B/record")
+    print(f"  FileRecord  {record_bytes / 1024 ** 2:9.1f} MiB  {record_bytes / args.count:7.1f} B/record")
+    print(f"  saving      {(dict_bytes - record_bytes) / 1024 ** 2:9.1f} MiB  "
+          f"({dict_bytes / record_bytes:.1f}x smaller)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Scan and query benchmark suite
+Measures ingest throughput on a synthetic tree and query latency at growing index sizes
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Callable, Iterator, Tuple
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from metafinder.database import DatabaseManager
+from metafinder.normalizer import MetadataNormalizer
+from metafinder.pipeline import ScanPipeline
+from metafinder.scanner import MetadataScanner
+from corpus import DEFAULT_MIX, parse_mix, generate_tree, synthetic_paths, canned_metadata
+from stub_exiftool import StubExifTool
+
+
+# Queries timed at every index size: name -> function(db)
+QUERIES: Dict[str, Callable[[DatabaseManager], Any]] = {
+    'first_page': lambda db: db.search_files(limit=100),
+    'deep_page': lambda db: db.search_files(limit=100, offset=5000),
+    'file_type': lambda db: db.search_files(file_type='image', limit=100),
+    'extension': lambda db: db.search_files(extension='.pdf', limit=100),
+    'camera_make': lambda db: db.search_files(camera_make='Canon', limit=100),
+    'author': lambda db: db.search_files(author='Hopper', limit=100),
+    'date_range': lambda db: db.search_files(start_date=1420070400.0, end_date=1451606400.0, limit=100),
+    'size_range': lambda db: db.search_files(min_size=1_000_000, max_size=2_000_000, limit=100),
+    'text_query': lambda db: db.search_files(text_query='garden report', limit=100),
+    'count_images': lambda db: db.count_files(file_type='image'),
+    'get_statistics': lambda db: db.get_statistics(),
+}
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds (nearest-rank percentiles)"""
+    ordered = sorted(samples)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    return {
+        'runs': len(ordered),
+        'p50_ms': rank(50),
+        'p90_ms': rank(90),
+        'p99_ms': rank(99),
+        'max_ms': ordered[-1] * 1000,
+        'mean_ms': sum(ordered) / len(ordered) * 1000,
+    }
+
+
+def throughput(items: int, seconds: float, **extra) -> Dict[str, Any]:
+    """Items, seconds and items per second of one timed stage"""
+    result = {'items': items, 'seconds': seconds, 'per_second': items / seconds if seconds > 0 else 0.0}
+    result.update(extra)
+    return result
+
+
+def batches(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def bench_ingest(work_dir: Path, files: int, mix: Dict[str, float], seed: int,
+                 batch_size: int, delay: float) -> Dict[str, Any]:
+    """
+    Time each scan stage on a synthetic tree, then the whole pipeline
+
+    Args:
+        work_dir: Scratch directory for the tree and databases
+        files: Number of files in the tree
+        mix: Extension -> weight
+        seed: Corpus seed
+        batch_size: Files per extraction/insert batch
+        delay: Stub ExifTool seconds per file
+
+    Returns:
+        Dictionary of per-stage throughput results
+    """
+    results = {}
+
+    start = time.perf_counter()
+    generate_tree(str(work_dir / 'tree'), files, mix, seed)
+    results['corpus'] = throughput(files, time.perf_counter() - start)
+    print(f"  corpus        {files:,} files written in {results['corpus']['seconds']:.2f}s")
+
+    # Discovery only needs the classifier; skip __init__, which requires PyExifTool
+    scanner = MetadataScanner.__new__(MetadataScanner)
+    scanner.normalizer = MetadataNormalizer()
+
+    start = time.perf_counter()
+    entries = list(scanner._iter_file_entries(work_dir / 'tree', True))
+    results['discovery'] = throughput(len(entries), time.perf_counter() - start,
+                                      bytes=sum(stat.st_size for _path, stat in entries))
+    report('discovery', results['discovery'])
+
+    stub = StubExifTool(seed=seed, delay=delay)
+    entry_batches = list(batches(entries, batch_size))
+
+    start = time.perf_counter()
+    extracted = [stub.get_metadata([str(path) for path, _stat in batch]) for batch in entry_batches]
+    results['extraction'] = throughput(len(entries), time.perf_counter() - start)
+    report('extraction', results['extraction'])
+
+    normalizer = MetadataNormalizer()
+    start = time.perf_counter()
+    normalized = []
+    for batch, metadata_list in zip(entry_batches, extracted):
+        stat_results = {os.path.normpath(str(path)): stat for path, stat in batch}
+        records, _failures = normalizer.normalize_batch(metadata_list, stat_results)
+        normalized.append(records)
+    results['normalization'] = throughput(len(entries), time.perf_counter() - start)
+    report('normalization', results['normalization'])
+
+    db = DatabaseManager(str(work_dir / 'insert.db'))
+    start = time.perf_counter()
+    written = sum(db.insert_files(records) for records in normalized)
+    results['insert'] = throughput(written, time.perf_counter() - start)
+    db.close()
+    report('insert', results['insert'])
+
+    pipeline = ScanPipeline(StubExifTool(seed=seed, delay=delay).get_metadata,
+                            str(work_dir / 'pipeline.db'), batch_size=batch_size)
+    stats = pipeline.run(iter(entries))
+    results['pipeline'] = throughput(stats['scanned'], stats['elapsed'],
+                                     failed=stats['failed'], stages=stats['pipeline']['stages'])
+    report('pipeline', results['pipeline'])
+
+    return results
+
+
+def load_rows(db: DatabaseManager, paths: List[str], seed: int, batch_size: int) -> float:
+    """Insert synthetic rows (no files on disk); returns seconds spent"""
+    normalizer = MetadataNormalizer()
+    start = time.perf_counter()
+    for batch in batches(paths, batch_size):
+        records, _failures = normalizer.normalize_batch([canned_metadata(path, seed) for path in batch])
+        db.insert_files(records)
+    return time.perf_counter() - start
+
+
+def bench_queries(work_dir: Path, sizes: List[int], mix: Dict[str, float], seed: int,
+                  repeat: int) -> Dict[str, Any]:
+    """
+    Time QUERIES at each index size, growing one database
+
+    Args:
+        work_dir: Scratch directory for the database
+        sizes: Row counts to measure at (ascending)
+        mix: Extension -> weight
+        seed: Corpus seed
+        repeat: Timed runs per query (after one warm-up run)
+
+    Returns:
+        Dictionary of row count -> load time and per-query latency summaries
+    """
+    results = {}
+    paths = synthetic_paths(max(sizes), mix, seed, root='/bench/corpus')
+    db = DatabaseManager(str(work_dir / 'queries.db'))
+
+    loaded = 0
+    for size in sorted(sizes):
+        load_seconds = load_rows(db, paths[loaded:size], seed, batch_size=1000)
+        db.conn.execute("ANALYZE")
+        print(f"  {size:,} rows (loaded {size - loaded:,} in {load_seconds:.1f}s)")
+        load = throughput(size - loaded, load_seconds)
+        loaded = size
+
+        latencies = {}
+        for name, query in QUERIES.items():
+            query(db)  # warm-up: page cache and statement cache
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                query(db)
+                samples.append(time.perf_counter() - start)
+            latencies[name] = percentiles(samples)
+            print(f"    {name:<15} p50 {latencies[name]['p50_ms']:8.2f} ms   "
+                  f"p99 {latencies[name]['p99_ms']:8.2f} ms")
+
+        results[str(size)] = {
+            'load': load,
+            'db_bytes': os.path.getsize(db.db_path),
+            'latency': latencies,
+        }
+
+    db.close()
+    return results
+
+
+def report(name: str, result: Dict[str, Any]):
+    print(f"  {name:<13} {result['items']:,} in {result['seconds']:.2f}s "
+          f"({result['per_second']:,.0f}/s)")
+
+
+def environment() -> Dict[str, Any]:
+    """Commit and platform details recorded with the results"""
+    repo = Path(__file__).parent.parent
+
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], cwd=repo, capture_output=True,
+                                  text=True, timeout=10).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ''
+
+    return {
+        'commit': git('rev-parse', 'HEAD') or None,
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def flatten(results: Dict[str, Any], prefix: str = '') -> Iterator[Tuple[str, float]]:
+    """Yield (dotted key, value) for the headline metrics of a results file"""
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from flatten(value, name + '.')
+        elif key in ('per_second', 'p50_ms', 'p99_ms'):
+            yield name, value
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]):
+    """Print the change of every metric present in both result files"""
+    before = dict(flatten(old['results']))
+    print(f"\nCompared with {(old['environment'].get('commit') or 'unknown')[:12]}:")
+    for name, value in flatten(new['results']):
+        if name not in before or not before[name]:
+            continue
+        change = (value - before[name]) / before[name] * 100
+        # Throughput should go up, latency down
+        better = change > 0 if name.endswith('per_second') else change < 0
+        marker = '  ' if abs(change) < 10 else '✅' if better else '⚠️ '
+        print(f"  {marker} {name:<48} {before[name]:12.2f} -> {value:12.2f} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark scanning and queries on synthetic data')
+    parser.add_argument('--files', type=int, default=10_000,
+                        help='Files in the synthetic tree for the ingest benchmark')
+    parser.add_argument('--rows', default='10000,100000,1000000',
+                        help='Comma-separated index sizes for the query benchmark')
+    parser.add_argument('--mix', help="Type mix, e.g. 'jpg=60,pdf=25,mp3=15'")
+    parser.add_argument('--seed', type=int, default=42, help='Corpus seed')
+    parser.add_argument('--batch-size', type=int, default=100, help='Files per batch')
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help='Stub ExifTool seconds per file (0 measures MetaFinder alone)')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+    parser.add_argument('--skip-ingest', action='store_true', help='Only run the query benchmark')
+    parser.add_argument('--skip-queries', action='store_true', help='Only run the ingest benchmark')
+    parser.add_argument('--work-dir', help='Scratch directory (default: a temporary directory)')
+    parser.add_argument('--output', default='bench_results.json', help='JSON results file')
+    parser.add_argument('--compare', help='Earlier JSON results file to compare against')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    sizes = sorted(int(size) for size in args.rows.split(',') if size.strip())
+
+    output = {
+        'environment': environment(),
+        'config': {
+            'files': args.files, 'rows': sizes, 'mix': mix, 'seed': args.seed,
+            'batch_size': args.batch_size, 'delay': args.delay, 'repeat': args.repeat,
+        },
+        'results': {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix='metafinder-bench-', dir=args.work_dir) as work_dir:
+        work_dir = Path(work_dir)
+        if not args.skip_ingest:
+            print(f"Ingest ({args.files:,} files, stub ExifTool delay {args.delay * 1000:.1f} ms/file)")
+            output['results']['ingest'] = bench_ingest(work_dir, args.files, mix, args.seed,
+                                                       args.batch_size, args.delay)
+        if not args.skip_queries and sizes:
+            print(f"\nQueries ({args.repeat} runs each)")
+            output['results']['queries'] = bench_queries(work_dir, sizes, mix, args.seed, args.repeat)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), output)
+
+
+if __name__ == '__main__':
+    main()
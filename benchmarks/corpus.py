@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Synthetic corpus for the MetaFinder benchmarks
+Generates reproducible file trees and the ExifTool output a real scan would produce
+"""
+
+import os
+import json
+import time
+import zlib
+import random
+import argparse
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+
+# Default share of each extension, shaped like a personal photo/document folder
+DEFAULT_MIX = {
+    '.jpg': 50, '.png': 10, '.heic': 5,
+    '.pdf': 10, '.docx': 5, '.txt': 5,
+    '.mp3': 8, '.mp4': 5, '.mov': 2,
+}
+
+# Leading bytes written to each synthetic file, so header sniffing sees real magic
+HEADERS = {
+    '.jpg': b'\xff\xd8\xff\xe1',
+    '.png': b'\x89PNG\r\n\x1a\n',
+    '.heic': b'\x00\x00\x00\x18ftypheic',
+    '.pdf': b'%PDF-1.7\n',
+    '.docx': b'PK\x03\x04',
+    '.mp3': b'ID3\x04\x00',
+    '.mp4': b'\x00\x00\x00\x18ftypmp42',
+    '.mov': b'\x00\x00\x00\x14ftypqt  ',
+}
+
+MIME_TYPES = {
+    '.jpg': 'image/jpeg', '.png': 'image/png', '.heic': 'image/heic',
+    '.pdf': 'application/pdf', '.txt': 'text/plain',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.mp3': 'audio/mpeg', '.mp4': 'video/mp4', '.mov': 'video/quicktime',
+}
+
+CAMERAS = [('Canon', 'Canon EOS R6'), ('NIKON CORPORATION', 'NIKON Z 6_2'),
+           ('SONY', 'ILCE-7M3'), ('Apple', 'iPhone 14 Pro'), ('FUJIFILM', 'X-T4')]
+AUTHORS = ['Ada Lovelace', 'Grace Hopper', 'Alan Turing', 'Katherine Johnson', 'Linus Torvalds']
+WORDS = ['holiday', 'report', 'invoice', 'beach', 'family', 'project', 'budget',
+         'concert', 'garden', 'meeting', 'draft', 'summary', 'trip', 'birthday']
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    Parse a type mix like 'jpg=60,pdf=25,mp3=15'
+
+    Args:
+        text: Comma-separated extension=weight pairs
+
+    Returns:
+        Map of extension (with dot) -> weight
+    """
+    mix = {}
+    for part in text.split(','):
+        if not part.strip():
+            continue
+        extension, _, weight = part.partition('=')
+        extension = extension.strip().lower()
+        if not extension.startswith('.'):
+            extension = '.' + extension
+        mix[extension] = float(weight) if weight else 1.0
+    if not mix:
+        raise ValueError(f"Empty type mix: {text!r}")
+    return mix
+
+
+def _seed_for(path: str, seed: int) -> int:
+    """Stable per-file seed (hash() is salted per process, crc32 is not)"""
+    return zlib.crc32(path.encode('utf-8', 'surrogatepass')) ^ seed
+
+
+def synthetic_paths(count: int, mix: Optional[Dict[str, float]] = None, seed: int = 42,
+                    root: str = 'corpus', files_per_dir: int = 200) -> List[str]:
+    """
+    Deterministic relative file paths with the given type mix
+
+    Files are spread over year/month/batch folders, files_per_dir per folder.
+
+    Args:
+        count: Number of paths
+        mix: Extension -> weight (DEFAULT_MIX if None)
+        seed: Random seed
+        root: Top-level folder name
+        files_per_dir: Files per leaf folder
+
+    Returns:
+        List of paths (forward slashes, relative to the corpus parent)
+    """
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    extensions = rng.choices(list(mix), weights=list(mix.values()), k=count)
+
+    paths = []
+    for i, extension in enumerate(extensions):
+        folder = i // files_per_dir
+        year = 2010 + folder % 15
+        month = 1 + (folder // 15) % 12
+        word = WORDS[i % len(WORDS)]
+        paths.append(f"{root}/{year}/{month:02d}/batch_{folder:05d}/{word}_{i:07d}{extension}")
+    return paths
+
+
+def generate_tree(target: str, count: int, mix: Optional[Dict[str, float]] = None,
+                  seed: int = 42, files_per_dir: int = 200,
+                  min_size: int = 64, max_size: int = 4096) -> List[Path]:
+    """
+    Write a synthetic file tree to disk
+
+    Each file starts with its type's magic bytes, followed by seeded filler
+    up to a random size between min_size and max_size.
+
+    Args:
+        target: Directory to create the tree in
+        count: Number of files
+        mix: Extension -> weight (DEFAULT_MIX if None)
+        seed: Random seed (same seed, same tree)
+        files_per_dir: Files per leaf folder
+        min_size: Smallest file in bytes
+        max_size: Largest file in bytes
+
+    Returns:
+        List of the created file paths
+    """
+    target = Path(target)
+    rng = random.Random(seed)
+    filler = rng.randbytes(max_size)
+
+    created = []
+    for relative in synthetic_paths(count, mix, seed, files_per_dir=files_per_dir):
+        path = target / relative
+        if len(created) % files_per_dir == 0:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        header = HEADERS.get(path.suffix, b'')
+        size = max(rng.randint(min_size, max_size), len(header))
+        path.write_bytes(header + filler[:size - len(header)])
+        created.append(path)
+    return created
+
+
+def canned_metadata(path: str, seed: int = 42, size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    ExifTool output (-G -n, as PyExifTool requests it) for a synthetic file
+
+    Values are derived from the path, so the same file always yields the
+    same tags, and cover what the normalizer reads for each file type.
+
+    Args:
+        path: File path (its extension picks the tag set)
+        seed: Corpus seed
+        size: File size in bytes (derived from the path if None)
+
+    Returns:
+        Tag dictionary including SourceFile
+    """
+    rng = random.Random(_seed_for(path, seed))
+    extension = os.path.splitext(path)[1].lower()
+    name = os.path.basename(path)
+
+    timestamp = 1262304000 + rng.randint(0, 15 * 365 * 86400)
+    date = _exif_date(timestamp)
+    data = {
+        'SourceFile': path,
+        'File:FileName': name,
+        'File:Directory': os.path.dirname(path),
+        'File:FileSize': size if size is not None else rng.randint(10_000, 8_000_000),
+        'File:FileModifyDate': date + '+00:00',
+        'File:FileAccessDate': date + '+00:00',
+        'File:FileInodeChangeDate': date + '+00:00',
+        'File:FileType': extension.lstrip('.').upper(),
+        'File:FileTypeExtension': extension.lstrip('.'),
+        'File:MIMEType': MIME_TYPES.get(extension, 'application/octet-stream'),
+    }
+
+    if extension in ('.jpg', '.png', '.heic'):
+        make, model = rng.choice(CAMERAS)
+        width, height = rng.choice([(6000, 4000), (4032, 3024), (1920, 1080)])
+        data.update({
+            'EXIF:Make': make,
+            'EXIF:Model': model,
+            'EXIF:DateTimeOriginal': date,
+            'EXIF:OffsetTimeOriginal': '+01:00',
+            'EXIF:ExposureTime': rng.choice([1 / 1000, 1 / 250, 1 / 60, 0.5]),
+            'EXIF:FNumber': rng.choice([1.8, 2.8, 4.0, 8.0]),
+            'EXIF:FocalLength': rng.choice([24.0, 35.0, 50.0, 85.0]),
+            'EXIF:ISO': rng.choice([100, 400, 1600]),
+            'EXIF:ExifImageWidth': width,
+            'EXIF:ExifImageHeight': height,
+            'EXIF:Artist': rng.choice(AUTHORS),
+            'EXIF:Orientation': 1,
+        })
+        if rng.random() < 0.4:
+            data['Composite:GPSLatitude'] = round(rng.uniform(-60, 70), 6)
+            data['Composite:GPSLongitude'] = round(rng.uniform(-180, 180), 6)
+    elif extension in ('.pdf', '.docx', '.txt'):
+        data.update({
+            'PDF:Author': rng.choice(AUTHORS),
+            'PDF:Title': ' '.join(rng.choice(WORDS) for _ in range(3)).title(),
+            'PDF:CreateDate': date,
+            'PDF:PageCount': rng.randint(1, 120),
+            'PDF:Producer': 'MetaFinder Benchmark',
+        })
+    elif extension == '.mp3':
+        data.update({
+            'ID3:Artist': rng.choice(AUTHORS),
+            'ID3:Title': ' '.join(rng.choice(WORDS) for _ in range(2)).title(),
+            'ID3:Album': rng.choice(WORDS).title(),
+            'ID3:BeatsPerMinute': rng.randint(60, 180),
+            'MPEG:AudioBitrate': rng.choice([128000, 192000, 320000]),
+            'Composite:Duration': round(rng.uniform(90, 420), 3),
+        })
+    elif extension in ('.mp4', '.mov'):
+        data.update({
+            'QuickTime:CreateDate': date,
+            'QuickTime:Title': rng.choice(WORDS).title(),
+            'QuickTime:ImageWidth': 1920,
+            'QuickTime:ImageHeight': 1080,
+            'QuickTime:Duration': round(rng.uniform(5, 600), 3),
+            'Composite:AvgBitrate': rng.randint(2_000_000, 20_000_000),
+        })
+
+    return data
+
+
+def _exif_date(timestamp: int) -> str:
+    """Unix time -> 'YYYY:MM:DD HH:MM:SS' (UTC)"""
+    return time.strftime('%Y:%m:%d %H:%M:%S', time.gmtime(timestamp))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic file tree')
+    parser.add_argument('target', help='Directory to create the tree in')
+    parser.add_argument('--files', type=int, default=10_000, help='Number of files')
+    parser.add_argument('--mix', help="Type mix, e.g. 'jpg=60,pdf=25,mp3=15'")
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--sample', action='store_true',
+                        help='Print the canned ExifTool output of the first file')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix) if args.mix else None
+    created = generate_tree(args.target, args.files, mix, args.seed)
+    print(f"Created {len(created):,} files in {args.target}")
+
+    if args.sample and created:
+        print(json.dumps(canned_metadata(str(created[0]), args.seed), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Deterministic stand-in for ExifTool
+Returns canned JSON for synthetic files, so benchmarks run without the real binary
+"""
+
+import os
+import sys
+import json
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from corpus import canned_metadata
+
+
+# Version reported by '-ver' (newer than the 12.15 the scanner recommends)
+STUB_VERSION = '12.76'
+
+
+class StubExifTool:
+    """
+    Drop-in for exiftool.ExifToolHelper in benchmarks
+
+    get_metadata() serializes the canned tags to JSON and parses them back,
+    like PyExifTool does with ExifTool's output, so the measured extraction
+    cost includes the JSON round trip. An optional per-file delay models
+    the time the real binary spends reading files.
+    """
+
+    def __init__(self, seed: int = 42, delay: float = 0.0, stat_files: bool = True):
+        """
+        Initialize stub
+
+        Args:
+            seed: Corpus seed (same seed, same tags)
+            delay: Seconds added per file to model ExifTool's own cost
+            stat_files: Report real file sizes for files that exist on disk
+        """
+        self.seed = seed
+        self.delay = delay
+        self.stat_files = stat_files
+        self.calls = 0
+        self.files = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def execute_json(self, files: List[str]) -> str:
+        """
+        ExifTool's -json output for a batch
+
+        Args:
+            files: File paths
+
+        Returns:
+            JSON array text, one object per file
+        """
+        self.calls += 1
+        self.files += len(files)
+        if self.delay:
+            time.sleep(self.delay * len(files))
+        return json.dumps([canned_metadata(path, self.seed, self._size(path)) for path in files])
+
+    def get_metadata(self, files: List[str]) -> List[Dict[str, Any]]:
+        """
+        Metadata for a batch, as ExifToolHelper.get_metadata returns it
+
+        Args:
+            files: File paths
+
+        Returns:
+            List of tag dictionaries
+        """
+        return json.loads(self.execute_json(files))
+
+    def _size(self, path: str) -> Optional[int]:
+        if not self.stat_files:
+            return None
+        try:
+            return os.stat(path).st_size
+        except OSError:
+            return None
+
+
+def main():
+    """Answer '-ver' and '[-json] FILE...' like the exiftool command line"""
+    args = sys.argv[1:]
+    if '-ver' in args:
+        print(STUB_VERSION)
+        return
+
+    files = [arg for arg in args if not arg.startswith('-')]
+    print(StubExifTool().execute_json(files))
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,7 @@ Command-line interface for scanning and searching file metadata
 """
 
 import sys
+import signal
 import argparse
 from pathlib import Path
 from datetime import datetime
@@ -12,8 +13,14 @@ from datetime import datetime
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-from metafinder import MetadataScanner, DatabaseManager
-from metafinder.scanner import check_requirements
+from metafinder import (MetadataScanner, DatabaseManager, ResultExporter, DumpImporter,
+                        IndexMaintainer, FolderWatcher, SimilarityIndex)
+from metafinder.scanner import check_requirements, toolchain_cache
+from metafinder.progress import format_progress
+from metafinder.profiling import format_profile, write_metrics
+from metafinder.pipeline import ScanControl
+from metafinder.scheduler import ScanPriority
+from metafinder.values import NUMERIC_FIELDS
 
 
 def format_size(bytes_size: int) -> str:
@@ -32,6 +39,30 @@ def format_timestamp(timestamp: float) -> str:
     return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
 
 
+def format_details(record: dict) -> str:
+    """Summarize the typed numeric fields of a record"""
+    parts = []
+    if record.get('width') and record.get('height'):
+        parts.append(f"{record['width']}x{record['height']}")
+    if record.get('exposure_time'):
+        exposure = record['exposure_time']
+        parts.append(f"1/{round(1 / exposure)}s" if exposure < 1 else f"{exposure:g}s")
+    if record.get('f_number'):
+        parts.append(f"f/{record['f_number']:g}")
+    if record.get('focal_length'):
+        parts.append(f"{record['focal_length']:g}mm")
+    if record.get('duration_s'):
+        minutes, seconds = divmod(int(record['duration_s']), 60)
+        parts.append(f"{minutes // 60}:{minutes % 60:02d}:{seconds:02d}")
+    if record.get('bpm'):
+        parts.append(f"{record['bpm']:g} BPM")
+    if record.get('bitrate'):
+        parts.append(f"{record['bitrate'] / 1000:.0f} kbps")
+    if record.get('page_count'):
+        parts.append(f"{record['page_count']} pages")
+    return " • ".join(parts)
+
+
 def print_file_record(record: dict, verbose: bool = False):
     """Print a file record in a nice format"""
     print(f"\n📄 {record['name']}")
@@ -45,9 +76,15 @@ def print_file_record(record: dict, verbose: bool = False):
     if record.get('title'):
         print(f"   Title: {record['title']}")
     if record.get('camera_make'):
-        print(f"   Camera: {record['camera_make']} {record.get('camera_model', '')}")
+        print(f"   Camera: {record['camera_make']} {record.get('camera_model') or ''}")
     if record.get('date_taken'):
         print(f"   Taken: {format_timestamp(record['date_taken'])}")
+    if record.get('latitude') is not None:
+        print(f"   Location: {record['latitude']:.5f}, {record['longitude']:.5f}")
+
+    details = format_details(record)
+    if details:
+        print(f"   Details: {details}")
 
     if verbose and record.get('metadata'):
         print("\n   📊 Full Metadata:")
@@ -57,6 +94,86 @@ def print_file_record(record: dict, verbose: bool = False):
                 print(f"      {key}: {value}")
 
 
+def build_search_params(args) -> dict:
+    """Build search_files filters from parsed filter arguments"""
+    search_params = {}
+
+    if args.query:
+        search_params['text_query'] = args.query
+    if args.type:
+        search_params['file_type'] = args.type
+    if args.extension:
+        search_params['extension'] = args.extension
+    if args.author:
+        search_params['author'] = args.author
+    if args.camera:
+        search_params['camera_make'] = args.camera
+    if args.min_size:
+        search_params['min_size'] = args.min_size
+    if args.max_size:
+        search_params['max_size'] = args.max_size
+    if args.bbox:
+        search_params['bbox'] = args.bbox
+    if args.near:
+        search_params['near'] = args.near
+    if args.range:
+        search_params['ranges'] = dict(args.range)
+
+    return search_params
+
+
+def value_range(text: str) -> tuple:
+    """argparse type for FIELD=MIN..MAX (either bound may be omitted)"""
+    field, sep, bounds = text.partition('=')
+    field = field.strip()
+    if not sep or field not in NUMERIC_FIELDS:
+        raise argparse.ArgumentTypeError(
+            f"expected FIELD=MIN..MAX with FIELD one of: {', '.join(NUMERIC_FIELDS)}"
+        )
+
+    low, dots, high = bounds.partition('..')
+    try:
+        low = float(low) if low.strip() else None
+        high = float(high) if high.strip() else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid range bounds: '{bounds}'")
+    if not dots:
+        # FIELD=VALUE means exactly VALUE
+        high = low
+    return field, (low, high)
+
+
+def float_list(count: int):
+    """argparse type for a fixed number of comma-separated numbers"""
+    def parse(text: str) -> tuple:
+        try:
+            values = tuple(float(value) for value in text.split(','))
+        except ValueError:
+            values = ()
+        if len(values) != count:
+            raise argparse.ArgumentTypeError(f"expected {count} comma-separated numbers, got '{text}'")
+        return values
+    return parse
+
+
+def add_filter_arguments(parser):
+    """Add the shared search filter arguments to a subcommand parser"""
+    parser.add_argument('--query', '-q', help='Words to find in name, author, title or extracted text')
+    parser.add_argument('--type', '-t', help='File type (image, document, audio, video)')
+    parser.add_argument('--extension', '-e', help='File extension (e.g., .jpg, .pdf)')
+    parser.add_argument('--author', '-a', help='Author/creator name')
+    parser.add_argument('--camera', '-c', help='Camera make')
+    parser.add_argument('--min-size', type=int, help='Minimum file size in bytes')
+    parser.add_argument('--max-size', type=int, help='Maximum file size in bytes')
+    parser.add_argument('--bbox', type=float_list(4), metavar='MIN_LAT,MIN_LON,MAX_LAT,MAX_LON',
+                        help='Only files taken inside this GPS box (use --bbox=... for negative values)')
+    parser.add_argument('--near', type=float_list(3), metavar='LAT,LON,KM',
+                        help='Only files taken within KM kilometres of a GPS position')
+    parser.add_argument('--range', type=value_range, action='append', metavar='FIELD=MIN..MAX',
+                        help='Numeric range filter, repeatable (e.g. duration_s=600.., bpm=140..160, '
+                             f"width=3840..); fields: {', '.join(NUMERIC_FIELDS)}")
+
+
 def cmd_scan(args):
     """Scan a folder"""
     print("=" * 60)
@@ -65,7 +182,7 @@ def cmd_scan(args):
 
     # Check requirements
     print("\n📋 Checking requirements...")
-    reqs = check_requirements()
+    reqs = check_requirements(toolchain_cache(args.database))
 
     if not reqs['pyexiftool']:
         print("❌ PyExifTool not installed")
@@ -83,17 +200,43 @@ def cmd_scan(args):
     db = DatabaseManager(args.database)
     scanner = MetadataScanner(db)
 
-    # Progress callback
-    def progress(current, total, filename):
-        percent = (current / total) * 100
-        print(f"\r   [{current}/{total}] {percent:.1f}% - {filename[:50]:<50}", end='')
+    # Progress callback (rate-limited snapshots, so printing can't slow the scan)
+    def progress(snapshot):
+        print(f"\r   {format_progress(snapshot):<100}", end='', flush=True)
 
     # Scan folder
-    stats = scanner.scan_folder(
-        args.folder,
-        recursive=not args.no_recursive,
-        progress_callback=progress
-    )
+    file_types = None
+    if args.types:
+        file_types = [t.strip() for t in args.types.split(',') if t.strip()]
+
+    # Scan order: pinned folders, preferred types and/or newest files first
+    priority = None
+    if args.recent_first or args.pin or args.prefer:
+        prefer = [t.strip() for t in args.prefer.split(',') if t.strip()] if args.prefer else None
+        priority = ScanPriority(pinned=args.pin, file_types=prefer, recent_first=args.recent_first)
+
+    # First Ctrl+C stops after the batches in flight are written; a second one aborts
+    control = ScanControl()
+
+    def stop(signum, frame):
+        if control.cancelled:
+            raise KeyboardInterrupt
+        control.cancel()
+        print("\n⏹️  Stopping after the current batch (Ctrl+C again to abort)...")
+
+    previous_handler = signal.signal(signal.SIGINT, stop)
+    try:
+        stats = scanner.scan_folder(
+            args.folder,
+            recursive=not args.no_recursive,
+            progress_callback=progress,
+            file_types=file_types,
+            control=control,
+            profile=args.profile,
+            priority=priority
+        )
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
 
     print("\n\n" + "=" * 60)
     print("📊 Scan Statistics")
@@ -101,7 +244,26 @@ def cmd_scan(args):
     print(f"Total files: {stats['total']}")
     print(f"Successfully scanned: {stats['scanned']}")
     print(f"Failed: {stats['failed']}")
+    if stats['failed']:
+        print("   (recorded; retry them later with the 'retry' command)")
     print(f"Success rate: {stats['success_rate']:.1f}%")
+    if stats.get('cancelled'):
+        print(f"Stopped early: {stats['skipped']} files not scanned")
+
+    if 'pipeline' in stats:
+        if args.profile:
+            print("\n" + format_profile(stats))
+        else:
+            print("\n🔧 Pipeline stages (busy / starved / blocked):")
+            for name, stage in stats['pipeline']['stages'].items():
+                print(f"   {name:<14} {stage['busy']:7.2f}s / {stage['waiting_input']:7.2f}s / "
+                      f"{stage['blocked_output']:7.2f}s")
+
+    # Written even without stage timings (e.g. nothing to scan), so callers
+    # always find the file they asked for
+    if args.metrics:
+        path = write_metrics(stats, args.metrics, {'folder': str(Path(args.folder).absolute())})
+        print(f"\n📈 Metrics written to {path}")
 
     return 0
 
@@ -115,22 +277,8 @@ def cmd_search(args):
     db = DatabaseManager(args.database)
 
     # Build search parameters
-    search_params = {
-        'limit': args.limit
-    }
-
-    if args.type:
-        search_params['file_type'] = args.type
-    if args.extension:
-        search_params['extension'] = args.extension
-    if args.author:
-        search_params['author'] = args.author
-    if args.camera:
-        search_params['camera_make'] = args.camera
-    if args.min_size:
-        search_params['min_size'] = args.min_size
-    if args.max_size:
-        search_params['max_size'] = args.max_size
+    search_params = build_search_params(args)
+    search_params['limit'] = args.limit
 
     # Search
     results = db.search_files(**search_params)
@@ -144,6 +292,254 @@ def cmd_search(args):
     return 0
 
 
+def cmd_export(args):
+    """Export matching files"""
+    # Keep stdout clean when streaming the export there
+    log = sys.stderr if args.output == '-' else sys.stdout
+
+    print("=" * 60, file=log)
+    print("📤 MetaFinder - Export", file=log)
+    print("=" * 60, file=log)
+
+    db = DatabaseManager(args.database)
+    exporter = ResultExporter(db)
+
+    fields = None
+    if args.fields:
+        fields = [field.strip() for field in args.fields.split(',') if field.strip()]
+
+    def progress(rows):
+        print(f"\r   {rows} rows written...", end='', file=log)
+
+    stats = exporter.export(
+        args.output,
+        export_format=args.format,
+        fields=fields,
+        flatten_metadata=args.flatten_metadata,
+        progress_callback=progress,
+        **build_search_params(args)
+    )
+
+    print(f"\n✅ Exported {stats['rows']} files to {stats['output']} ({stats['format']})", file=log)
+    if 'bytes' in stats:
+        print(f"   💾 {format_size(stats['bytes'])} in {stats['elapsed']:.2f}s "
+              f"({stats['rows_per_second']:.0f} rows/s)", file=log)
+
+    return 0
+
+
+def cmd_import(args):
+    """Import pre-extracted ExifTool JSON dumps"""
+    print("=" * 60)
+    print("📥 MetaFinder - Dump Import")
+    print("=" * 60)
+
+    db = DatabaseManager(args.database)
+    importer = DumpImporter(db, batch_size=args.batch_size)
+
+    def progress(records):
+        print(f"\r   {records} records read...", end='')
+
+    totals = {'imported': 0, 'failed': 0, 'total': 0}
+    for dump in args.dumps:
+        print(f"\n📂 {dump}")
+        stats = importer.import_dump(dump, progress_callback=progress, base_dir=args.base)
+        print(f"\n   ✅ {stats['imported']}/{stats['total']} records in {stats['elapsed']:.2f}s "
+              f"({stats['records_per_second']:.0f} records/s)")
+        for key in totals:
+            totals[key] += stats[key]
+
+    print("\n" + "=" * 60)
+    print("📊 Import Statistics")
+    print("=" * 60)
+    print(f"Total records: {totals['total']}")
+    print(f"Imported: {totals['imported']}")
+    print(f"Failed: {totals['failed']}")
+
+    return 0
+
+
+def cmd_prune(args):
+    """Remove vanished files from the index"""
+    print("=" * 60)
+    print("🧹 MetaFinder - Prune")
+    print("=" * 60)
+
+    db = DatabaseManager(args.database)
+    maintainer = IndexMaintainer(db)
+
+    stats = maintainer.prune(
+        args.folder,
+        optimize=args.optimize,
+        vacuum=args.vacuum,
+        dry_run=args.dry_run
+    )
+
+    print(f"\n📂 Files on disk: {stats['on_disk']}")
+    print(f"🗂️  Indexed under folder: {stats['indexed']}")
+    if args.dry_run:
+        print(f"🔍 Would delete: {stats['stale']} stale entries")
+    else:
+        print(f"🗑️  Deleted: {stats['deleted']} stale entries")
+    print(f"💾 Reclaimed: {format_size(stats['reclaimed_bytes'])} "
+          f"({format_size(stats['size_before'])} → {format_size(stats['size_after'])})")
+
+    print("\n⏱️  Timing:")
+    for stage, seconds in stats['timings'].items():
+        print(f"   {stage}: {seconds:.3f}s")
+    print(f"   total: {stats['elapsed']:.3f}s")
+
+    return 0
+
+
+def cmd_retry(args):
+    """Retry files that failed to scan"""
+    print("=" * 60)
+    print("🔁 MetaFinder - Retry Failed Files")
+    print("=" * 60)
+
+    db = DatabaseManager(args.database)
+
+    if args.list:
+        errors = db.get_scan_errors(limit=args.limit)
+        print(f"\n⚠️  {db.count_scan_errors()} files with scan errors\n")
+        now = datetime.now().timestamp()
+        for error in errors:
+            wait = error['next_attempt'] - now
+            when = "due now" if wait <= 0 else f"due in {wait / 60:.0f} min"
+            print(f"📄 {error['path']}")
+            print(f"   {error['stage']}: {error['error']}")
+            print(f"   {error['attempts']} attempts, last {format_timestamp(error['last_attempt'])}, {when}")
+        return 0
+
+    reqs = check_requirements(toolchain_cache(args.database))
+    if not reqs['pyexiftool'] or not reqs['exiftool_binary']:
+        print("❌ PyExifTool and the ExifTool binary are required")
+        return 1
+
+    scanner = MetadataScanner(db)
+    stats = scanner.retry_failed(max_attempts=args.max_attempts, force=args.now)
+
+    print(f"\n✅ Recovered: {stats['scanned']}")
+    print(f"❌ Failed again: {stats['failed']}")
+    if stats['gone']:
+        print(f"🗑️  Forgotten (no longer on disk): {stats['gone']}")
+    print(f"⏳ Still recorded: {stats['waiting']} (retried later with backoff, "
+          f"up to {args.max_attempts} attempts)")
+
+    return 0
+
+
+def cmd_watch(args):
+    """Watch a folder and keep the index up to date"""
+    print("=" * 60)
+    print("👀 MetaFinder - Folder Watcher")
+    print("=" * 60)
+
+    reqs = check_requirements(toolchain_cache(args.database))
+    if not reqs['pyexiftool'] or not reqs['exiftool_binary']:
+        print("❌ PyExifTool and the ExifTool binary are required")
+        return 1
+
+    db = DatabaseManager(args.database)
+    scanner = MetadataScanner(db)
+
+    if args.initial_scan:
+        print("\n🔄 Catching up with changes since the last scan...")
+        scanner.rescan_changed_files(args.folder)
+
+    watcher = FolderWatcher(
+        scanner,
+        args.folder,
+        debounce=args.debounce,
+        poll_interval=args.poll_interval,
+        use_inotify=False if args.polling else None
+    )
+
+    def on_flush(stats):
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        print(f"[{timestamp}] ✅ {stats['indexed']} indexed, {stats['deleted']} removed, "
+              f"{stats['failed']} failed ({stats['elapsed']:.2f}s)")
+
+    print(f"\n👀 Watching {args.folder} ({watcher.backend_name}) - press Ctrl+C to stop")
+
+    try:
+        watcher.run(on_flush=on_flush)
+    except KeyboardInterrupt:
+        print("\n⏹️  Watcher stopped")
+
+    return 0
+
+
+def cmd_similar(args):
+    """Find near-duplicate images"""
+    print("=" * 60)
+    print("🖼️  MetaFinder - Similar Images")
+    print("=" * 60)
+
+    db = DatabaseManager(args.database)
+    index = SimilarityIndex(db)
+
+    if args.backfill:
+        def progress(done, total):
+            print(f"\r   {done}/{total} images hashed...", end='')
+
+        print("\n🔢 Hashing indexed images without a perceptual hash...")
+        stats = index.backfill(progress_callback=progress)
+        print(f"\n✅ Hashed {stats['hashed']}/{stats['total']} images ({stats['failed']} unreadable)")
+
+    if not args.file:
+        return 0
+
+    # One query: a linear pass over the hashes beats building the BK-tree
+    results = index.find_similar_to_file(args.file, max_distance=args.distance, limit=args.limit)
+
+    print(f"\n🔍 Compared against all hashed images (distance ≤ {args.distance})")
+    print(f"✅ Found {len(results)} similar images")
+
+    for distance, record in results:
+        print(f"\n   [{distance:2d}] {record['name']}")
+        print(f"        {record['path']}")
+
+    return 0
+
+
+def cmd_timeline(args):
+    """Show a date histogram"""
+    print("=" * 60)
+    print("📅 MetaFinder - Timeline")
+    print("=" * 60)
+
+    db = DatabaseManager(args.database)
+
+    # Drill down one level below the selected period by default
+    granularity = args.by or {None: 'year', 4: 'month', 7: 'day'}.get(
+        len(args.period) if args.period else None, 'day')
+
+    buckets = db.get_timeline(
+        field=args.field,
+        granularity=granularity,
+        period=args.period,
+        **build_search_params(args)
+    )
+
+    label = 'date taken' if args.field == 'date_taken' else 'modified'
+    scope = f" in {args.period}" if args.period else ""
+    print(f"\n📊 Files per {granularity} by {label}{scope}")
+
+    if not buckets:
+        print("\n❌ No dated files match")
+        return 0
+
+    peak = max(buckets.values())
+    for bucket, count in buckets.items():
+        bar = "█" * max(1, round(count / peak * 40))
+        print(f"   {bucket:<10} {bar} {count}")
+
+    print(f"\n   Total: {sum(buckets.values())} files")
+    return 0
+
+
 def cmd_stats(args):
     """Show database statistics"""
     print("=" * 60)
@@ -155,6 +551,8 @@ def cmd_stats(args):
 
     print(f"\n📁 Total Files: {stats['total_files']}")
     print(f"💾 Total Size: {format_size(stats['total_size_bytes'])}")
+    if stats['scan_errors']:
+        print(f"⚠️  Failed to scan: {stats['scan_errors']} (see 'retry --list')")
 
     if stats['oldest_file']:
         print(f"📅 Date Range: {format_timestamp(stats['oldest_file'])} to {format_timestamp(stats['newest_file'])}")
@@ -215,6 +613,10 @@ def main():
 Examples:
   # Scan a folder
   %(prog)s scan ~/Pictures
+  %(prog)s scan ~/Pictures --profile --metrics scan_metrics.json
+
+  # Make new files and one project searchable first on a long initial scan
+  %(prog)s scan ~/ --recent-first --pin ~/Projects/current --prefer image,document
 
   # Search for Canon photos
   %(prog)s search --type image --camera Canon
@@ -222,6 +624,37 @@ Examples:
   # Search for PDFs by author
   %(prog)s search --type document --extension .pdf --author "John Smith"
 
+  # Files mentioning both words in their name, title, author or text
+  %(prog)s search --query "invoice 2024"
+
+  # Photos taken within 5 km of the Eiffel Tower
+  %(prog)s search --type image --near 48.8584,2.2945,5
+
+  # 4K videos longer than 10 minutes
+  %(prog)s search --type video --range width=3840.. --range duration_s=600..
+
+  # Export all images to CSV with every metadata tag as a column
+  %(prog)s export images.csv --type image --flatten-metadata
+
+  # Import metadata extracted elsewhere with: exiftool -json -r /archive > dump.json
+  %(prog)s import dump.json
+
+  # Drop entries for files deleted from disk and compact the database
+  %(prog)s prune ~/Pictures --optimize --vacuum
+
+  # Retry files that failed to scan (locked, share offline, ...) once their backoff expired
+  %(prog)s retry
+
+  # Keep the index fresh while files change
+  %(prog)s watch ~/Pictures --initial-scan
+
+  # Photos per month in 2024, then per day in May
+  %(prog)s timeline --type image --period 2024
+  %(prog)s timeline --type image --period 2024-05
+
+  # Find resized or re-encoded copies of a photo
+  %(prog)s similar ~/Pictures/photo.jpg --distance 8
+
   # Show database statistics
   %(prog)s stats
 
@@ -242,18 +675,87 @@ Examples:
     scan_parser = subparsers.add_parser('scan', help='Scan a folder for files')
     scan_parser.add_argument('folder', help='Folder to scan')
     scan_parser.add_argument('--no-recursive', action='store_true', help='Do not scan subdirectories')
+    scan_parser.add_argument('--types', help='Only scan these file types, e.g. image,video '
+                                             '(detected by extension or file header)')
+    scan_parser.add_argument('--recent-first', action='store_true',
+                             help='Index the most recently modified files first')
+    scan_parser.add_argument('--pin', action='append', metavar='FOLDER',
+                             help='Index this subfolder before everything else (repeatable)')
+    scan_parser.add_argument('--prefer', metavar='TYPES',
+                             help='Index these file types first, in order, e.g. image,document')
+    scan_parser.add_argument('--profile', action='store_true',
+                             help='Report per-stage timings and per-extension costs')
+    scan_parser.add_argument('--metrics', metavar='FILE', help='Write scan metrics to a JSON file')
 
     # Search command
     search_parser = subparsers.add_parser('search', help='Search for files')
-    search_parser.add_argument('--type', '-t', help='File type (image, document, audio, video)')
-    search_parser.add_argument('--extension', '-e', help='File extension (e.g., .jpg, .pdf)')
-    search_parser.add_argument('--author', '-a', help='Author/creator name')
-    search_parser.add_argument('--camera', '-c', help='Camera make')
-    search_parser.add_argument('--min-size', type=int, help='Minimum file size in bytes')
-    search_parser.add_argument('--max-size', type=int, help='Maximum file size in bytes')
+    add_filter_arguments(search_parser)
     search_parser.add_argument('--limit', '-l', type=int, default=100, help='Maximum results (default: 100)')
     search_parser.add_argument('--verbose', '-v', action='store_true', help='Show full metadata')
 
+    # Export command
+    export_parser = subparsers.add_parser('export', help='Export matching files to CSV or JSON Lines')
+    export_parser.add_argument('output', help="Output file ('-' for stdout)")
+    export_parser.add_argument('--format', '-f', choices=ResultExporter.FORMATS,
+                               help='Output format (default: from file extension)')
+    export_parser.add_argument('--fields', help='Comma-separated columns to export')
+    export_parser.add_argument('--flatten-metadata', action='store_true',
+                               help='Expand metadata into one column per tag')
+    add_filter_arguments(export_parser)
+
+    # Import command
+    import_parser = subparsers.add_parser('import', help='Import ExifTool JSON/JSONL dumps')
+    import_parser.add_argument('dumps', nargs='+', help='Dump files from exiftool -json (.json, .jsonl, .gz)')
+    import_parser.add_argument('--batch-size', type=int, default=500,
+                               help='Records per insert transaction (default: 500)')
+    import_parser.add_argument('--base', metavar='DIR',
+                               help="Resolve relative SourceFile paths against DIR "
+                                    "(default: each dump's own folder)")
+
+    # Prune command
+    prune_parser = subparsers.add_parser('prune', help='Remove deleted/moved files from the index')
+    prune_parser.add_argument('folder', help='Folder whose indexed files should be checked')
+    prune_parser.add_argument('--optimize', action='store_true', help='Run ANALYZE and PRAGMA optimize afterwards')
+    prune_parser.add_argument('--vacuum', action='store_true', help='Release free pages back to disk afterwards')
+    prune_parser.add_argument('--dry-run', action='store_true', help='Only report stale entries')
+
+    # Retry command
+    retry_parser = subparsers.add_parser('retry', help='Retry files that failed to scan')
+    retry_parser.add_argument('--max-attempts', type=int, default=5,
+                              help='Give up on files that failed this many times (default: 5)')
+    retry_parser.add_argument('--now', action='store_true', help='Ignore the backoff and retry everything')
+    retry_parser.add_argument('--list', action='store_true', help='Only list recorded failures')
+    retry_parser.add_argument('--limit', '-l', type=int, default=100, help='Failures listed (default: 100)')
+
+    # Watch command
+    watch_parser = subparsers.add_parser('watch', help='Keep the index fresh from filesystem events')
+    watch_parser.add_argument('folder', help='Folder to watch (recursively)')
+    watch_parser.add_argument('--debounce', type=float, default=2.0,
+                              help='Seconds of quiet before changes are indexed (default: 2)')
+    watch_parser.add_argument('--poll-interval', type=float, default=5.0,
+                              help='Snapshot interval for the polling fallback (default: 5)')
+    watch_parser.add_argument('--polling', action='store_true', help='Use polling instead of inotify')
+    watch_parser.add_argument('--initial-scan', action='store_true',
+                              help='Rescan changed files before starting to watch')
+
+    # Timeline command
+    timeline_parser = subparsers.add_parser('timeline', help='Show file counts per year, month or day')
+    timeline_parser.add_argument('--field', choices=DatabaseManager.TIMELINE_FIELDS, default='date_taken',
+                                 help='Date to bucket by (default: date_taken)')
+    timeline_parser.add_argument('--by', choices=list(DatabaseManager.TIMELINE_GRANULARITY),
+                                 help='Bucket size (default: one level below --period)')
+    timeline_parser.add_argument('--period', help='Only this year or month, e.g. 2024 or 2024-05')
+    add_filter_arguments(timeline_parser)
+
+    # Similar command
+    similar_parser = subparsers.add_parser('similar', help='Find near-duplicate images')
+    similar_parser.add_argument('file', nargs='?', help='Image to find copies of')
+    similar_parser.add_argument('--distance', type=int, default=10,
+                                help='Maximum Hamming distance between hashes, 0-64 (default: 10)')
+    similar_parser.add_argument('--limit', '-l', type=int, default=50, help='Maximum results (default: 50)')
+    similar_parser.add_argument('--backfill', action='store_true',
+                                help='First hash indexed images that have no perceptual hash')
+
     # Stats command
     stats_parser = subparsers.add_parser('stats', help='Show database statistics')
 
@@ -272,6 +774,13 @@ Examples:
     commands = {
         'scan': cmd_scan,
         'search': cmd_search,
+        'export': cmd_export,
+        'import': cmd_import,
+        'prune': cmd_prune,
+        'retry': cmd_retry,
+        'watch': cmd_watch,
+        'timeline': cmd_timeline,
+        'similar': cmd_similar,
         'stats': cmd_stats,
         'info': cmd_info,
     }
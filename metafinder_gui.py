@@ -4,21 +4,33 @@ MetaFinder GUI
 Modern interface for file metadata extraction and filtering
 """
 
+import time
+
+# Taken before the heavy imports, for --profile-startup
+_LAUNCH_TIME = time.perf_counter()
+
 import sys
 import os
+import argparse
 import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
 from datetime import datetime
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
 import customtkinter as ctk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, Menu
 
-from metafinder import MetadataScanner, DatabaseManager
-from metafinder.scanner import check_requirements
+# The scanner (PyExifTool), similarity search and Pillow are imported on first use
+from metafinder import DatabaseManager, ResultExporter
+from metafinder.query_runner import QueryRunner
+from metafinder.progress import format_progress
+from metafinder.pipeline import ScanControl
+from metafinder.scheduler import ScanPriority
+from metafinder.thumbnails import ThumbnailService, THUMBNAIL_SIZE, PIL_AVAILABLE
 
 
 # Set appearance
@@ -26,10 +38,281 @@ ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
 
+class VirtualResultList(ctk.CTkFrame):
+    """
+    Scrollable list that only creates widgets for the visible rows
+
+    Rows come from a paged source and pages are cached in a small LRU.
+    A fixed pool of row widgets, just large enough to cover the window,
+    is repositioned and re-bound to new records while scrolling, so
+    scrolling and refreshing cost the same for 100 or 100,000 results.
+
+    Database sources load pages asynchronously: rows of a page that is
+    not cached yet show as placeholders (bound to PLACEHOLDER) until
+    the source delivers it, so a slow query never blocks scrolling.
+    """
+
+    PAGE_SIZE = 100
+    MAX_CACHED_PAGES = 20
+    SCROLL_ROWS = 3  # rows per mouse wheel notch
+    PLACEHOLDER: Dict[str, Any] = {}  # bound to rows whose page is still loading
+
+    def __init__(self,
+                 master,
+                 row_height: int,
+                 create_row: Callable[[Any], Any],
+                 bind_row: Callable[[Any, Dict[str, Any]], None],
+                 **kwargs):
+        """
+        Initialize list
+
+        Args:
+            master: Parent widget
+            row_height: Height of every row, including spacing
+            create_row: Function(parent) building one empty row widget
+            bind_row: Function(row, record) filling a row with a record
+                (or PLACEHOLDER while its page loads)
+        """
+        super().__init__(master, **kwargs)
+        self.row_height = row_height
+        self.create_row = create_row
+        self.bind_row = bind_row
+
+        self.total = 0
+        self.load_pages: Callable[[List[tuple], Callable[[Dict[int, list]], None]], None] = \
+            lambda requests, deliver: None
+        self.source = 0  # bumped for every new result set
+        self.pages: OrderedDict = OrderedDict()
+        self.loading: set = set()  # pages requested and not delivered yet
+        self.top = 0.0  # scroll offset in (unscaled) pixels
+        self.pool: List[Any] = []
+        self.overlay = None
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self.viewport.grid(row=0, column=0, sticky="nsew")
+        self.viewport.bind("<Configure>", lambda event: self._layout())
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.bind_all(sequence, self._on_mousewheel, add="+")
+
+    def set_source(self,
+                   total: int,
+                   load_pages: Callable[[List[tuple], Callable[[Dict[int, list]], None]], None],
+                   first_page: Optional[List[Dict[str, Any]]] = None):
+        """
+        Show a new result set
+
+        Args:
+            total: Number of rows
+            load_pages: Function(requests, deliver) that fetches pages, normally
+                off the UI thread. Each request is (page, offset, limit, anchor),
+                where anchor is None or (index, record) of the last row of the
+                nearest cached page above, so keyset-paged sources can continue
+                from it instead of skipping `offset` rows again. deliver({page:
+                rows}) must be called on the UI thread; a new request supersedes
+                the ones not delivered yet, so the source may drop those.
+            first_page: Rows 0..PAGE_SIZE if already fetched (e.g. off the UI thread)
+        """
+        self.total = total
+        self.load_pages = load_pages
+        self.source += 1
+        self.pages.clear()
+        self.loading.clear()
+        if first_page is not None:
+            self.pages[0] = first_page
+        self.top = 0.0
+        for row in self.pool:
+            row.record = None
+        self._clear_overlay()
+        self._layout()
+
+    def set_records(self, records: List[Dict[str, Any]]):
+        """Show an in-memory list of records"""
+        def load_pages(requests, deliver):
+            deliver({page: records[offset:offset + limit] for page, offset, limit, _anchor in requests})
+
+        self.set_source(len(records), load_pages)
+
+    def show_overlay(self, widget):
+        """Show a widget (empty-state or welcome message) centered over the list"""
+        self._clear_overlay()
+        self.overlay = widget
+        widget.place(relx=0.5, rely=0.4, anchor="center")
+
+    def _clear_overlay(self):
+        if self.overlay is not None:
+            self.overlay.destroy()
+            self.overlay = None
+
+    def scroll_to(self, top: float):
+        """Scroll so that the given pixel offset is at the top"""
+        content = self.total * self.row_height
+        self.top = max(0.0, min(top, content - self._viewport_height()))
+        self._layout()
+
+    def _viewport_height(self) -> float:
+        """Visible height in unscaled pixels (the unit place() expects)"""
+        return self.viewport.winfo_height() / self._get_widget_scaling()
+
+    def _record(self, index: int) -> Optional[Dict[str, Any]]:
+        """
+        Get one row from the page cache
+
+        Returns:
+            The record, PLACEHOLDER if its page isn't loaded, or None past
+            the end of a (shorter than expected) page
+        """
+        page = index // self.PAGE_SIZE
+        rows = self.pages.get(page)
+        if rows is None:
+            return self.PLACEHOLDER
+        self.pages.move_to_end(page)
+
+        position = index - page * self.PAGE_SIZE
+        return rows[position] if position < len(rows) else None
+
+    def _anchor(self, page: int) -> Optional[tuple]:
+        """Last row of the nearest full cached page above a page, as (index, record)"""
+        above = [cached for cached, rows in self.pages.items()
+                 if cached < page and len(rows) == self.PAGE_SIZE]
+        if not above:
+            return None
+        nearest = max(above)
+        return (nearest + 1) * self.PAGE_SIZE - 1, self.pages[nearest][-1]
+
+    def _request_pages(self, pages: List[int]):
+        """Ask the source for the visible pages that aren't cached"""
+        if set(pages) <= self.loading:
+            return  # already on their way
+        # This request supersedes any undelivered one, so it asks for every missing page
+        self.loading = set(pages)
+        source = self.source
+        requests = [(page, page * self.PAGE_SIZE, self.PAGE_SIZE, self._anchor(page)) for page in pages]
+        self.load_pages(requests, lambda loaded: self._receive_pages(source, loaded))
+
+    def _receive_pages(self, source: int, loaded: Dict[int, list]):
+        """Cache delivered pages and show them (ignored if the result set changed)"""
+        if source != self.source:
+            return
+        for page, rows in loaded.items():
+            self.loading.discard(page)
+            self.pages[page] = rows
+            self.pages.move_to_end(page)
+        while len(self.pages) > self.MAX_CACHED_PAGES:
+            self.pages.popitem(last=False)
+        self._layout()
+
+    def _layout(self):
+        """Place and bind the row widgets covering the visible window"""
+        height = self._viewport_height()
+        if height <= 1:
+            return
+
+        # Grow the pool to cover the window; rows are recycled, never destroyed
+        visible = int(height // self.row_height) + 2
+        while len(self.pool) < visible:
+            row = self.create_row(self.viewport)
+            row.record = None
+            self.pool.append(row)
+
+        first = int(self.top // self.row_height)
+        shift = self.top - first * self.row_height
+
+        missing = []
+        for slot, row in enumerate(self.pool):
+            index = first + slot
+            record = self._record(index) if slot < visible and index < self.total else None
+            if record is None:
+                row.place_forget()
+                continue
+            if record is self.PLACEHOLDER and index // self.PAGE_SIZE not in missing:
+                missing.append(index // self.PAGE_SIZE)
+            if row.record is not record:
+                self.bind_row(row, record)
+                row.record = record
+            row.place(x=0, y=slot * self.row_height - shift, relwidth=1.0)
+
+        content = self.total * self.row_height
+        if content <= height:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.top / content, (self.top + height) / content)
+
+        if missing:
+            self._request_pages(missing)
+
+    def _on_scrollbar(self, *args):
+        """Handle scrollbar drags ('moveto', fraction) and clicks ('scroll', n, what)"""
+        if args[0] == 'moveto':
+            self.scroll_to(float(args[1]) * self.total * self.row_height)
+        elif args[0] == 'scroll':
+            step = self._viewport_height() if args[2] == 'pages' else self.row_height
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    def _on_mousewheel(self, event):
+        """Scroll when the wheel turns over the list"""
+        if not str(event.widget).startswith(str(self.viewport)):
+            return
+        if event.num == 4:
+            notches = -1
+        elif event.num == 5:
+            notches = 1
+        elif sys.platform == "darwin":
+            notches = -event.delta
+        else:
+            notches = -event.delta // 120 or (-1 if event.delta > 0 else 1)
+        self.scroll_to(self.top + notches * self.SCROLL_ROWS * self.row_height)
+
+
+class StartupProfiler:
+    """Prints the time since launch at startup milestones (--profile-startup)"""
+
+    def __init__(self, start: float):
+        self.start = start
+        self.seen = set()
+        self._lock = threading.Lock()
+
+    def mark(self, milestone: str):
+        """Report a milestone the first time it is reached"""
+        with self._lock:
+            if milestone in self.seen:
+                return
+            self.seen.add(milestone)
+        print(f"⏱️  {milestone:<22} {(time.perf_counter() - self.start) * 1000:8.1f} ms", flush=True)
+
+
 class MetaFinderGUI(ctk.CTk):
     """Main GUI application for MetaFinder"""
 
-    def __init__(self):
+    RESULT_ROW_HEIGHT = 96  # result card (86px) plus spacing
+    SEARCH_DELAY_MS = 250  # pause in typing before the search runs
+    MAX_THUMBNAIL_IMAGES = 300  # decoded thumbnails kept in memory
+
+    FILE_TYPE_ICONS = {
+        'image': '🖼️',
+        'document': '📄',
+        'audio': '🎵',
+        'video': '🎬',
+        'archive': '📦',
+        'code': '💻',
+        'unknown': '📁'
+    }
+
+    def __init__(self, profiler: Optional[StartupProfiler] = None):
+        """
+        Initialize window
+
+        Args:
+            profiler: Reports startup milestones when given
+        """
+        self.profiler = profiler
+        self._mark("imports done")
         super().__init__()
 
         # Window configuration
@@ -38,24 +321,53 @@ class MetaFinderGUI(ctk.CTk):
         self.minsize(1200, 700)
 
         # State
-        self.db: Optional[DatabaseManager] = None
-        self.scanner: Optional[MetadataScanner] = None
-        self.current_results: List[Dict[str, Any]] = []
+        self.db_path = "data/metafinder.db"
+        self.db: Optional[DatabaseManager] = None  # UI-thread connection, opened once migrated
+        self.database_controls: List[Any] = []  # disabled until the database is open
+        self.scanner = None  # MetadataScanner, created on the first scan
         self.scanning = False
+        self.scan_control: Optional[ScanControl] = None
+        self.similarity_tree = None  # BK-tree cached between "find similar" queries
+        self.index_generation = 0  # bumped whenever a scan may have changed the index
+        self.query_runner: Optional[QueryRunner] = None
+        self.page_runner: Optional[QueryRunner] = None  # result pages fetched while scrolling
+        self.search_job = None  # pending debounced search (after() id)
+        self.thumbnails: Optional[ThumbnailService] = None
+        self.thumbnail_images: OrderedDict = OrderedDict()  # cache key -> CTkImage
+
+        # Draw the window first; opening (and migrating) the database, the
+        # toolchain probe, statistics and dropdown values run in the background
+        self._create_layout()
+        self._set_database_controls("disabled")
+        self._mark("window created")
+        self.after_idle(self._start_background_loading)
 
-        # Check requirements
-        if not self._check_requirements():
-            return
+    def _mark(self, milestone: str):
+        """Record a startup milestone (no-op unless profiling)"""
+        if self.profiler is not None:
+            self.profiler.mark(milestone)
+
+    def _start_background_loading(self):
+        """Kick off deferred startup work once the window has been drawn"""
+        self.update_idletasks()
+        self._mark("first paint")
+
+        thread = threading.Thread(target=self._check_requirements_thread)
+        thread.daemon = True
+        thread.start()
 
-        # Initialize components
-        self._init_database()
-        self._create_layout()
         self._load_initial_data()
 
-    def _check_requirements(self) -> bool:
-        """Check if all requirements are met"""
-        reqs = check_requirements()
+    def _check_requirements_thread(self):
+        """Probe the toolchain in background thread"""
+        from metafinder.scanner import check_requirements, toolchain_cache
+
+        reqs = check_requirements(toolchain_cache(self.db_path))
+        self._mark("toolchain probed")
+        self.after(0, lambda: self._check_requirements(reqs))
 
+    def _check_requirements(self, reqs: Dict[str, bool]) -> bool:
+        """Check if all requirements are met"""
         if not reqs['pyexiftool']:
             messagebox.showerror(
                 "Missing Dependency",
@@ -83,10 +395,37 @@ class MetaFinderGUI(ctk.CTk):
         return True
 
     def _init_database(self):
-        """Initialize database connection"""
-        db_path = "data/metafinder.db"
+        """Connect the UI to a database the init thread has opened and migrated"""
+        db_path = self.db_path
         self.db = DatabaseManager(db_path)
-        self.scanner = MetadataScanner(self.db)
+
+        # Image previews are rendered off the UI thread and cached on disk
+        if PIL_AVAILABLE:
+            self.thumbnails = ThumbnailService(str(Path(db_path).parent / 'thumbnails'))
+
+        # Filter queries run on a worker; only the latest result is shown
+        self.query_runner = QueryRunner(
+            db_path,
+            on_result=lambda generation, result: self.after(
+                0, lambda: self._show_query_results(generation, result)),
+            on_error=lambda generation, error: self.after(
+                0, lambda: self._query_error(generation, error))
+        )
+
+        # Result pages load on their own worker, so scrolling never waits on
+        # SQLite; only the pages for the latest scroll position are fetched
+        self.page_runner = QueryRunner(
+            db_path,
+            on_result=lambda generation, result: self.after(0, lambda: result[0](result[1])),
+            on_error=lambda generation, error: self.after(
+                0, lambda: self._page_error(error))
+        )
+
+    def _set_database_controls(self, state: str):
+        """Enable or disable the controls that need the database"""
+        for widget in self.database_controls:
+            if widget.winfo_exists():
+                widget.configure(state=state)
 
     def _create_layout(self):
         """Create the main layout"""
@@ -130,6 +469,30 @@ class MetaFinderGUI(ctk.CTk):
             font=ctk.CTkFont(size=14, weight="bold")
         )
         self.scan_button.grid(row=0, column=2, padx=20, pady=20)
+        self.database_controls.append(self.scan_button)
+
+        # Pause/Stop controls, shown only while a scan runs
+        self.scan_controls = ctk.CTkFrame(top_frame, fg_color="transparent")
+        self.scan_controls.grid(row=0, column=1, sticky="e")
+        self.pause_button = ctk.CTkButton(
+            self.scan_controls,
+            text="⏸️ Pause",
+            command=self._toggle_pause_scan,
+            width=100,
+            height=40
+        )
+        self.pause_button.grid(row=0, column=0, padx=(0, 10))
+        self.stop_button = ctk.CTkButton(
+            self.scan_controls,
+            text="⏹️ Stop",
+            command=self._stop_scan,
+            width=100,
+            height=40,
+            fg_color="#C92A2A",
+            hover_color="#E03131"
+        )
+        self.stop_button.grid(row=0, column=1)
+        self.scan_controls.grid_remove()
 
         # Stats button
         stats_button = ctk.CTkButton(
@@ -140,6 +503,18 @@ class MetaFinderGUI(ctk.CTk):
             height=40
         )
         stats_button.grid(row=0, column=3, padx=(0, 20), pady=20)
+        self.database_controls.append(stats_button)
+
+        # Timeline button
+        timeline_button = ctk.CTkButton(
+            top_frame,
+            text="📅 Timeline",
+            command=self._show_timeline,
+            width=120,
+            height=40
+        )
+        timeline_button.grid(row=0, column=4, padx=(0, 20), pady=20)
+        self.database_controls.append(timeline_button)
 
     def _create_filter_panel(self):
         """Create left sidebar with filters"""
@@ -165,6 +540,7 @@ class MetaFinderGUI(ctk.CTk):
         )
         self.search_entry.grid(row=2, column=0, padx=20, pady=(0, 20), sticky="ew")
         self.search_entry.bind("<Return>", lambda e: self._apply_filters())
+        self.search_entry.bind("<KeyRelease>", self._schedule_search)
 
         # File Type filter
         ctk.CTkLabel(filter_frame, text="File Type:", anchor="w").grid(
@@ -202,6 +578,7 @@ class MetaFinderGUI(ctk.CTk):
         )
         self.author_entry.grid(row=8, column=0, padx=20, pady=(0, 20), sticky="ew")
         self.author_entry.bind("<Return>", lambda e: self._apply_filters())
+        self.author_entry.bind("<KeyRelease>", self._schedule_search)
 
         # Camera filter
         ctk.CTkLabel(filter_frame, text="Camera:", anchor="w").grid(
@@ -236,6 +613,9 @@ class MetaFinderGUI(ctk.CTk):
         )
         clear_button.grid(row=12, column=0, padx=20, pady=(0, 20), sticky="ew")
 
+        self.database_controls += [self.search_entry, self.type_menu, self.extension_menu,
+                                   self.author_entry, self.camera_menu, apply_button, clear_button]
+
     def _create_results_panel(self):
         """Create center panel for results"""
         results_frame = ctk.CTkFrame(self, corner_radius=0)
@@ -256,13 +636,26 @@ class MetaFinderGUI(ctk.CTk):
         )
         self.results_label.grid(row=0, column=0, sticky="w")
 
-        # Scrollable results area
-        self.results_scroll = ctk.CTkScrollableFrame(
+        # Export button
+        self.export_button = ctk.CTkButton(
+            header_frame,
+            text="📤 Export",
+            command=self._export_results,
+            width=100,
+            height=32
+        )
+        self.export_button.grid(row=0, column=2, sticky="e")
+        self.database_controls.append(self.export_button)
+
+        # Virtualized results area (widgets only for visible rows)
+        self.results_list = VirtualResultList(
             results_frame,
+            row_height=self.RESULT_ROW_HEIGHT,
+            create_row=self._create_result_row,
+            bind_row=self._bind_result_row,
             fg_color="transparent"
         )
-        self.results_scroll.grid(row=1, column=0, sticky="nsew", padx=20, pady=(0, 20))
-        self.results_scroll.grid_columnconfigure(0, weight=1)
+        self.results_list.grid(row=1, column=0, sticky="nsew", padx=20, pady=(0, 20))
 
         # Welcome message
         self._show_welcome_message()
@@ -281,8 +674,7 @@ class MetaFinderGUI(ctk.CTk):
 
     def _show_welcome_message(self):
         """Show welcome message when no files"""
-        welcome_frame = ctk.CTkFrame(self.results_scroll)
-        welcome_frame.grid(row=0, column=0, sticky="ew", pady=100)
+        welcome_frame = ctk.CTkFrame(self.results_list.viewport)
 
         welcome_label = ctk.CTkLabel(
             welcome_frame,
@@ -314,30 +706,86 @@ class MetaFinderGUI(ctk.CTk):
             font=ctk.CTkFont(size=16, weight="bold")
         )
         scan_welcome_button.pack(pady=40)
+        self.database_controls.append(scan_welcome_button)
+        if self.db is None:
+            scan_welcome_button.configure(state="disabled")
+
+        self.results_list.show_overlay(welcome_frame)
 
     def _load_initial_data(self):
-        """Load initial data and populate filters"""
-        # Load existing files if any
-        stats = self.db.get_statistics()
+        """Load statistics and filter values without blocking the window"""
+        self._update_status("Loading database...")
+
+        thread = threading.Thread(target=self._load_initial_data_thread)
+        thread.daemon = True
+        thread.start()
+
+    def _load_initial_data_thread(self):
+        """Open the database, then run the startup aggregates, in background thread"""
+        try:
+            # Schema migrations, backfills and timeline rebuilds happen here,
+            # so a large existing database doesn't hold up the first paint.
+            # sqlite3 connections are bound to their creating thread.
+            db = DatabaseManager(self.db_path)
+        except Exception as e:
+            error = str(e)
+            self.after(0, lambda: self._update_status(f"Could not open database: {error}"))
+            return
+        self._mark("database opened")
+        self.after(0, self._database_ready)
+
+        try:
+            stats = db.get_statistics()
+            values = self._query_filter_values(db) if stats['total_files'] > 0 else {}
+            self._mark("statistics loaded")
+            self.after(0, lambda: self._initial_data_loaded(stats, values))
+        except Exception as e:
+            error = str(e)
+            self.after(0, lambda: self._update_status(f"Could not load database: {error}"))
+        finally:
+            db.close()
+
+    def _database_ready(self):
+        """Connect the UI to the migrated database and enable its controls"""
+        self._init_database()
+        self._set_database_controls("normal")
 
+    def _initial_data_loaded(self, stats: Dict[str, Any], values: Dict[str, List[str]]):
+        """Show the loaded database"""
         if stats['total_files'] > 0:
             self._update_status(f"Database loaded: {stats['total_files']} files")
-            self._populate_filters()
+            self._set_filter_values(values)
             self._apply_filters()
         else:
             self._update_status("No files in database. Click 'Scan Folder' to start.")
 
-    def _populate_filters(self):
+    def _query_filter_values(self, db: DatabaseManager) -> Dict[str, List[str]]:
+        """Get the dropdown values (any thread, with that thread's connection)"""
+        return {
+            'extension': db.get_unique_values('extension', limit=50),
+            'camera_make': db.get_unique_values('camera_make', limit=30),
+        }
+
+    def _set_filter_values(self, values: Dict[str, List[str]]):
         """Populate filter dropdowns with available values"""
-        # Get unique extensions
-        extensions = self.db.get_unique_values('extension', limit=50)
-        if extensions:
-            self.extension_menu.configure(values=["All"] + extensions)
+        if values.get('extension'):
+            self.extension_menu.configure(values=["All"] + values['extension'])
+        if values.get('camera_make'):
+            self.camera_menu.configure(values=["All"] + values['camera_make'])
 
-        # Get unique camera makes
-        cameras = self.db.get_unique_values('camera_make', limit=30)
-        if cameras:
-            self.camera_menu.configure(values=["All"] + cameras)
+    def _populate_filters(self):
+        """Refresh filter dropdowns in the background"""
+        def load():
+            db = DatabaseManager(self.db_path)
+            try:
+                values = self._query_filter_values(db)
+            finally:
+                db.close()
+            self.after(0, lambda: self._set_filter_values(values))
+
+        thread = threading.Thread(target=load)
+        thread.daemon = True
+        thread.start()
 
     def _scan_folder(self):
         """Open folder dialog and scan"""
@@ -360,26 +808,63 @@ class MetaFinderGUI(ctk.CTk):
 
         # Start scan in background thread
         self.scanning = True
+        self.scan_control = ScanControl()
         self.scan_button.configure(state="disabled", text="⏳ Scanning...")
+        self.pause_button.configure(state="normal", text="⏸️ Pause")
+        self.stop_button.configure(state="normal")
+        self.scan_controls.grid()
         self._update_status("Starting scan...")
 
-        thread = threading.Thread(target=self._scan_folder_thread, args=(folder,))
+        thread = threading.Thread(target=self._scan_folder_thread, args=(folder, self.scan_control))
         thread.daemon = True
         thread.start()
 
-    def _scan_folder_thread(self, folder: str):
+    def _toggle_pause_scan(self):
+        """Pause or resume the running scan"""
+        if self.scan_control.paused:
+            self.scan_control.resume()
+            self.pause_button.configure(text="⏸️ Pause")
+            self._update_status("Resuming scan...")
+        else:
+            self.scan_control.pause()
+            self.pause_button.configure(text="▶️ Resume")
+            self._update_status("Pausing after the current batch...")
+
+    def _stop_scan(self):
+        """Stop the running scan, keeping every file already extracted"""
+        self.scan_control.cancel()
+        self.pause_button.configure(state="disabled")
+        self.stop_button.configure(state="disabled")
+        self._update_status("Stopping after the current batch...")
+
+    def _end_scan(self):
+        """Reset scan state and controls"""
+        self.scanning = False
+        self.scan_control = None
+        self.scan_controls.grid_remove()
+        self.scan_button.configure(state="normal", text="🔍 Scan Folder")
+
+    def _scan_folder_thread(self, folder: str, control: ScanControl):
         """Scan folder in background thread"""
         try:
-            def progress_callback(current, total, filename):
-                percent = (current / total) * 100
-                self.after(0, lambda: self._update_status(
-                    f"Scanning: {current}/{total} ({percent:.1f}%) - {filename[:50]}"
-                ))
-
+            if self.scanner is None:
+                from metafinder.scanner import MetadataScanner
+                self.scanner = MetadataScanner(self.db)
+
+            # Snapshots arrive a few times per second, not once per file
+            def progress_callback(progress):
+                message = f"Scanning: {format_progress(progress)}"
+                if progress['current_file']:
+                    message += f" - {progress['current_file'][:50]}"
+                self.after(0, lambda: self._update_status(message))
+
+            # Newest files first, so recent work is searchable early in a long scan
             stats = self.scanner.scan_folder(
                 folder,
                 recursive=True,
-                progress_callback=progress_callback
+                progress_callback=progress_callback,
+                control=control,
+                priority=ScanPriority(recent_first=True)
             )
 
             # Update UI on completion
@@ -390,31 +875,46 @@ class MetaFinderGUI(ctk.CTk):
 
     def _scan_complete(self, stats: Dict[str, Any]):
         """Handle scan completion"""
-        self.scanning = False
-        self.scan_button.configure(state="normal", text="🔍 Scan Folder")
+        self._end_scan()
 
-        messagebox.showinfo(
-            "Scan Complete",
-            f"Successfully scanned {stats['scanned']}/{stats['total']} files\n"
-            f"Success rate: {stats['success_rate']:.1f}%"
-        )
-
-        self._update_status(f"Scan complete: {stats['scanned']} files indexed")
+        if stats.get('cancelled'):
+            messagebox.showinfo(
+                "Scan Stopped",
+                f"Scan stopped: {stats['scanned']} files indexed, "
+                f"{stats['skipped']} files not scanned"
+            )
+            self._update_status(f"Scan stopped: {stats['scanned']} files indexed")
+        else:
+            messagebox.showinfo(
+                "Scan Complete",
+                f"Successfully scanned {stats['scanned']}/{stats['total']} files\n"
+                f"Success rate: {stats['success_rate']:.1f}%"
+            )
+            self._update_status(f"Scan complete: {stats['scanned']} files indexed")
+        self._index_changed()
         self._populate_filters()
         self._apply_filters()
 
     def _scan_error(self, error: str):
         """Handle scan error"""
-        self.scanning = False
-        self.scan_button.configure(state="normal", text="🔍 Scan Folder")
+        self._end_scan()
+        self._index_changed()  # batches written before the error are already in
 
         messagebox.showerror("Scan Error", f"Error during scan:\n{error}")
         self._update_status("Scan failed")
 
-    def _apply_filters(self):
-        """Apply current filters and update results"""
-        # Build search parameters
-        search_params = {'limit': 100}
+    def _index_changed(self):
+        """Drop caches derived from the index contents"""
+        self.index_generation += 1
+        self.similarity_tree = None
+
+    def _current_filters(self) -> Dict[str, Any]:
+        """Build search filters from the filter panel"""
+        search_params = {}
+
+        text_query = self.search_entry.get().strip()
+        if text_query:
+            search_params['text_query'] = text_query
 
         if self.type_var.get() != "All":
             search_params['file_type'] = self.type_var.get()
@@ -429,11 +929,137 @@ class MetaFinderGUI(ctk.CTk):
         if self.camera_var.get() != "All":
             search_params['camera_make'] = self.camera_var.get()
 
-        # Search
-        self.current_results = self.db.search_files(**search_params)
+        return search_params
+
+    def _schedule_search(self, event=None):
+        """Search once typing pauses (debounced search-as-you-type)"""
+        if event is not None and event.keysym in ("Return", "Tab"):
+            return
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(self.SEARCH_DELAY_MS, self._apply_filters)
+
+    def _apply_filters(self):
+        """Apply current filters and update results"""
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+            self.search_job = None
 
-        # Update display
-        self._display_results()
+        filters = self._current_filters()
+        self._update_status("Searching...")
+
+        # Runs on the query worker; supersedes (and aborts) any search in flight
+        def query(db: DatabaseManager):
+            count = db.count_files(**filters)
+            first_page = db.search_files(limit=VirtualResultList.PAGE_SIZE, **filters) if count else []
+            return filters, count, first_page
+
+        self.query_runner.submit(query)
+
+    def _show_query_results(self, generation: int, result):
+        """Display a finished filter query (ignored if a newer one was started)"""
+        if not self.query_runner.is_current(generation):
+            return
+
+        filters, count, first_page = result
+
+        # Later pages are pulled on demand as the list scrolls
+        self.results_list.set_source(
+            count,
+            lambda requests, deliver: self._load_result_pages(filters, requests, deliver),
+            first_page=first_page
+        )
+        self._show_result_count(f"📄 Results ({count:,} files)", count)
+        self._update_status(f"Found {count:,} files")
+        self._mark("first results")
+
+    def _load_result_pages(self, filters: Dict[str, Any], requests: List[tuple], deliver: Callable):
+        """Fetch result pages on the page worker; deliver() runs on the UI thread"""
+        def query(db: DatabaseManager):
+            pages = {}
+            for page, offset, limit, anchor in sorted(requests, key=lambda request: request[0]):
+                # Pages fetched together chain from each other's last row
+                previous = pages.get(page - 1)
+                if previous and len(previous) == limit:
+                    anchor = (offset - 1, previous[-1])
+                pages[page] = self._fetch_results_page(db, filters, offset, limit, anchor)
+            return deliver, pages
+
+        self.page_runner.submit(query)
+
+    def _page_error(self, error: str):
+        """Handle a failed page fetch (scrolling requests the page again)"""
+        self.results_list.loading.clear()
+        self._update_status(f"Could not load results: {error}")
+
+    @staticmethod
+    def _fetch_results_page(db: DatabaseManager, filters: Dict[str, Any],
+                            offset: int, limit: int, anchor) -> List[Dict[str, Any]]:
+        """Fetch rows offset..offset+limit, continuing after an anchor row when there is one"""
+        if anchor is None:
+            return db.search_files(offset=offset, limit=limit, **filters)
+        index, record = anchor
+        return db.search_files(after=DatabaseManager.page_key(record), offset=offset - index - 1,
+                               limit=limit, **filters)
+
+    def _query_error(self, generation: int, error: str):
+        """Handle a failed filter query"""
+        if self.query_runner.is_current(generation):
+            self._update_status(f"Search failed: {error}")
+
+    def _export_results(self):
+        """Export all files matching the current filters"""
+        output = filedialog.asksaveasfilename(
+            title="Export Results",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")]
+        )
+        if not output:
+            return
+
+        self.export_button.configure(state="disabled")
+        self._update_status("Exporting...")
+
+        thread = threading.Thread(
+            target=self._export_results_thread,
+            args=(output, self._current_filters())
+        )
+        thread.daemon = True
+        thread.start()
+
+    def _export_results_thread(self, output: str, filters: Dict[str, Any]):
+        """Stream export in background thread"""
+        # sqlite3 connections are bound to their creating thread
+        db = DatabaseManager(self.db_path)
+        try:
+            def progress_callback(rows):
+                self.after(0, lambda: self._update_status(f"Exporting: {rows} rows written..."))
+
+            stats = ResultExporter(db).export(
+                output,
+                progress_callback=progress_callback,
+                **filters
+            )
+            self.after(0, lambda: self._export_complete(stats))
+        except Exception as e:
+            error = str(e)
+            self.after(0, lambda: self._export_error(error))
+        finally:
+            db.close()
+
+    def _export_complete(self, stats: Dict[str, Any]):
+        """Handle export completion"""
+        self.export_button.configure(state="normal")
+        self._update_status(
+            f"Exported {stats['rows']} files to {Path(stats['output']).name} "
+            f"({self._format_size(stats.get('bytes', 0))})"
+        )
+
+    def _export_error(self, error: str):
+        """Handle export error"""
+        self.export_button.configure(state="normal")
+        messagebox.showerror("Export Error", f"Error during export:\n{error}")
+        self._update_status("Export failed")
 
     def _clear_filters(self):
         """Clear all filters"""
@@ -444,102 +1070,200 @@ class MetaFinderGUI(ctk.CTk):
         self.search_entry.delete(0, 'end')
         self._apply_filters()
 
-    def _display_results(self):
-        """Display search results"""
-        # Clear existing results
-        for widget in self.results_scroll.winfo_children():
-            widget.destroy()
-
-        # Update count
-        count = len(self.current_results)
-        self.results_label.configure(text=f"📄 Results ({count} files)")
+    def _show_result_count(self, title: str, count: int):
+        """Update the results header and the empty-state message"""
+        self.results_label.configure(text=title)
 
         if count == 0:
-            # No results message
             no_results = ctk.CTkLabel(
-                self.results_scroll,
+                self.results_list.viewport,
                 text="No files found matching your filters",
                 font=ctk.CTkFont(size=16),
                 text_color="gray"
             )
-            no_results.grid(row=0, column=0, pady=100)
-            return
-
-        # Display results
-        for i, record in enumerate(self.current_results):
-            self._create_result_card(record, i)
+            self.results_list.show_overlay(no_results)
 
-    def _create_result_card(self, record: Dict[str, Any], row: int):
-        """Create a result card for a file"""
-        card = ctk.CTkFrame(self.results_scroll)
-        card.grid(row=row, column=0, sticky="ew", pady=5)
+    def _create_result_row(self, parent) -> ctk.CTkFrame:
+        """Create an empty result card; filled in by _bind_result_row"""
+        card = ctk.CTkFrame(parent, height=self.RESULT_ROW_HEIGHT - 10)
+        card.grid_propagate(False)
         card.grid_columnconfigure(1, weight=1)
 
-        # Icon based on type
-        icon_map = {
-            'image': '🖼️',
-            'document': '📄',
-            'audio': '🎵',
-            'video': '🎬',
-            'archive': '📦',
-            'code': '💻',
-            'unknown': '📁'
-        }
-        icon = icon_map.get(record['file_type'], '📁')
-
         # Icon
-        icon_label = ctk.CTkLabel(card, text=icon, font=ctk.CTkFont(size=32))
-        icon_label.grid(row=0, column=0, rowspan=3, padx=20, pady=10)
+        card.icon_label = ctk.CTkLabel(
+            card,
+            text="",
+            font=ctk.CTkFont(size=32),
+            width=THUMBNAIL_SIZE,
+            height=THUMBNAIL_SIZE
+        )
+        card.icon_label.grid(row=0, column=0, rowspan=3, padx=20, pady=10)
 
         # Filename
-        name_label = ctk.CTkLabel(
+        card.name_label = ctk.CTkLabel(
             card,
-            text=record['name'],
+            text="",
             font=ctk.CTkFont(size=14, weight="bold"),
             anchor="w"
         )
-        name_label.grid(row=0, column=1, sticky="w", padx=10, pady=(10, 2))
+        card.name_label.grid(row=0, column=1, sticky="w", padx=10, pady=(10, 0))
 
         # Metadata line
-        metadata_parts = []
-        if record.get('author'):
-            metadata_parts.append(f"Author: {record['author']}")
-        if record.get('camera_make'):
-            metadata_parts.append(f"Camera: {record['camera_make']} {record.get('camera_model', '')}")
-        if record.get('size'):
-            size_str = self._format_size(record['size'])
-            metadata_parts.append(f"Size: {size_str}")
-
-        if metadata_parts:
-            metadata_label = ctk.CTkLabel(
-                card,
-                text=" • ".join(metadata_parts[:3]),
-                font=ctk.CTkFont(size=12),
-                text_color="gray",
-                anchor="w"
-            )
-            metadata_label.grid(row=1, column=1, sticky="w", padx=10, pady=2)
+        card.metadata_label = ctk.CTkLabel(
+            card,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color="gray",
+            anchor="w"
+        )
+        card.metadata_label.grid(row=1, column=1, sticky="w", padx=10)
 
         # Path
-        path_label = ctk.CTkLabel(
+        card.path_label = ctk.CTkLabel(
             card,
-            text=record['path'],
+            text="",
             font=ctk.CTkFont(size=11),
             text_color="gray",
             anchor="w"
         )
-        path_label.grid(row=2, column=1, sticky="w", padx=10, pady=(2, 10))
+        card.path_label.grid(row=2, column=1, sticky="w", padx=10, pady=(0, 10))
 
-        # Open button
+        # Open button (rows are recycled, so look the record up at click time)
         open_button = ctk.CTkButton(
             card,
             text="Open",
-            command=lambda: self._open_file(record['path']),
+            command=lambda: card.record and self._open_file(card.record['path']),
             width=80,
             height=32
         )
         open_button.grid(row=0, column=2, rowspan=3, padx=20, pady=10)
 
+        # Right-click context menu
+        for widget in card.winfo_children() + [card]:
+            widget.bind("<Button-3>", lambda event: card.record and self._show_card_menu(event, card.record))
+
+        return card
+
+    def _bind_result_row(self, card: ctk.CTkFrame, record: Dict[str, Any]):
+        """Show a file in a (possibly recycled) result card"""
+        if record is VirtualResultList.PLACEHOLDER:
+            card.icon_label.configure(image=None, text="⏳")
+            card.name_label.configure(text="Loading...")
+            card.metadata_label.configure(text="")
+            card.path_label.configure(text="")
+            return
+
+        image = None
+        if self.thumbnails is not None and record['file_type'] == 'image':
+            image = self._thumbnail_for(record)
+        if image is not None:
+            card.icon_label.configure(image=image, text="")
+        else:
+            card.icon_label.configure(image=None, text=self.FILE_TYPE_ICONS.get(record['file_type'], '📁'))
+        card.name_label.configure(text=record['name'])
+
+        metadata_parts = []
+        if record.get('author'):
+            metadata_parts.append(f"Author: {record['author']}")
+        if record.get('camera_make'):
+            metadata_parts.append(f"Camera: {record['camera_make']} {record.get('camera_model') or ''}")
+        if record.get('size'):
+            size_str = self._format_size(record['size'])
+            metadata_parts.append(f"Size: {size_str}")
+        card.metadata_label.configure(text=" • ".join(metadata_parts[:3]))
+
+        card.path_label.configure(text=record['path'])
+
+    def _thumbnail_for(self, record: Dict[str, Any]) -> Optional[ctk.CTkImage]:
+        """
+        Get a loaded thumbnail, or request it in the background
+
+        Returns:
+            CTkImage if already in memory, else None (the card is updated
+            by _show_thumbnail when the worker is done)
+        """
+        key = (record['path'], record.get('modified'), record.get('size'))
+        image = self.thumbnail_images.get(key)
+        if image is not None:
+            self.thumbnail_images.move_to_end(key)
+            return image
+
+        def loaded(path, thumbnail_file):
+            if thumbnail_file is None:
+                return
+            # Decode on the worker; only the widget update runs on the UI thread
+            from PIL import Image
+            try:
+                with Image.open(thumbnail_file) as thumbnail:
+                    thumbnail.load()
+            except Exception:
+                return
+            self.after(0, lambda: self._show_thumbnail(key, thumbnail))
+
+        self.thumbnails.request(record['path'], record.get('modified'), record.get('size'), loaded)
+        return None
+
+    def _show_thumbnail(self, key, thumbnail):
+        """Cache a decoded thumbnail and show it on the cards still displaying its file"""
+        image = ctk.CTkImage(light_image=thumbnail, dark_image=thumbnail, size=thumbnail.size)
+        self.thumbnail_images[key] = image
+        if len(self.thumbnail_images) > self.MAX_THUMBNAIL_IMAGES:
+            self.thumbnail_images.popitem(last=False)
+
+        for card in self.results_list.pool:
+            record = card.record
+            if record and (record['path'], record.get('modified'), record.get('size')) == key:
+                card.icon_label.configure(image=image, text="")
+
+    def _show_card_menu(self, event, record: Dict[str, Any]):
+        """Show the context menu of a result card"""
+        menu = Menu(self, tearoff=0)
+        menu.add_command(label="Open", command=lambda: self._open_file(record['path']))
+        menu.add_command(
+            label="Find similar images",
+            command=lambda: self._find_similar(record),
+            state="normal" if record.get('phash') else "disabled"
+        )
+        menu.tk_popup(event.x_root, event.y_root)
+
+    def _find_similar(self, record: Dict[str, Any]):
+        """Search for near-duplicates of an image"""
+        self._update_status(f"Finding images similar to {record['name']}...")
+
+        thread = threading.Thread(target=self._find_similar_thread, args=(record,))
+        thread.daemon = True
+        thread.start()
+
+    def _find_similar_thread(self, record: Dict[str, Any]):
+        """Query the perceptual hash index in background thread"""
+        # sqlite3 connections are bound to their creating thread
+        from metafinder.similarity import SimilarityIndex, parse_hash
+
+        db = DatabaseManager(self.db_path)
+        try:
+            generation = self.index_generation
+            index = SimilarityIndex(db, tree=self.similarity_tree)
+            if index.tree is None:
+                index.load()  # built once, reused by the next queries
+            results = index.find_similar(parse_hash(record['phash']), exclude_id=record['id'])
+            # A scan that finished meanwhile makes this tree stale; don't cache it
+            if generation == self.index_generation:
+                self.similarity_tree = index.tree
+            self.after(0, lambda: self._show_similar(record, results))
+        except Exception as e:
+            error = str(e)
+            self.after(0, lambda: self._update_status(f"Similar image search failed: {error}"))
+        finally:
+            db.close()
+
+    def _show_similar(self, record: Dict[str, Any], results):
+        """Display near-duplicates, closest first, after the query image"""
+        # Don't let a filter search still in flight replace these results
+        self.query_runner.cancel()
+        self.results_list.set_records([record] + [match for _, match in results])
+        self._show_result_count(f"🖼️ Similar to {record['name']} ({len(results)} files)", len(results) + 1)
+        self._update_status(f"Found {len(results)} similar images")
+
     def _open_file(self, path: str):
         """Open file in default application"""
         try:
@@ -617,6 +1341,110 @@ class MetaFinderGUI(ctk.CTk):
                     font=ctk.CTkFont(size=14)
                 ).pack(pady=2)
 
+    def _show_timeline(self):
+        """Show date histogram dialog (honours the current filters)"""
+        self.timeline_field = 'date_taken'
+        self.timeline_period: Optional[str] = None
+
+        timeline_window = ctk.CTkToplevel(self)
+        timeline_window.title("MetaFinder Timeline")
+        timeline_window.geometry("600x600")
+
+        # Header: back button, title, date field selector
+        header = ctk.CTkFrame(timeline_window, fg_color="transparent")
+        header.pack(fill="x", padx=20, pady=(20, 10))
+
+        self.timeline_back = ctk.CTkButton(
+            header,
+            text="◀ Back",
+            command=self._timeline_up,
+            width=80
+        )
+        self.timeline_back.pack(side="left")
+
+        self.timeline_title = ctk.CTkLabel(
+            header,
+            text="",
+            font=ctk.CTkFont(size=20, weight="bold")
+        )
+        self.timeline_title.pack(side="left", padx=20)
+
+        field_selector = ctk.CTkSegmentedButton(
+            header,
+            values=["Date taken", "Modified"],
+            command=self._timeline_field_changed
+        )
+        field_selector.set("Date taken")
+        field_selector.pack(side="right")
+
+        self.timeline_bars = ctk.CTkScrollableFrame(timeline_window)
+        self.timeline_bars.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        self.timeline_bars.grid_columnconfigure(1, weight=1)
+
+        self._render_timeline()
+
+    def _render_timeline(self):
+        """Draw one bar per year, month or day of the current period"""
+        period = self.timeline_period
+        granularity = 'year' if not period else ('month' if len(period) == 4 else 'day')
+        buckets = self.db.get_timeline(
+            field=self.timeline_field,
+            granularity=granularity,
+            period=period,
+            **self._current_filters()
+        )
+
+        self.timeline_title.configure(text=f"📅 {period or 'All years'}")
+        self.timeline_back.configure(state="normal" if period else "disabled")
+
+        for widget in self.timeline_bars.winfo_children():
+            widget.destroy()
+
+        if not buckets:
+            ctk.CTkLabel(
+                self.timeline_bars,
+                text="No dated files match your filters",
+                text_color="gray"
+            ).grid(row=0, column=0, columnspan=3, pady=50)
+            return
+
+        peak = max(buckets.values())
+        for row, (bucket, count) in enumerate(buckets.items()):
+            # Days are the finest level; years and months drill down
+            ctk.CTkButton(
+                self.timeline_bars,
+                text=bucket,
+                width=110,
+                command=lambda b=bucket: self._timeline_drill(b),
+                state="normal" if granularity != 'day' else "disabled"
+            ).grid(row=row, column=0, padx=(0, 10), pady=3, sticky="w")
+
+            bar = ctk.CTkProgressBar(self.timeline_bars)
+            bar.set(count / peak)
+            bar.grid(row=row, column=1, sticky="ew", pady=3)
+
+            ctk.CTkLabel(
+                self.timeline_bars,
+                text=str(count),
+                width=60
+            ).grid(row=row, column=2, padx=(10, 0), pady=3)
+
+    def _timeline_drill(self, bucket: str):
+        """Zoom into a year or month"""
+        self.timeline_period = bucket
+        self._render_timeline()
+
+    def _timeline_up(self):
+        """Zoom out one level"""
+        period = self.timeline_period
+        self.timeline_period = period[:4] if period and len(period) > 4 else None
+        self._render_timeline()
+
+    def _timeline_field_changed(self, value: str):
+        """Switch between date taken and modification date"""
+        self.timeline_field = 'date_taken' if value == "Date taken" else 'modified'
+        self._render_timeline()
+
     def _update_status(self, message: str):
         """Update status bar"""
         self.status_label.configure(text=message)
@@ -632,7 +1460,13 @@ class MetaFinderGUI(ctk.CTk):
 
 def main():
     """Main entry point"""
-    app = MetaFinderGUI()
+    parser = argparse.ArgumentParser(description='MetaFinder GUI')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Print the time to each startup milestone')
+    args = parser.parse_args()
+
+    profiler = StartupProfiler(_LAUNCH_TIME) if args.profile_startup else None
+    app = MetaFinderGUI(profiler)
     app.mainloop()
 
 
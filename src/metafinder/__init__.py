@@ -2,15 +2,37 @@
 MetaFinder - Universal File Metadata Extraction and Filtering System
 """
 
+import importlib
+
 __version__ = "0.1.0"
 __author__ = "MetaFinder Team"
 
-from .scanner import MetadataScanner
-from .database import DatabaseManager
-from .normalizer import MetadataNormalizer
+# Public name -> defining module. Modules are imported on first access, so
+# importing the package (e.g. for DatabaseManager) doesn't pull in the
+# scanner, PyExifTool or Pillow.
+_EXPORTS = {
+    "MetadataScanner": "scanner",
+    "DatabaseManager": "database",
+    "MetadataNormalizer": "normalizer",
+    "FileRecord": "records",
+    "ResultExporter": "exporter",
+    "DumpImporter": "importer",
+    "IndexMaintainer": "maintenance",
+    "FolderWatcher": "watcher",
+    "SimilarityIndex": "similarity",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = [
-    "MetadataScanner",
-    "DatabaseManager",
-    "MetadataNormalizer",
-]
+def __dir__():
+    return sorted(list(globals()) + __all__)
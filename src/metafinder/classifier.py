@@ -0,0 +1,251 @@
+"""
+File type classifier for MetaFinder
+Maps MIME types, extensions and magic bytes to MetaFinder file types
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Iterable
+
+
+# A signature matches when every (offset, bytes) part is found in the header
+Signature = Tuple[Tuple[int, bytes], ...]
+
+
+class FileTypeClassifier:
+    """
+    Registry of file types with O(1) MIME/extension lookups
+
+    Lookups go MIME type -> extension -> header sniffing. The sniffing
+    fallback reads a few hundred bytes, so it also works before ExifTool
+    has run (e.g. to skip or route files during discovery).
+    """
+
+    UNKNOWN = 'unknown'
+
+    # Enough header bytes for every registered signature (tar magic at 257)
+    SNIFF_BYTES = 512
+
+    def __init__(self):
+        """Initialize an empty registry"""
+        self._by_mime: Dict[str, str] = {}
+        self._by_extension: Dict[str, str] = {}
+        self._signatures: List[Tuple[Signature, str, str]] = []
+        self._sniff_bytes = 0
+
+    def register(self,
+                 file_type: str,
+                 mime_types: Iterable[str] = (),
+                 extensions: Iterable[str] = ()):
+        """
+        Register MIME types and extensions for a file type
+
+        Args:
+            file_type: MetaFinder file type (image, document, ...)
+            mime_types: MIME types belonging to the type
+            extensions: Extensions with leading dot (e.g. '.jpg')
+        """
+        for mime_type in mime_types:
+            self._by_mime[mime_type.lower()] = file_type
+        for extension in extensions:
+            self._by_extension[extension.lower()] = file_type
+
+    def register_signature(self, file_type: str, mime_type: str, *parts: Tuple[int, bytes]):
+        """
+        Register a magic-byte signature
+
+        Signatures are tried in registration order, so register more
+        specific ones (e.g. RIFF....WAVE) before generic prefixes.
+
+        Args:
+            file_type: MetaFinder file type
+            mime_type: MIME type reported for matching files
+            *parts: (offset, bytes) pairs that must all match
+        """
+        self._signatures.append((tuple(parts), file_type, mime_type))
+        end = max(offset + len(magic) for offset, magic in parts)
+        self._sniff_bytes = max(self._sniff_bytes, end)
+
+    def from_mime(self, mime_type: Optional[str]) -> Optional[str]:
+        """Look up a file type by MIME type"""
+        if not mime_type:
+            return None
+        return self._by_mime.get(mime_type.lower())
+
+    def from_extension(self, extension: Optional[str]) -> Optional[str]:
+        """Look up a file type by extension (with leading dot)"""
+        if not extension:
+            return None
+        return self._by_extension.get(extension.lower())
+
+    def sniff(self, path: Path) -> Optional[Tuple[str, str]]:
+        """
+        Identify a file from its leading bytes
+
+        Args:
+            path: File path
+
+        Returns:
+            (file_type, mime_type) or None if no signature matched
+        """
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(self._sniff_bytes or self.SNIFF_BYTES)
+        except OSError:
+            return None
+
+        return self.match_header(header)
+
+    def match_header(self, header: bytes) -> Optional[Tuple[str, str]]:
+        """
+        Match already-read header bytes against registered signatures
+
+        Args:
+            header: Leading bytes of a file
+
+        Returns:
+            (file_type, mime_type) or None if no signature matched
+        """
+        for parts, file_type, mime_type in self._signatures:
+            if all(header[offset:offset + len(magic)] == magic for offset, magic in parts):
+                return file_type, mime_type
+        return None
+
+    def classify(self,
+                 path: Path,
+                 mime_type: Optional[str] = None,
+                 sniff: bool = True,
+                 verify: bool = False) -> str:
+        """
+        Determine the file type of a file
+
+        Args:
+            path: File path
+            mime_type: MIME type if already known (e.g. from ExifTool)
+            sniff: Read header bytes when MIME and extension are inconclusive
+            verify: Sniff even when the extension is known, to catch mislabeled files
+
+        Returns:
+            File type string ('unknown' if nothing matched)
+        """
+        file_type = self.from_mime(mime_type)
+        if file_type:
+            return file_type
+
+        file_type = self.from_extension(path.suffix)
+        if file_type and not verify:
+            return file_type
+
+        if sniff:
+            sniffed = self.sniff(path)
+            if sniffed:
+                return sniffed[0]
+
+        return file_type or self.UNKNOWN
+
+
+def build_default_classifier() -> FileTypeClassifier:
+    """
+    Build the classifier with MetaFinder's built-in file types
+
+    Returns:
+        Populated FileTypeClassifier
+    """
+    classifier = FileTypeClassifier()
+
+    classifier.register(
+        'image',
+        ['image/jpeg', 'image/png', 'image/gif', 'image/bmp', 'image/tiff', 'image/webp',
+         'image/heic', 'image/heif', 'image/x-canon-cr2', 'image/x-nikon-nef', 'image/x-adobe-dng'],
+        ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.webp', '.raw', '.cr2', '.nef',
+         '.heic', '.heif', '.dng', '.arw', '.cr3', '.orf', '.rw2']
+    )
+    classifier.register(
+        'document',
+        ['application/pdf', 'application/msword',
+         'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+         'application/vnd.ms-excel',
+         'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+         'application/vnd.ms-powerpoint',
+         'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+         'application/rtf', 'text/rtf'],
+        ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.txt', '.rtf']
+    )
+    classifier.register(
+        'audio',
+        ['audio/mpeg', 'audio/mp4', 'audio/x-wav', 'audio/wav', 'audio/flac', 'audio/x-flac',
+         'audio/ogg', 'audio/aac', 'audio/x-aiff'],
+        ['.mp3', '.wav', '.flac', '.m4a', '.aac', '.ogg', '.wma', '.opus', '.aif', '.aiff']
+    )
+    classifier.register(
+        'video',
+        ['video/mp4', 'video/x-msvideo', 'video/x-matroska', 'video/quicktime', 'video/x-ms-wmv',
+         'video/webm', 'video/mpeg', 'video/3gpp'],
+        ['.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.mpg', '.mpeg', '.3gp']
+    )
+    classifier.register(
+        'archive',
+        ['application/zip', 'application/x-rar-compressed', 'application/x-7z-compressed',
+         'application/x-tar', 'application/gzip', 'application/x-bzip2', 'application/x-xz'],
+        ['.zip', '.rar', '.7z', '.tar', '.gz', '.bz2', '.xz', '.zst']
+    )
+    classifier.register(
+        'executable',
+        ['application/x-msdownload', 'application/x-executable', 'application/x-mach-binary'],
+        ['.exe', '.dll', '.so', '.dylib']
+    )
+    classifier.register(
+        'code',
+        [],
+        ['.py', '.js', '.java', '.cpp', '.c', '.h', '.cs', '.php', '.rb', '.go', '.rs']
+    )
+
+    # Container formats first: their generic prefixes would shadow others
+    classifier.register_signature('audio', 'audio/x-wav', (0, b'RIFF'), (8, b'WAVE'))
+    classifier.register_signature('video', 'video/x-msvideo', (0, b'RIFF'), (8, b'AVI '))
+    classifier.register_signature('image', 'image/webp', (0, b'RIFF'), (8, b'WEBP'))
+    classifier.register_signature('image', 'image/heic', (4, b'ftyp'), (8, b'heic'))
+    classifier.register_signature('image', 'image/heif', (4, b'ftyp'), (8, b'mif1'))
+    classifier.register_signature('audio', 'audio/mp4', (4, b'ftyp'), (8, b'M4A '))
+    classifier.register_signature('video', 'video/quicktime', (4, b'ftyp'), (8, b'qt  '))
+    classifier.register_signature('video', 'video/mp4', (4, b'ftyp'))
+
+    classifier.register_signature('image', 'image/jpeg', (0, b'\xff\xd8\xff'))
+    classifier.register_signature('image', 'image/png', (0, b'\x89PNG\r\n\x1a\n'))
+    classifier.register_signature('image', 'image/gif', (0, b'GIF87a'))
+    classifier.register_signature('image', 'image/gif', (0, b'GIF89a'))
+    classifier.register_signature('image', 'image/tiff', (0, b'II*\x00'))
+    classifier.register_signature('image', 'image/tiff', (0, b'MM\x00*'))
+    classifier.register_signature('image', 'image/bmp', (0, b'BM'))
+
+    classifier.register_signature('document', 'application/pdf', (0, b'%PDF-'))
+    classifier.register_signature('document', 'application/msword', (0, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'))
+    classifier.register_signature('document', 'application/rtf', (0, b'{\\rtf'))
+
+    classifier.register_signature('audio', 'audio/mpeg', (0, b'ID3'))
+    classifier.register_signature('audio', 'audio/mpeg', (0, b'\xff\xfb'))
+    classifier.register_signature('audio', 'audio/flac', (0, b'fLaC'))
+    classifier.register_signature('audio', 'audio/ogg', (0, b'OggS'))
+
+    classifier.register_signature('video', 'video/x-matroska', (0, b'\x1a\x45\xdf\xa3'))
+    classifier.register_signature('video', 'video/x-ms-wmv', (0, b'\x30\x26\xb2\x75\x8e\x66\xcf\x11'))
+
+    classifier.register_signature('archive', 'application/zip', (0, b'PK\x03\x04'))
+    classifier.register_signature('archive', 'application/x-rar-compressed', (0, b'Rar!\x1a\x07'))
+    classifier.register_signature('archive', 'application/x-7z-compressed', (0, b"7z\xbc\xaf\x27\x1c"))
+    classifier.register_signature('archive', 'application/gzip', (0, b'\x1f\x8b'))
+    classifier.register_signature('archive', 'application/x-bzip2', (0, b'BZh'))
+    classifier.register_signature('archive', 'application/x-xz', (0, b'\xfd7zXZ\x00'))
+    classifier.register_signature('archive', 'application/x-tar', (257, b'ustar'))
+
+    classifier.register_signature('executable', 'application/x-executable', (0, b'\x7fELF'))
+    classifier.register_signature('executable', 'application/x-msdownload', (0, b'MZ'))
+    classifier.register_signature('executable', 'application/x-mach-binary', (0, b'\xcf\xfa\xed\xfe'))
+    classifier.register_signature('executable', 'application/x-mach-binary', (0, b'\xce\xfa\xed\xfe'))
+
+    classifier.register_signature('code', 'text/x-script', (0, b'#!'))
+
+    return classifier
+
+
+# Shared instance used by the normalizer and scanner
+default_classifier = build_default_classifier()
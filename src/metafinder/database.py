@@ -3,12 +3,18 @@ Database layer for MetaFinder
 Handles SQLite storage and querying of file metadata
 """
 
+import os
+import re
 import sqlite3
 import json
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 from datetime import datetime
 
+from .records import FileRecord
+from .geo import extract_gps, distance_km, radius_bbox
+from .values import NUMERIC_FIELDS, extract_typed_values
+
 
 class DatabaseManager:
     """Manages SQLite database for file metadata storage and querying"""
@@ -23,8 +29,12 @@ class DatabaseManager:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.conn = None
+        # Interned metadata key dictionary (tag name <-> id)
+        self._key_ids: Dict[str, int] = {}
+        self._key_names: Dict[int, str] = {}
         self._connect()
         self._create_schema()
+        self._load_metadata_keys()
 
     def _connect(self):
         """Establish database connection with optimizations"""
@@ -36,6 +46,11 @@ class DatabaseManager:
         self.conn.execute("PRAGMA synchronous=NORMAL")
         self.conn.execute("PRAGMA cache_size=10000")
         self.conn.execute("PRAGMA temp_store=MEMORY")
+        # INSERT OR REPLACE must fire the delete trigger that keeps files_geo in sync
+        self.conn.execute("PRAGMA recursive_triggers=ON")
+
+        # Used by the radius filter
+        self.conn.create_function('geo_distance_km', 4, distance_km, deterministic=True)
 
     def _create_schema(self):
         """Create database tables and indexes"""
@@ -69,9 +84,28 @@ class DatabaseManager:
 
                 -- Indexing metadata
                 scan_date REAL,
-                file_hash TEXT
+                file_hash TEXT,
+
+                -- Perceptual image hash (hex dHash) for near-duplicate search
+                phash TEXT,
+
+                -- GPS position in decimal degrees
+                latitude REAL,
+                longitude REAL,
+
+                -- Typed values parsed from ExifTool strings, for range filters
+                exposure_time REAL,
+                f_number REAL,
+                focal_length REAL,
+                duration_s REAL,
+                width INTEGER,
+                height INTEGER,
+                bpm REAL,
+                page_count INTEGER,
+                bitrate INTEGER
             )
         """)
+        added_columns = self._migrate_columns(cursor)
 
         # Full-text search virtual table
         cursor.execute("""
@@ -85,6 +119,95 @@ class DatabaseManager:
             )
         """)
 
+        # Metadata key dictionary: stored metadata refers to tag names by id
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS metadata_keys (
+                id INTEGER PRIMARY KEY,
+                name TEXT UNIQUE NOT NULL
+            )
+        """)
+
+        # Spatial index over files with a GPS position, kept in sync by triggers
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS files_geo USING rtree(
+                id,
+                min_lat, max_lat,
+                min_lon, max_lon
+            )
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS files_geo_insert AFTER INSERT ON files
+            WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL
+            BEGIN
+                INSERT INTO files_geo VALUES
+                    (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS files_geo_delete AFTER DELETE ON files
+            BEGIN
+                DELETE FROM files_geo WHERE id = old.id;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS files_geo_update AFTER UPDATE OF latitude, longitude ON files
+            BEGIN
+                DELETE FROM files_geo WHERE id = old.id;
+                INSERT INTO files_geo
+                    SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+                    WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+            END
+        """)
+
+        # File counts per UTC quarter hour for the timeline, kept in sync by
+        # triggers. Slots don't depend on the time zone of the process that
+        # fires a trigger; get_timeline() maps them to local days when queried.
+        cursor.execute("SELECT name FROM pragma_table_info('timeline')")
+        timeline_columns = {row[0] for row in cursor.fetchall()}
+        if timeline_columns and 'slot' not in timeline_columns:
+            # Older rollups stored local-time days; rebuild them as slots
+            cursor.execute("DROP TABLE timeline")
+            for trigger in ('insert', 'delete', 'update'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS files_timeline_{trigger}")
+            timeline_columns = set()
+        timeline_exists = bool(timeline_columns)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS timeline (
+                field TEXT NOT NULL,
+                slot INTEGER NOT NULL,
+                file_type TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (field, slot, file_type)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS files_timeline_insert AFTER INSERT ON files
+            BEGIN {self._timeline_sql('new', 1)}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS files_timeline_delete AFTER DELETE ON files
+            BEGIN {self._timeline_sql('old', -1)}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS files_timeline_update
+            AFTER UPDATE OF {', '.join(self.TIMELINE_FIELDS)}, file_type ON files
+            BEGIN {self._timeline_sql('old', -1)} {self._timeline_sql('new', 1)}
+            END
+        """)
+
+        # Files that failed to scan, retried later with exponential backoff
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scan_errors (
+                path TEXT PRIMARY KEY,
+                stage TEXT NOT NULL,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 1,
+                last_attempt REAL NOT NULL
+            )
+        """)
+
         # Indexes for common queries
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_type ON files(file_type)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_extension ON files(extension)")
@@ -93,28 +216,240 @@ class DatabaseManager:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_author ON files(author)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_camera_make ON files(camera_make)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_date_taken ON files(date_taken)")
+        for field in NUMERIC_FIELDS:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{field} ON files({field})")
 
         self.conn.commit()
 
-    def insert_file(self, file_data: Dict[str, Any]) -> int:
+        if not timeline_exists:
+            self.rebuild_timeline()
+
+        derived = [name for name in added_columns if name in self.DERIVED_COLUMNS]
+        if derived:
+            self._backfill_derived(derived)
+
+    # Columns added after the first schema version: (name, type)
+    ADDED_COLUMNS = (
+        ('phash', 'TEXT'),
+        ('latitude', 'REAL'),
+        ('longitude', 'REAL'),
+        ('exposure_time', 'REAL'),
+        ('f_number', 'REAL'),
+        ('focal_length', 'REAL'),
+        ('duration_s', 'REAL'),
+        ('width', 'INTEGER'),
+        ('height', 'INTEGER'),
+        ('bpm', 'REAL'),
+        ('page_count', 'INTEGER'),
+        ('bitrate', 'INTEGER'),
+    )
+
+    # Columns computed from the stored metadata (backfilled when added)
+    DERIVED_COLUMNS = ('latitude', 'longitude') + NUMERIC_FIELDS
+
+    def _migrate_columns(self, cursor: sqlite3.Cursor) -> List[str]:
         """
-        Insert or update file metadata
+        Add columns missing from databases created by older versions
+
+        Returns:
+            Names of the columns that were added
+        """
+        cursor.execute("PRAGMA table_info(files)")
+        existing = {row['name'] for row in cursor.fetchall()}
+        added = []
+        for name, column_type in self.ADDED_COLUMNS:
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE files ADD COLUMN {name} {column_type}")
+                added.append(name)
+        return added
+
+    # Columns matched by the free-text query filter
+    TEXT_COLUMNS = ('name', 'author', 'title', 'searchable_text')
+
+    # Date columns rolled up into the timeline table
+    TIMELINE_FIELDS = ('date_taken', 'modified')
+
+    # Bucket granularity -> length of the 'YYYY-MM-DD' prefix
+    TIMELINE_GRANULARITY = {'year': 4, 'month': 7, 'day': 10}
+
+    # Seconds per timeline slot; every UTC offset in use is a multiple of it
+    TIMELINE_SLOT = 900
+
+    def _timeline_slot(self, value: str) -> str:
+        """SQL expression: UTC timeline slot of a timestamp expression (floored)"""
+        seconds = f"CAST({value} AS INTEGER)"
+        return f"({seconds} / {self.TIMELINE_SLOT} - ({seconds} % {self.TIMELINE_SLOT} < 0))"
+
+    def _timeline_sql(self, row: str, delta: int) -> str:
+        """
+        Trigger body adjusting the timeline counts of one files row
 
         Args:
-            file_data: Dictionary containing file metadata
+            row: 'new' or 'old'
+            delta: +1 when the row appears, -1 when it goes away
 
         Returns:
-            Row ID of inserted/updated file
+            SQL statements for a trigger body
+        """
+        statements = []
+        for field in self.TIMELINE_FIELDS:
+            statements.append(f"""
+                INSERT INTO timeline (field, slot, file_type, count)
+                    SELECT '{field}', {self._timeline_slot(f'{row}.{field}')}, COALESCE({row}.file_type, ''), {delta}
+                    WHERE {row}.{field} IS NOT NULL
+                    ON CONFLICT (field, slot, file_type) DO UPDATE SET count = count + ({delta});""")
+        return "".join(statements)
+
+    def rebuild_timeline(self):
+        """Recompute the timeline rollup from the files table"""
+        with self.conn:
+            self.conn.execute("DELETE FROM timeline")
+            for field in self.TIMELINE_FIELDS:
+                self.conn.execute(f"""
+                    INSERT INTO timeline (field, slot, file_type, count)
+                    SELECT '{field}', {self._timeline_slot(field)} AS slot,
+                           COALESCE(file_type, '') AS type, COUNT(*)
+                    FROM files
+                    WHERE {field} IS NOT NULL
+                    GROUP BY slot, type
+                """)
+
+    def _backfill_derived(self, columns: List[str]):
+        """
+        Fill newly added derived columns of existing rows from their stored metadata
+
+        Args:
+            columns: Names from DERIVED_COLUMNS to compute
         """
+        self._load_metadata_keys()
         cursor = self.conn.cursor()
+        cursor.execute("SELECT id, metadata FROM files WHERE metadata IS NOT NULL")
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO files (
-                path, name, extension, size, created, modified, accessed,
-                file_type, author, title, date_taken, camera_make, camera_model,
-                metadata, searchable_text, scan_date, file_hash
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        updates = []
+        for row in cursor.fetchall():
+            metadata = self.decode_metadata(row['metadata'])
+            values = extract_typed_values(metadata)
+            values['latitude'], values['longitude'] = extract_gps(metadata)
+            if any(values[column] is not None for column in columns):
+                updates.append(tuple(values[column] for column in columns) + (row['id'],))
+
+        if updates:
+            assignments = ", ".join(f"{column} = ?" for column in columns)
+            with self.conn:
+                self.conn.executemany(f"UPDATE files SET {assignments} WHERE id = ?", updates)
+
+    def _load_metadata_keys(self):
+        """(Re)load the metadata key dictionary into memory"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id, name FROM metadata_keys")
+        self._key_ids = {}
+        self._key_names = {}
+        for key_id, name in cursor.fetchall():
+            self._key_ids[name] = key_id
+            self._key_names[key_id] = name
+
+    def _intern_keys(self, records: List[Dict[str, Any]]):
+        """
+        Make sure every metadata key of the records has a dictionary id
+
+        New keys are committed in their own transaction before the records
+        are written, so the in-memory dictionary never holds ids that a
+        rolled-back insert discarded. Other connections to the same
+        database (e.g. the scan writer thread) share the table, and
+        INSERT OR IGNORE keeps ids stable when they race.
+        """
+        missing = {key
+                   for record in records
+                   for key in (record.get('metadata') or {})
+                   if key not in self._key_ids}
+        if not missing:
+            return
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO metadata_keys (name) VALUES (?)",
+                [(key,) for key in missing]
+            )
+        self._load_metadata_keys()
+
+    def get_key_id(self, name: str) -> Optional[int]:
+        """
+        Look up the dictionary id of a metadata key
+
+        Args:
+            name: ExifTool tag name (e.g. 'EXIF:DateTimeOriginal')
+
+        Returns:
+            Key id, or None if no stored file has that key
+        """
+        if name not in self._key_ids:
+            self._load_metadata_keys()
+        return self._key_ids.get(name)
+
+    def encode_metadata(self, metadata: Optional[Dict[str, Any]]) -> str:
+        """
+        Encode metadata for storage with interned keys
+
+        The stored form is a flat JSON array of alternating key ids and
+        values ([id, value, id, value, ...]) instead of an object keyed by
+        long group-qualified tag names. Keys must already be interned.
+
+        Args:
+            metadata: Metadata dictionary keyed by tag name
+
+        Returns:
+            Encoded JSON text
+        """
+        encoded = []
+        key_ids = self._key_ids
+        for key, value in (metadata or {}).items():
+            encoded.append(key_ids[key])
+            encoded.append(value)
+        return json.dumps(encoded, separators=(',', ':'))
+
+    def decode_metadata(self, raw: Optional[str]) -> Dict[str, Any]:
+        """
+        Decode stored metadata back into a dictionary keyed by tag name
+
+        Rows written before the key dictionary existed hold a plain JSON
+        object and are returned as-is.
+
+        Args:
+            raw: Stored metadata JSON text
+
+        Returns:
+            Metadata dictionary
+        """
+        if not raw:
+            return {}
+        data = json.loads(raw)
+        if not isinstance(data, list):
+            return data
+
+        ids = data[0::2]
+        if any(key_id not in self._key_names for key_id in ids):
+            # Keys added by another connection since we last loaded
+            self._load_metadata_keys()
+        names = self._key_names
+        return {names.get(key_id, str(key_id)): value
+                for key_id, value in zip(ids, data[1::2])}
+
+    # Column order shared by insert_file and insert_files
+    INSERT_SQL = """
+        INSERT OR REPLACE INTO files (
+            path, name, extension, size, created, modified, accessed,
+            file_type, author, title, date_taken, camera_make, camera_model,
+            metadata, searchable_text, scan_date, file_hash, phash,
+            latitude, longitude,
+            exposure_time, f_number, focal_length, duration_s, width, height,
+            bpm, page_count, bitrate
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                  ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    def _insert_params(self, file_data: Dict[str, Any], scan_date: float) -> tuple:
+        """Build INSERT parameters for a normalized record"""
+        return (
             file_data.get('path'),
             file_data.get('name'),
             file_data.get('extension'),
@@ -128,16 +463,68 @@ class DatabaseManager:
             file_data.get('date_taken'),
             file_data.get('camera_make'),
             file_data.get('camera_model'),
-            json.dumps(file_data.get('metadata', {})),
-            file_data.get('searchable_text', ''),
-            datetime.now().timestamp(),
-            file_data.get('file_hash')
-        ))
+            self.encode_metadata(file_data.get('metadata')),
+            file_data.get('searchable_text') or '',
+            scan_date,
+            file_data.get('file_hash'),
+            file_data.get('phash'),
+            file_data.get('latitude'),
+            file_data.get('longitude'),
+            *(file_data.get(field) for field in NUMERIC_FIELDS)
+        )
+
+    def insert_file(self, file_data: Dict[str, Any]) -> int:
+        """
+        Insert or update file metadata
+
+        Args:
+            file_data: Dictionary containing file metadata
+
+        Returns:
+            Row ID of inserted/updated file
+        """
+        self._intern_keys([file_data])
+        cursor = self.conn.cursor()
+        cursor.execute(self.INSERT_SQL, self._insert_params(file_data, datetime.now().timestamp()))
 
         self.conn.commit()
         return cursor.lastrowid
 
-    def get_file_by_path(self, path: str) -> Optional[Dict[str, Any]]:
+    def insert_files(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Insert or update many files in a single transaction
+
+        Args:
+            records: List of normalized file records
+
+        Returns:
+            Number of records written
+        """
+        if not records:
+            return 0
+
+        self._intern_keys(records)
+        scan_date = datetime.now().timestamp()
+        with self.conn:
+            self.conn.executemany(
+                self.INSERT_SQL,
+                [self._insert_params(record, scan_date) for record in records]
+            )
+            # Files that failed before are indexed now
+            if self.conn.execute("SELECT 1 FROM scan_errors LIMIT 1").fetchone():
+                self.conn.executemany("DELETE FROM scan_errors WHERE path = ?",
+                                      [(record.get('path'),) for record in records])
+
+        return len(records)
+
+    def _row_to_record(self, row: sqlite3.Row) -> FileRecord:
+        """Convert a files row into a FileRecord with parsed metadata"""
+        record = FileRecord.from_row(row)
+        if record.metadata:
+            record.metadata = self.decode_metadata(record.metadata)
+        return record
+
+    def get_file_by_path(self, path: str) -> Optional[FileRecord]:
         """
         Retrieve file metadata by path
 
@@ -145,44 +532,94 @@ class DatabaseManager:
             path: File path
 
         Returns:
-            Dictionary of file metadata or None
+            FileRecord or None
         """
         cursor = self.conn.cursor()
         cursor.execute("SELECT * FROM files WHERE path = ?", (path,))
         row = cursor.fetchone()
 
         if row:
-            return dict(row)
+            return self._row_to_record(row)
         return None
 
-    def search_files(self,
-                     file_type: Optional[str] = None,
-                     extension: Optional[str] = None,
-                     author: Optional[str] = None,
-                     camera_make: Optional[str] = None,
-                     min_size: Optional[int] = None,
-                     max_size: Optional[int] = None,
-                     start_date: Optional[float] = None,
-                     end_date: Optional[float] = None,
-                     text_query: Optional[str] = None,
-                     limit: int = 100) -> List[Dict[str, Any]]:
+    def get_files_by_ids(self, ids: List[int], chunk_size: int = 500) -> List[FileRecord]:
         """
-        Search files with filters
+        Retrieve several files by row id
 
         Args:
-            file_type: Filter by file type (image, document, audio, etc.)
-            extension: Filter by file extension
-            author: Filter by author name
-            camera_make: Filter by camera manufacturer
-            min_size: Minimum file size in bytes
-            max_size: Maximum file size in bytes
-            start_date: Start date (timestamp)
-            end_date: End date (timestamp)
-            text_query: Full-text search query
-            limit: Maximum results to return
+            ids: Row ids
+            chunk_size: Ids per query (stays under SQLite's variable limit)
+
+        Returns:
+            List of FileRecords (order not guaranteed)
+        """
+        ids = list(ids)
+        records = []
+        cursor = self.conn.cursor()
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"SELECT * FROM files WHERE id IN ({placeholders})", chunk)
+            records.extend(self._row_to_record(row) for row in cursor.fetchall())
+        return records
+
+    def iter_phashes(self) -> Iterator[Tuple[int, str]]:
+        """
+        Stream (id, phash) for every file with a perceptual hash
 
         Returns:
-            List of matching file records
+            Iterator of (row id, hex hash) tuples
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id, phash FROM files WHERE phash IS NOT NULL")
+        try:
+            while True:
+                rows = cursor.fetchmany(1000)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row['id'], row['phash']
+        finally:
+            cursor.close()
+
+    def set_phashes(self, updates: List[Tuple[str, int]]) -> int:
+        """
+        Store perceptual hashes for existing rows
+
+        Args:
+            updates: List of (hex hash, row id)
+
+        Returns:
+            Number of rows updated
+        """
+        if not updates:
+            return 0
+        with self.conn:
+            self.conn.executemany("UPDATE files SET phash = ? WHERE id = ?", updates)
+        return len(updates)
+
+    def _build_filter_clause(self,
+                             file_type: Optional[str] = None,
+                             extension: Optional[str] = None,
+                             author: Optional[str] = None,
+                             camera_make: Optional[str] = None,
+                             min_size: Optional[int] = None,
+                             max_size: Optional[int] = None,
+                             start_date: Optional[float] = None,
+                             end_date: Optional[float] = None,
+                             text_query: Optional[str] = None,
+                             bbox: Optional[Tuple[float, float, float, float]] = None,
+                             near: Optional[Tuple[float, float, float]] = None,
+                             ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None
+                             ) -> Tuple[str, List[Any]]:
+        """
+        Build the WHERE clause shared by search, export and aggregate queries
+
+        Args:
+            Same filters as search_files
+
+        Returns:
+            Tuple of (where clause, parameter list)
         """
         conditions = []
         params = []
@@ -219,28 +656,296 @@ class DatabaseManager:
             conditions.append("modified <= ?")
             params.append(end_date)
 
+        if text_query:
+            # Every term must appear in the name, author, title or extracted text
+            term_condition = "(" + " OR ".join(
+                f"{column} LIKE ? ESCAPE '\\'" for column in self.TEXT_COLUMNS
+            ) + ")"
+            for term in text_query.split():
+                pattern = '%' + re.sub(r'([\\%_])', r'\\\1', term) + '%'
+                conditions.append(term_condition)
+                params.extend([pattern] * len(self.TEXT_COLUMNS))
+
+        if bbox:
+            min_lat, min_lon, max_lat, max_lon = bbox
+            condition, box_params = self._geo_condition(min_lat, min_lon, max_lat, max_lon)
+            conditions.append(condition)
+            params.extend(box_params)
+
+        if near:
+            latitude, longitude, radius_km = near
+            # The R*Tree narrows to the enclosing box, then exact distances are checked
+            condition, box_params = self._geo_condition(*radius_bbox(latitude, longitude, radius_km))
+            conditions.append(condition)
+            params.extend(box_params)
+            conditions.append("geo_distance_km(latitude, longitude, ?, ?) <= ?")
+            params.extend([latitude, longitude, radius_km])
+
+        for field, (low, high) in (ranges or {}).items():
+            if field not in NUMERIC_FIELDS:
+                raise ValueError(f"Unknown range field: {field} (expected one of {', '.join(NUMERIC_FIELDS)})")
+            if low is not None:
+                conditions.append(f"{field} >= ?")
+                params.append(low)
+            if high is not None:
+                conditions.append(f"{field} <= ?")
+                params.append(high)
+
         where_clause = " AND ".join(conditions) if conditions else "1=1"
+        return where_clause, params
+
+    def _geo_condition(self, min_lat: float, min_lon: float,
+                       max_lat: float, max_lon: float) -> Tuple[str, List[Any]]:
+        """
+        Build a bounding-box condition that is answered by the files_geo R*Tree
+
+        R*Tree coordinates are stored as 32-bit floats rounded outwards, so
+        the index is used to find candidates and the REAL columns decide.
+        A box with min_lon > max_lon crosses the antimeridian and is split
+        in two.
+
+        Returns:
+            Tuple of (condition, parameter list)
+        """
+        if min_lon <= max_lon:
+            lon_ranges = [(min_lon, max_lon)]
+        else:
+            lon_ranges = [(min_lon, 180.0), (-180.0, max_lon)]
+
+        lookups = []
+        params = []
+        for low, high in lon_ranges:
+            lookups.append("SELECT id FROM files_geo "
+                           "WHERE max_lat >= ? AND min_lat <= ? AND max_lon >= ? AND min_lon <= ?")
+            params.extend([min_lat, max_lat, low, high])
+
+        params.extend([min_lat, max_lat])
+        exact = []
+        for low, high in lon_ranges:
+            exact.append("longitude BETWEEN ? AND ?")
+            params.extend([low, high])
+
+        condition = (f"id IN ({' UNION ALL '.join(lookups)}) "
+                     f"AND latitude BETWEEN ? AND ? AND ({' OR '.join(exact)})")
+        return condition, params
+
+    def search_files(self,
+                     file_type: Optional[str] = None,
+                     extension: Optional[str] = None,
+                     author: Optional[str] = None,
+                     camera_make: Optional[str] = None,
+                     min_size: Optional[int] = None,
+                     max_size: Optional[int] = None,
+                     start_date: Optional[float] = None,
+                     end_date: Optional[float] = None,
+                     text_query: Optional[str] = None,
+                     bbox: Optional[Tuple[float, float, float, float]] = None,
+                     near: Optional[Tuple[float, float, float]] = None,
+                     ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+                     limit: int = 100,
+                     offset: int = 0,
+                     after: Optional[Tuple[Optional[float], int]] = None) -> List[FileRecord]:
+        """
+        Search files with filters, newest first
+
+        Args:
+            file_type: Filter by file type (image, document, audio, etc.)
+            extension: Filter by file extension
+            author: Filter by author name
+            camera_make: Filter by camera manufacturer
+            min_size: Minimum file size in bytes
+            max_size: Maximum file size in bytes
+            start_date: Start date (timestamp)
+            end_date: End date (timestamp)
+            text_query: Words that must all appear in the name, author,
+                title or extracted text (case-insensitive substrings)
+            bbox: GPS bounding box (min_lat, min_lon, max_lat, max_lon)
+            near: GPS radius filter (latitude, longitude, radius_km)
+            ranges: Inclusive numeric ranges by typed field, e.g.
+                {'duration_s': (600, None), 'bpm': (140, 160)}
+            limit: Maximum results to return
+            offset: Number of matching rows to skip (for paging); counted
+                from the `after` row when one is given
+            after: Sort key (see page_key) of the last row already shown;
+                the page continues right after it. Seeking to a key costs
+                the same on page 1 and page 1,000, unlike a large offset,
+                which re-reads every row it skips
+
+        Returns:
+            List of matching FileRecords (mapping-compatible)
+        """
+        where_clause, params = self._build_filter_clause(
+            file_type=file_type,
+            extension=extension,
+            author=author,
+            camera_make=camera_make,
+            min_size=min_size,
+            max_size=max_size,
+            start_date=start_date,
+            end_date=end_date,
+            text_query=text_query,
+            bbox=bbox,
+            near=near,
+            ranges=ranges,
+        )
+
+        if after is None:
+            return self._select_page(where_clause, params, limit, offset)
+
+        after_modified, after_id = after
+        if after_modified is None:
+            # Rows without a modification date sort last, by id
+            return self._select_page(f"({where_clause}) AND modified IS NULL AND id < ?",
+                                     params + [after_id], limit, offset)
 
+        # The row-value comparison seeks into idx_modified, which ends in the rowid (id)
+        keyset_clause = f"({where_clause}) AND (modified, id) < (?, ?)"
+        keyset_params = params + [after_modified, after_id]
+        records = self._select_page(keyset_clause, keyset_params, limit, offset)
+        if len(records) < limit:
+            # Undated rows follow the dated ones; an empty page means the
+            # offset may reach past the dated rows, so find how far
+            skip = 0
+            if not records and offset:
+                cursor = self.conn.cursor()
+                cursor.execute(f"SELECT COUNT(*) FROM files WHERE {keyset_clause}", keyset_params)
+                skip = max(0, offset - cursor.fetchone()[0])
+            records += self._select_page(f"({where_clause}) AND modified IS NULL",
+                                         params, limit - len(records), skip)
+        return records
+
+    def _select_page(self, where_clause: str, params: List[Any], limit: int, offset: int) -> List[FileRecord]:
+        """Run one page of a search in result order (newest first)"""
         query = f"""
             SELECT * FROM files
             WHERE {where_clause}
-            ORDER BY modified DESC
-            LIMIT ?
+            ORDER BY modified DESC, id DESC
+            LIMIT ? OFFSET ?
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(query, params + [limit, offset])
+
+        return [self._row_to_record(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def page_key(record: Dict[str, Any]) -> Tuple[Optional[float], int]:
+        """
+        Sort key of a search result, for search_files(after=...)
+
+        Args:
+            record: Row returned by search_files
+
+        Returns:
+            Tuple of (modified, id)
         """
-        params.append(limit)
+        return record['modified'], record['id']
 
+    def count_files(self, **filters) -> int:
+        """
+        Count files matching filters
+
+        Args:
+            **filters: Same filters as search_files (without limit/offset)
+
+        Returns:
+            Number of matching files
+        """
+        where_clause, params = self._build_filter_clause(**filters)
         cursor = self.conn.cursor()
-        cursor.execute(query, params)
+        cursor.execute(f"SELECT COUNT(*) FROM files WHERE {where_clause}", params)
+        return cursor.fetchone()[0]
 
-        results = []
-        for row in cursor.fetchall():
-            record = dict(row)
-            # Parse JSON metadata
-            if record.get('metadata'):
-                record['metadata'] = json.loads(record['metadata'])
-            results.append(record)
+    def get_columns(self) -> List[str]:
+        """
+        Get column names of the files table
 
-        return results
+        Returns:
+            List of column names in table order
+        """
+        cursor = self.conn.execute("PRAGMA table_info(files)")
+        return [row['name'] for row in cursor.fetchall()]
+
+    def iter_files(self,
+                   fields: Optional[List[str]] = None,
+                   batch_size: int = 1000,
+                   **filters) -> Iterator[sqlite3.Row]:
+        """
+        Stream matching rows without materializing the result set
+
+        SQLite steps the statement lazily, so only one fetchmany() batch
+        is held in memory at a time regardless of how many rows match.
+
+        Args:
+            fields: Columns to select (all columns if None)
+            batch_size: Rows fetched per step
+            **filters: Same filters as search_files (without limit)
+
+        Returns:
+            Iterator of sqlite3.Row objects
+        """
+        columns = self.get_columns()
+        if fields:
+            unknown = [field for field in fields if field not in columns]
+            if unknown:
+                raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+            columns = list(fields)
+
+        where_clause, params = self._build_filter_clause(**filters)
+
+        # Separate cursor so other queries on the connection don't reset it
+        cursor = self.conn.cursor()
+        cursor.arraysize = batch_size
+        cursor.execute(f"""
+            SELECT {', '.join(columns)} FROM files
+            WHERE {where_clause}
+            ORDER BY id
+        """, params)
+
+        try:
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    def get_metadata_keys(self, **filters) -> List[str]:
+        """
+        Get the distinct top-level metadata keys of matching files
+
+        The key set is collected inside SQLite with json_each, so callers
+        can size a flattened export header without loading any rows.
+        Interned rows contribute the ids at even array positions, which are
+        resolved through the key dictionary; legacy rows contribute their
+        object keys directly.
+
+        Args:
+            **filters: Same filters as search_files (without limit)
+
+        Returns:
+            Sorted list of metadata keys
+        """
+        where_clause, params = self._build_filter_clause(**filters)
+
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT DISTINCT CASE matched.kind
+                WHEN 'array' THEN keys.name
+                ELSE meta.key
+            END AS key
+            FROM (
+                SELECT metadata, json_type(metadata) AS kind FROM files
+                WHERE {where_clause} AND json_valid(metadata)
+            ) AS matched
+            JOIN json_each(matched.metadata) AS meta
+            LEFT JOIN metadata_keys AS keys
+                ON matched.kind = 'array' AND keys.id = meta.value
+            WHERE matched.kind = 'object' OR meta.key % 2 = 0
+            ORDER BY key
+        """, params)
+
+        return [row['key'] for row in cursor.fetchall()]
 
     def get_statistics(self) -> Dict[str, Any]:
         """
@@ -287,8 +992,345 @@ class DatabaseManager:
         stats['oldest_file'] = row['oldest']
         stats['newest_file'] = row['newest']
 
+        # Files waiting for a retry
+        cursor.execute("SELECT COUNT(*) as count FROM scan_errors")
+        stats['scan_errors'] = cursor.fetchone()['count']
+
         return stats
 
+    def get_timeline(self,
+                     field: str = 'date_taken',
+                     granularity: str = 'year',
+                     period: Optional[str] = None,
+                     **filters) -> Dict[str, int]:
+        """
+        Count files per year, month or day
+
+        Unfiltered and file-type-only queries are answered from the timeline
+        rollup without touching the files table. Any other filter falls back
+        to grouping the matching files, using the date index when a period
+        is given. Buckets are local dates in this process's time zone.
+
+        Args:
+            field: Date column to bucket ('date_taken' or 'modified')
+            granularity: 'year', 'month' or 'day'
+            period: Only buckets inside this year or month ('2024', '2024-05')
+            **filters: Same filters as search_files (without limit)
+
+        Returns:
+            Ordered dictionary of bucket ('2024', '2024-05', '2024-05-17') -> count
+        """
+        if field not in self.TIMELINE_FIELDS:
+            raise ValueError(f"Unknown timeline field: {field}")
+        if granularity not in self.TIMELINE_GRANULARITY:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        if period and not re.fullmatch(r'\d{4}(-\d{2}(-\d{2})?)?', period):
+            raise ValueError(f"Invalid period: {period} (expected YYYY, YYYY-MM or YYYY-MM-DD)")
+
+        width = self.TIMELINE_GRANULARITY[granularity]
+        active = {key: value for key, value in filters.items() if value not in (None, '', {}, ())}
+        cursor = self.conn.cursor()
+
+        if set(active) <= {'file_type'}:
+            conditions = ["field = ?"]
+            params: List[Any] = [field]
+            if 'file_type' in active:
+                conditions.append("file_type = ?")
+                params.append(active['file_type'])
+            if period:
+                start, end = self._period_bounds(period)
+                conditions.append("slot >= ? AND slot < ?")
+                params.extend([start // self.TIMELINE_SLOT, end // self.TIMELINE_SLOT])
+
+            slot_start = f"slot * {self.TIMELINE_SLOT}"
+            cursor.execute(f"""
+                SELECT substr(date({slot_start}, 'unixepoch', 'localtime'), 1, {width}) AS bucket,
+                       SUM(count) AS count
+                FROM timeline
+                WHERE {' AND '.join(conditions)}
+                GROUP BY bucket
+                HAVING SUM(count) > 0 AND bucket IS NOT NULL
+                ORDER BY bucket
+            """, params)
+        else:
+            where_clause, params = self._build_filter_clause(**active)
+            conditions = [where_clause, f"{field} IS NOT NULL"]
+            if period:
+                start, end = self._period_bounds(period)
+                conditions.append(f"{field} >= ? AND {field} < ?")
+                params.extend([start, end])
+
+            cursor.execute(f"""
+                SELECT substr(date({field}, 'unixepoch', 'localtime'), 1, {width}) AS bucket,
+                       COUNT(*) AS count
+                FROM files
+                WHERE {' AND '.join(conditions)}
+                GROUP BY bucket
+                HAVING bucket IS NOT NULL
+                ORDER BY bucket
+            """, params)
+
+        return {row['bucket']: row['count'] for row in cursor.fetchall()}
+
+    def _period_bounds(self, period: str) -> Tuple[float, float]:
+        """Local-time [start, end) timestamps of a 'YYYY', 'YYYY-MM' or 'YYYY-MM-DD' period"""
+        parts = [int(part) for part in period.split('-')]
+        year, month, day = (parts + [1, 1])[:3]
+        start = datetime(year, month, day)
+        if len(parts) == 1:
+            end = datetime(year + 1, 1, 1)
+        elif len(parts) == 2:
+            end = datetime(year + month // 12, month % 12 + 1, 1)
+        else:
+            end = datetime.fromordinal(start.toordinal() + 1)
+        return start.timestamp(), end.timestamp()
+
+    def iter_paths_under(self, root: str) -> Iterator[Tuple[int, str]]:
+        """
+        Stream (id, path) pairs for every indexed file below a folder
+
+        Uses a range scan on the unique path index instead of LIKE.
+
+        Args:
+            root: Absolute folder path
+
+        Returns:
+            Iterator of (row id, path) tuples
+        """
+        prefix = root.rstrip(os.sep) + os.sep
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT id, path FROM files WHERE path >= ? AND path < ?",
+            (prefix, upper)
+        )
+        for row in cursor:
+            yield row['id'], row['path']
+
+    def delete_files(self, ids: List[int], chunk_size: int = 500) -> int:
+        """
+        Delete files and their full-text entries in bulk
+
+        Args:
+            ids: Row IDs to delete
+            chunk_size: IDs per DELETE statement
+
+        Returns:
+            Number of rows deleted
+        """
+        deleted = 0
+
+        with self.conn:
+            for i in range(0, len(ids), chunk_size):
+                chunk = ids[i:i + chunk_size]
+                placeholders = ', '.join('?' * len(chunk))
+
+                self._delete_fts_entries(chunk, placeholders)
+
+                cursor = self.conn.execute(
+                    f"DELETE FROM files WHERE id IN ({placeholders})", chunk
+                )
+                deleted += cursor.rowcount
+
+        return deleted
+
+    def delete_files_by_path(self, paths: List[str], chunk_size: int = 500) -> int:
+        """
+        Delete files by path in bulk
+
+        Args:
+            paths: Absolute file paths
+            chunk_size: Paths per lookup statement
+
+        Returns:
+            Number of rows deleted
+        """
+        ids = []
+        for i in range(0, len(paths), chunk_size):
+            chunk = paths[i:i + chunk_size]
+            placeholders = ', '.join('?' * len(chunk))
+            cursor = self.conn.execute(
+                f"SELECT id FROM files WHERE path IN ({placeholders})", chunk
+            )
+            ids.extend(row['id'] for row in cursor.fetchall())
+
+        return self.delete_files(ids, chunk_size) if ids else 0
+
+    def _delete_fts_entries(self, ids: List[int], placeholders: str):
+        """
+        Remove FTS rows for files that are about to be deleted
+
+        files_fts is an external-content table, so entries must be removed
+        with the 'delete' command and the originally indexed values. Only
+        rowids present in the FTS docsize shadow table are touched.
+        """
+        cursor = self.conn.execute(f"""
+            SELECT f.id, f.name, f.author, f.title, f.searchable_text
+            FROM files f
+            JOIN files_fts_docsize d ON d.id = f.id
+            WHERE f.id IN ({placeholders})
+        """, ids)
+
+        self.conn.executemany("""
+            INSERT INTO files_fts(files_fts, rowid, name, author, title, keywords)
+            VALUES ('delete', ?, ?, ?, ?, ?)
+        """, [tuple(row) for row in cursor.fetchall()])
+
+    # Retry backoff: after n failed attempts a file waits RETRY_BASE_DELAY * 2**(n-1)
+    # seconds (capped at RETRY_MAX_DELAY) before it is due again
+    RETRY_BASE_DELAY = 60.0
+    RETRY_MAX_DELAY = 24 * 3600.0
+
+    def record_scan_errors(self, failures: List[Tuple[str, str, str]],
+                           when: Optional[float] = None) -> int:
+        """
+        Remember files that failed to scan
+
+        A file that failed before has its attempt counter increased, which
+        doubles its wait before the next retry.
+
+        Args:
+            failures: (path, stage, error) tuples
+            when: Time of the attempt (default: now)
+
+        Returns:
+            Number of failures recorded
+        """
+        if not failures:
+            return 0
+
+        when = datetime.now().timestamp() if when is None else when
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO scan_errors (path, stage, error, attempts, last_attempt)
+                VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    stage = excluded.stage,
+                    error = excluded.error,
+                    attempts = attempts + 1,
+                    last_attempt = excluded.last_attempt
+            """, [(str(path), stage, str(error), when) for path, stage, error in failures])
+
+        return len(failures)
+
+    def clear_scan_errors(self, paths: List[str], chunk_size: int = 500) -> int:
+        """
+        Forget failures of files (indexed since, or gone)
+
+        Args:
+            paths: File paths
+            chunk_size: Paths per statement
+
+        Returns:
+            Number of rows deleted
+        """
+        deleted = 0
+        with self.conn:
+            for i in range(0, len(paths), chunk_size):
+                chunk = paths[i:i + chunk_size]
+                placeholders = ', '.join('?' * len(chunk))
+                cursor = self.conn.execute(
+                    f"DELETE FROM scan_errors WHERE path IN ({placeholders})", chunk
+                )
+                deleted += cursor.rowcount
+        return deleted
+
+    def get_scan_errors(self,
+                        due: bool = False,
+                        max_attempts: Optional[int] = None,
+                        now: Optional[float] = None,
+                        limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        List recorded scan failures, oldest attempt first
+
+        Args:
+            due: Only files whose backoff has expired
+            max_attempts: Skip files that already failed this many times
+            now: Reference time for due (default: now)
+            limit: Maximum rows
+
+        Returns:
+            List of dicts with path, stage, error, attempts, last_attempt
+            and next_attempt
+        """
+        # Shift capped so large attempt counts cannot overflow
+        next_attempt = "last_attempt + MIN(?, ? * (1 << MIN(attempts - 1, 30)))"
+        conditions = []
+        params: List[Any] = [self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY]
+
+        if due:
+            conditions.append(f"{next_attempt} <= ?")
+            params.extend([self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY,
+                           datetime.now().timestamp() if now is None else now])
+        if max_attempts is not None:
+            conditions.append("attempts < ?")
+            params.append(max_attempts)
+
+        where_clause = " AND ".join(conditions) if conditions else "1=1"
+        query = f"""
+            SELECT path, stage, error, attempts, last_attempt, {next_attempt} AS next_attempt
+            FROM scan_errors
+            WHERE {where_clause}
+            ORDER BY last_attempt, path
+        """
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        return [dict(row) for row in self.conn.execute(query, params).fetchall()]
+
+    def count_scan_errors(self) -> int:
+        """Number of files with a recorded scan failure"""
+        return self.conn.execute("SELECT COUNT(*) FROM scan_errors").fetchone()[0]
+
+    def get_storage_info(self) -> Dict[str, int]:
+        """
+        Get page-level storage figures for the database file
+
+        Returns:
+            Dictionary with page_size, page_count, freelist_count, size_bytes
+        """
+        page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+        return {
+            'page_size': page_size,
+            'page_count': page_count,
+            'freelist_count': freelist_count,
+            'size_bytes': page_size * page_count,
+        }
+
+    def optimize(self, analyze: bool = True, vacuum: bool = False):
+        """
+        Refresh planner statistics and optionally release free pages
+
+        Args:
+            analyze: Run ANALYZE and PRAGMA optimize
+            vacuum: Return free pages to the filesystem
+        """
+        # Timeline buckets emptied by deletes are kept at zero until now
+        with self.conn:
+            self.conn.execute("DELETE FROM timeline WHERE count <= 0")
+
+        if analyze:
+            self.conn.execute("ANALYZE")
+            self.conn.execute("PRAGMA optimize")
+
+        if vacuum:
+            # auto_vacuum=INCREMENTAL only takes effect after one full VACUUM;
+            # after that, incremental_vacuum is cheap
+            if self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                self.conn.execute("VACUUM")
+            else:
+                self.conn.execute("PRAGMA incremental_vacuum").fetchall()
+
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        self.conn.commit()
+
     def get_unique_values(self, field: str, limit: int = 100) -> List[str]:
         """
         Get unique values for a field (for filter dropdowns)
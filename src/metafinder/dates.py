@@ -0,0 +1,115 @@
+"""
+Date parsing for MetaFinder
+Fast, cached parsing of ExifTool date strings with timezone support
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+
+# One pattern covers the shapes ExifTool emits:
+#   2024:01:15 14:30:00            (EXIF)
+#   2024:01:15 14:30:00.123+02:00  (sub-seconds + offset)
+#   2024-01-15T14:30:00Z           (XMP / ISO 8601)
+#   2024:01:15                     (date only)
+_DATE_RE = re.compile(
+    r'\s*(\d{4})[:\-](\d{2})[:\-](\d{2})'
+    r'(?:[ T](\d{2}):(\d{2})(?::(\d{2}))?(?:\.(\d{1,6})\d*)?)?'
+    r'\s*(Z|[+\-]\d{2}:?\d{2})?'
+)
+
+_OFFSET_RE = re.compile(r'\s*(Z)|\s*([+\-])(\d{2}):?(\d{2})')
+
+
+@lru_cache(maxsize=256)
+def parse_offset(value: Optional[str]) -> Optional[timezone]:
+    """
+    Parse a UTC offset such as '+02:00', '-0530' or 'Z'
+
+    Args:
+        value: Offset string (e.g. EXIF OffsetTimeOriginal)
+
+    Returns:
+        timezone or None if the value is not an offset
+    """
+    if not value or not isinstance(value, str):
+        return None
+
+    match = _OFFSET_RE.match(value)
+    if not match:
+        return None
+    if match.group(1):
+        return timezone.utc
+
+    sign, hours, minutes = match.group(2), int(match.group(3)), int(match.group(4))
+    if hours > 23 or minutes > 59:
+        return None
+    delta = timedelta(hours=hours, minutes=minutes)
+    return timezone(-delta if sign == '-' else delta)
+
+
+@lru_cache(maxsize=65536)
+def parse_exif_datetime(value: str, offset: Optional[str] = None) -> Optional[datetime]:
+    """
+    Parse an ExifTool date string into a datetime
+
+    An offset embedded in the string wins over the separate offset
+    argument. Without either, the datetime is naive (local time), which
+    matches how EXIF stores camera clock time.
+
+    Args:
+        value: Date string from ExifTool
+        offset: Separate UTC offset (e.g. OffsetTimeOriginal)
+
+    Returns:
+        datetime (aware when an offset is known) or None if unparseable
+    """
+    match = _DATE_RE.match(value)
+    if not match:
+        return None
+
+    year, month, day, hour, minute, second, fraction, zone = match.groups()
+
+    # Cameras with unset clocks write all-zero dates
+    if year == '0000' or month == '00' or day == '00':
+        return None
+
+    tzinfo = parse_offset(zone) if zone else parse_offset(offset)
+
+    try:
+        return datetime(
+            int(year), int(month), int(day),
+            int(hour or 0), int(minute or 0), int(second or 0),
+            int(fraction.ljust(6, '0')) if fraction else 0,
+            tzinfo=tzinfo
+        )
+    except ValueError:
+        return None
+
+
+def parse_exif_date(value, offset: Optional[str] = None) -> Optional[float]:
+    """
+    Parse an ExifTool date string into a Unix timestamp
+
+    Args:
+        value: Date string from ExifTool
+        offset: Separate UTC offset (e.g. OffsetTimeOriginal)
+
+    Returns:
+        Unix timestamp or None if unparseable
+    """
+    if not value or not isinstance(value, str):
+        return None
+    if offset is not None and not isinstance(offset, str):
+        offset = None
+
+    return _cached_timestamp(value, offset)
+
+
+@lru_cache(maxsize=65536)
+def _cached_timestamp(value: str, offset: Optional[str]) -> Optional[float]:
+    """Memoized timestamp conversion (naive datetimes need a localtime call)"""
+    dt = parse_exif_datetime(value, offset)
+    return dt.timestamp() if dt else None
@@ -0,0 +1,208 @@
+"""
+Result exporter for MetaFinder
+Streams database rows to CSV or JSON Lines with constant memory
+"""
+
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Callable
+
+from .database import DatabaseManager
+
+
+class ResultExporter:
+    """
+    Exports search results from the database to CSV or JSON Lines
+
+    Rows are pulled from the database cursor one batch at a time and
+    written straight through a buffered file handle, so memory use stays
+    flat no matter how many files match.
+    """
+
+    FORMATS = ('csv', 'jsonl')
+
+    # Columns exported when no field list is given
+    DEFAULT_FIELDS = [
+        'path', 'name', 'extension', 'size', 'file_type',
+        'author', 'title', 'date_taken', 'camera_make', 'camera_model',
+        'created', 'modified',
+    ]
+
+    # Prefix for flattened metadata columns (e.g. "meta:EXIF:Make")
+    METADATA_PREFIX = 'meta:'
+
+    # Write buffer for output files
+    BUFFER_SIZE = 1024 * 1024
+
+    def __init__(self, db_manager: DatabaseManager):
+        """
+        Initialize exporter
+
+        Args:
+            db_manager: Database manager to read rows from
+        """
+        self.db = db_manager
+
+    @classmethod
+    def detect_format(cls, output_path: str) -> str:
+        """
+        Guess export format from the output file extension
+
+        Args:
+            output_path: Destination path
+
+        Returns:
+            Format name ('csv' or 'jsonl')
+        """
+        suffix = Path(output_path).suffix.lower()
+        if suffix in ('.jsonl', '.ndjson', '.json'):
+            return 'jsonl'
+        return 'csv'
+
+    def export(self,
+               output_path: str,
+               export_format: Optional[str] = None,
+               fields: Optional[List[str]] = None,
+               flatten_metadata: bool = False,
+               progress_callback: Optional[Callable[[int], None]] = None,
+               **filters) -> Dict[str, Any]:
+        """
+        Export matching files
+
+        Args:
+            output_path: Destination file path ('-' for stdout)
+            export_format: 'csv' or 'jsonl' (guessed from extension if None)
+            fields: Columns to export (DEFAULT_FIELDS if None)
+            flatten_metadata: Expand metadata JSON into one column per tag
+            progress_callback: Function(rows_written) called every 10k rows
+            **filters: Same filters as DatabaseManager.search_files
+
+        Returns:
+            Dictionary with export statistics
+        """
+        export_format = export_format or self.detect_format(output_path)
+        if export_format not in self.FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        fields = list(fields or self.DEFAULT_FIELDS)
+        query_fields = list(fields)
+        if flatten_metadata and 'metadata' not in query_fields:
+            query_fields.append('metadata')
+
+        start = time.perf_counter()
+
+        if output_path == '-':
+            handle = sys.stdout
+        else:
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            handle = open(output_path, 'w', encoding='utf-8', newline='',
+                          buffering=self.BUFFER_SIZE)
+
+        try:
+            rows = self.db.iter_files(fields=query_fields, **filters)
+            if export_format == 'csv':
+                written = self._write_csv(handle, rows, fields, flatten_metadata,
+                                          progress_callback, filters)
+            else:
+                written = self._write_jsonl(handle, rows, fields, flatten_metadata,
+                                            progress_callback)
+        finally:
+            if handle is sys.stdout:
+                handle.flush()
+            else:
+                handle.close()
+
+        elapsed = time.perf_counter() - start
+
+        stats = {
+            'rows': written,
+            'format': export_format,
+            'output': output_path,
+            'elapsed': elapsed,
+            'rows_per_second': written / elapsed if elapsed > 0 else 0,
+        }
+        if output_path != '-':
+            stats['bytes'] = Path(output_path).stat().st_size
+
+        return stats
+
+    def _write_csv(self, handle, rows, fields: List[str], flatten_metadata: bool,
+                   progress_callback: Optional[Callable[[int], None]],
+                   filters: Dict[str, Any]) -> int:
+        """Write rows as CSV, one column per field"""
+        metadata_keys = []
+        if flatten_metadata:
+            # CSV needs the full header up front; SQLite collects it for us
+            metadata_keys = self.db.get_metadata_keys(**filters)
+
+        header = [field for field in fields if not (flatten_metadata and field == 'metadata')]
+        header += [self.METADATA_PREFIX + key for key in metadata_keys]
+
+        writer = csv.writer(handle)
+        writer.writerow(header)
+
+        written = 0
+        for row in rows:
+            values = []
+            for field in fields:
+                if field != 'metadata':
+                    values.append(row[field])
+                elif not flatten_metadata:
+                    # Stored blobs use interned key ids; write tag names instead
+                    values.append(self._csv_value(self._load_metadata(row['metadata'])))
+
+            if flatten_metadata:
+                metadata = self._load_metadata(row['metadata'])
+                values += [self._csv_value(metadata.get(key)) for key in metadata_keys]
+
+            writer.writerow(values)
+            written += 1
+
+            if progress_callback and written % 10000 == 0:
+                progress_callback(written)
+
+        return written
+
+    def _write_jsonl(self, handle, rows, fields: List[str], flatten_metadata: bool,
+                     progress_callback: Optional[Callable[[int], None]]) -> int:
+        """Write rows as JSON Lines, one object per file"""
+        written = 0
+        for row in rows:
+            record = {}
+            for field in fields:
+                if field == 'metadata':
+                    if not flatten_metadata:
+                        record['metadata'] = self._load_metadata(row['metadata'])
+                else:
+                    record[field] = row[field]
+
+            if flatten_metadata:
+                for key, value in self._load_metadata(row['metadata']).items():
+                    record[self.METADATA_PREFIX + key] = value
+
+            handle.write(json.dumps(record, ensure_ascii=False, default=str))
+            handle.write('\n')
+            written += 1
+
+            if progress_callback and written % 10000 == 0:
+                progress_callback(written)
+
+        return written
+
+    def _load_metadata(self, raw: Optional[str]) -> Dict[str, Any]:
+        """Decode a stored metadata blob (interned or legacy JSON)"""
+        if not raw:
+            return {}
+        try:
+            return self.db.decode_metadata(raw)
+        except (ValueError, TypeError):
+            return {}
+
+    def _csv_value(self, value: Any) -> Any:
+        """Render nested metadata values as JSON inside a CSV cell"""
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, ensure_ascii=False)
+        return value
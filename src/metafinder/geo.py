@@ -0,0 +1,173 @@
+"""
+GPS helpers for MetaFinder
+Parses ExifTool GPS tags and computes distances for location filters
+"""
+
+import math
+import re
+from typing import Dict, Any, Optional, Tuple
+
+
+# Mean Earth radius used for great-circle distances
+EARTH_RADIUS_KM = 6371.0088
+
+# Kilometres per degree of latitude (and of longitude at the equator)
+KM_PER_DEGREE = 2 * math.pi * EARTH_RADIUS_KM / 360
+
+# 48 deg 51' 24.00" N / 48°51'24"N / 48 51 24 / -48.857
+_DMS_RE = re.compile(
+    r"""^\s*(?P<sign>[-+])?(?P<deg>\d+(?:\.\d+)?)\s*(?:deg|°)?\s*
+        (?:(?P<min>\d+(?:\.\d+)?)\s*'?\s*)?
+        (?:(?P<sec>\d+(?:\.\d+)?)\s*(?:"|'')?\s*)?
+        (?P<ref>[NSEWnsew])?\s*$""",
+    re.VERBOSE
+)
+
+# Tags holding one coordinate, most reliable first (Composite values are signed)
+_LATITUDE_TAGS = ('Composite:GPSLatitude', 'EXIF:GPSLatitude', 'XMP:GPSLatitude', 'GPSLatitude')
+_LONGITUDE_TAGS = ('Composite:GPSLongitude', 'EXIF:GPSLongitude', 'XMP:GPSLongitude', 'GPSLongitude')
+
+# Tags holding "lat, lon[, alt]" pairs
+_POSITION_TAGS = ('Composite:GPSPosition', 'GPSPosition',
+                  'QuickTime:GPSCoordinates', 'Keys:GPSCoordinates', 'GPSCoordinates')
+
+
+def parse_coordinate(value: Any, ref: Optional[str] = None) -> Optional[float]:
+    """
+    Parse one GPS coordinate from ExifTool output
+
+    Handles numeric values (ExifTool -n) and the print-converted
+    degrees/minutes/seconds form. A hemisphere letter in the value or the
+    separate GPS*Ref tag ('S', 'W', 'South', 'West') makes it negative.
+
+    Args:
+        value: Coordinate tag value
+        ref: GPSLatitudeRef / GPSLongitudeRef value
+
+    Returns:
+        Signed decimal degrees or None
+    """
+    if value is None or value == '':
+        return None
+
+    if isinstance(value, (int, float)):
+        degrees = float(value)
+        hemisphere = None
+    else:
+        match = _DMS_RE.match(str(value))
+        if not match:
+            return None
+        degrees = float(match.group('deg'))
+        if match.group('min'):
+            degrees += float(match.group('min')) / 60
+        if match.group('sec'):
+            degrees += float(match.group('sec')) / 3600
+        if match.group('sign') == '-':
+            degrees = -degrees
+        hemisphere = match.group('ref')
+
+    hemisphere = hemisphere or (str(ref)[:1] if ref else None)
+    if hemisphere and hemisphere.upper() in ('S', 'W'):
+        degrees = -abs(degrees)
+
+    return degrees
+
+
+def _tag(exif_data: Dict[str, Any], names: Tuple[str, ...]) -> Any:
+    """First present value among several tag names"""
+    for name in names:
+        value = exif_data.get(name)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def extract_gps(exif_data: Dict[str, Any]) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Extract the GPS position of a file
+
+    Args:
+        exif_data: ExifTool output
+
+    Returns:
+        Tuple of (latitude, longitude); (None, None) if absent or invalid
+    """
+    latitude = parse_coordinate(
+        _tag(exif_data, _LATITUDE_TAGS),
+        _tag(exif_data, ('EXIF:GPSLatitudeRef', 'XMP:GPSLatitudeRef', 'GPSLatitudeRef'))
+    )
+    longitude = parse_coordinate(
+        _tag(exif_data, _LONGITUDE_TAGS),
+        _tag(exif_data, ('EXIF:GPSLongitudeRef', 'XMP:GPSLongitudeRef', 'GPSLongitudeRef'))
+    )
+
+    if latitude is None or longitude is None:
+        position = _tag(exif_data, _POSITION_TAGS)
+        if position is not None:
+            # Print-converted pairs are comma separated, numeric ones (-n) space separated
+            text = str(position).strip()
+            parts = text.split(',') if ',' in text else text.split()
+            if len(parts) >= 2:
+                latitude = parse_coordinate(parts[0])
+                longitude = parse_coordinate(parts[1])
+
+    if latitude is None or longitude is None:
+        return None, None
+    # 0,0 is what many cameras write without a fix
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or (latitude == 0 and longitude == 0):
+        return None, None
+
+    return latitude, longitude
+
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> Optional[float]:
+    """
+    Great-circle (haversine) distance between two points
+
+    Returns:
+        Distance in kilometres, or None if a coordinate is missing
+    """
+    if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
+        return None
+
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(latitude: float, longitude: float,
+                radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Bounding box that contains a circle on the globe
+
+    Used to let the R*Tree discard far-away rows before exact distances are
+    computed. The box may cross the antimeridian, in which case min_lon is
+    greater than max_lon.
+
+    Args:
+        latitude: Centre latitude
+        longitude: Centre longitude
+        radius_km: Radius in kilometres
+
+    Returns:
+        Tuple of (min_lat, min_lon, max_lat, max_lon)
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    min_lat = max(-90.0, latitude - dlat)
+    max_lat = min(90.0, latitude + dlat)
+
+    # Longitude degrees shrink towards the poles; the widest point of the
+    # circle is at the latitude furthest from the equator
+    widest = max(abs(min_lat), abs(max_lat))
+    cos_lat = math.cos(math.radians(widest))
+    if widest >= 90 or radius_km / (KM_PER_DEGREE * cos_lat) >= 180:
+        return min_lat, -180.0, max_lat, 180.0
+
+    dlon = radius_km / (KM_PER_DEGREE * cos_lat)
+    min_lon = (longitude - dlon + 180) % 360 - 180
+    max_lon = (longitude + dlon + 180) % 360 - 180
+    return min_lat, min_lon, max_lat, max_lon
@@ -0,0 +1,197 @@
+"""
+Dump importer for MetaFinder
+Ingests pre-extracted ExifTool JSON output without running ExifTool
+"""
+
+import gzip
+import json
+import os
+import time
+from pathlib import Path, PureWindowsPath
+from typing import Dict, List, Any, Iterator, Optional, Callable, TextIO, Tuple
+
+from .normalizer import MetadataNormalizer
+from .database import DatabaseManager
+
+
+def iter_json_objects(handle: TextIO,
+                      chunk_size: int = 64 * 1024,
+                      max_object_size: int = 64 * 1024 * 1024) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parse JSON objects from an ExifTool dump
+
+    Accepts both `exiftool -json` output (one top-level array) and JSON
+    Lines. The stream is read in chunks and each object is decoded as soon
+    as it is complete, so memory is bounded by the largest single object.
+
+    A decode error before the end of the stream may just be an object cut
+    off by the chunk boundary, so it always means "read more". Each refill
+    at least doubles the pending text, which keeps re-decoding a large
+    object linear in its size rather than quadratic.
+
+    Args:
+        handle: Text file handle positioned at the start of the dump
+        chunk_size: Characters read per refill (at least)
+        max_object_size: Largest object accepted, in characters
+
+    Returns:
+        Iterator of decoded objects
+
+    Raises:
+        ValueError: Malformed or oversized object (with its character offset)
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    offset = 0  # stream position of buffer[0], in characters
+    eof = False
+
+    while True:
+        # Skip whitespace and array punctuation between objects
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,[]':
+            pos += 1
+
+        if pos >= len(buffer):
+            if eof:
+                return
+            offset += len(buffer)
+            buffer = handle.read(chunk_size)
+            pos = 0
+            if not buffer:
+                return
+            continue
+
+        try:
+            obj, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise ValueError(f"Malformed JSON at character {offset + e.pos}: {e.msg}") from e
+            pending = len(buffer) - pos
+            if pending > max_object_size:
+                raise ValueError(f"JSON object at character {offset + pos} is larger than "
+                                 f"{max_object_size} characters or malformed "
+                                 f"({e.msg} at character {offset + e.pos})") from e
+
+            # Incomplete so far - keep the tail and refill
+            chunk = handle.read(max(chunk_size, pending))
+            if not chunk:
+                eof = True
+            offset += pos
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        pos = end
+        if isinstance(obj, dict):
+            yield obj
+
+
+def _is_absolute_source(source: str) -> bool:
+    """Whether a dumped SourceFile is absolute (POSIX, or Windows drive/UNC from another machine)"""
+    return os.path.isabs(source) or PureWindowsPath(source).is_absolute()
+
+
+class DumpImporter:
+    """
+    Bulk-imports ExifTool JSON/JSONL dumps into the database
+
+    Extraction can run next to the data (`exiftool -json -r`), and the
+    resulting dumps are indexed centrally at database speed.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, batch_size: int = 500):
+        """
+        Initialize importer
+
+        Args:
+            db_manager: Database manager to write records into
+            batch_size: Records inserted per transaction
+        """
+        self.db = db_manager
+        self.normalizer = MetadataNormalizer()
+        self.batch_size = batch_size
+
+    def import_dump(self,
+                    dump_path: str,
+                    progress_callback: Optional[Callable[[int], None]] = None,
+                    base_dir: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Import a single dump file
+
+        `exiftool -r DIR` writes SourceFile paths relative to the directory
+        it ran in, which is usually where the dump is saved, so relative
+        paths are resolved against the dump's directory by default.
+
+        Args:
+            dump_path: Path to .json, .jsonl or gzip-compressed dump
+            progress_callback: Function(records_read) called after each batch
+            base_dir: Directory relative SourceFile paths are resolved
+                against (default: the dump's directory)
+
+        Returns:
+            Dictionary with import statistics
+        """
+        path = Path(dump_path)
+        if not path.exists() or not path.is_file():
+            raise ValueError(f"Invalid dump path: {dump_path}")
+        base = os.path.abspath(base_dir) if base_dir else str(path.absolute().parent)
+
+        start = time.perf_counter()
+        imported = 0
+        failed = 0
+        total = 0
+        batch = []
+
+        opener = gzip.open if path.suffix.lower() == '.gz' else open
+        with opener(path, 'rt', encoding='utf-8') as handle:
+            for exif_data in iter_json_objects(handle):
+                total += 1
+
+                source = exif_data.get('SourceFile')
+                if not source:
+                    failed += 1
+                    continue
+                if not _is_absolute_source(str(source)):
+                    exif_data['SourceFile'] = os.path.normpath(os.path.join(base, str(source)))
+
+                batch.append(exif_data)
+                if len(batch) >= self.batch_size:
+                    written, errors = self._flush(batch)
+                    imported += written
+                    failed += errors
+                    batch = []
+                    if progress_callback:
+                        progress_callback(total)
+
+        if batch:
+            written, errors = self._flush(batch)
+            imported += written
+            failed += errors
+            if progress_callback:
+                progress_callback(total)
+
+        elapsed = time.perf_counter() - start
+
+        return {
+            'imported': imported,
+            'failed': failed,
+            'total': total,
+            'elapsed': elapsed,
+            'records_per_second': imported / elapsed if elapsed > 0 else 0,
+        }
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Normalize and insert one batch of dump objects
+
+        The dumped paths usually don't exist on this machine, so file info
+        comes from ExifTool's File:* tags rather than stat().
+
+        Returns:
+            Tuple of (records written, records failed)
+        """
+        records, failures = self.normalizer.normalize_batch(batch)
+        for source, error in failures:
+            print(f"❌ Error normalizing {source}: {error}")
+
+        return self.db.insert_files(records), len(failures)
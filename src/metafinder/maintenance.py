@@ -0,0 +1,109 @@
+"""
+Index maintenance for MetaFinder
+Removes rows for vanished files and keeps the database compact
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Set
+
+from .database import DatabaseManager
+
+
+class IndexMaintainer:
+    """
+    Prunes stale rows and runs SQLite housekeeping
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        """
+        Initialize maintainer
+
+        Args:
+            db_manager: Database manager to maintain
+        """
+        self.db = db_manager
+
+    def prune(self,
+              root: str,
+              optimize: bool = False,
+              vacuum: bool = False,
+              dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Delete indexed files below root that no longer exist on disk
+
+        Stale rows are found by set difference between the indexed paths
+        under root and a fresh walk of the tree. Candidates are re-checked
+        individually so that unreadable directories never cause deletions.
+
+        Args:
+            root: Folder whose indexed files should be checked
+            optimize: Run ANALYZE and PRAGMA optimize afterwards
+            vacuum: Release free pages afterwards
+            dry_run: Report what would be deleted without deleting
+
+        Returns:
+            Dictionary with prune statistics
+        """
+        folder = Path(root)
+        if not folder.exists() or not folder.is_dir():
+            raise ValueError(f"Invalid folder path: {root}")
+
+        root_path = str(folder.absolute())
+        timings = {}
+        size_before = self.db.get_storage_info()['size_bytes']
+
+        start = time.perf_counter()
+        on_disk = self._walk(root_path)
+        timings['walk'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        indexed = 0
+        stale_ids = []
+        for row_id, path in self.db.iter_paths_under(root_path):
+            indexed += 1
+            if path not in on_disk and not os.path.lexists(path):
+                stale_ids.append(row_id)
+        timings['diff'] = time.perf_counter() - start
+
+        deleted = 0
+        if stale_ids and not dry_run:
+            start = time.perf_counter()
+            deleted = self.db.delete_files(stale_ids)
+            timings['delete'] = time.perf_counter() - start
+
+        if (optimize or vacuum) and not dry_run:
+            start = time.perf_counter()
+            self.db.optimize(analyze=optimize, vacuum=vacuum)
+            timings['optimize'] = time.perf_counter() - start
+
+        size_after = self.db.get_storage_info()['size_bytes']
+
+        return {
+            'on_disk': len(on_disk),
+            'indexed': indexed,
+            'stale': len(stale_ids),
+            'deleted': deleted,
+            'size_before': size_before,
+            'size_after': size_after,
+            'reclaimed_bytes': max(size_before - size_after, 0),
+            'timings': timings,
+            'elapsed': sum(timings.values()),
+        }
+
+    def _walk(self, root_path: str) -> Set[str]:
+        """
+        Collect every file path below root
+
+        Args:
+            root_path: Absolute folder path
+
+        Returns:
+            Set of absolute file paths
+        """
+        paths = set()
+        for dirpath, _dirnames, filenames in os.walk(root_path):
+            for filename in filenames:
+                paths.add(os.path.join(dirpath, filename))
+        return paths
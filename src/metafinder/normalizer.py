@@ -6,36 +6,52 @@ Converts ExifTool output into our standardized database schema
 import os
 import hashlib
 from pathlib import Path
-from typing import Dict, Any, Optional
-from datetime import datetime
-import mimetypes
+from typing import Dict, List, Any, Optional, Tuple
+
+from .classifier import FileTypeClassifier, default_classifier
+from .dates import parse_exif_date
+from .geo import extract_gps
+from .values import extract_typed_values
+from .records import FileRecord
 
 
 class MetadataNormalizer:
     """Normalizes metadata from various sources into our schema"""
 
-    # Map file types based on MIME types
-    FILE_TYPE_MAP = {
-        'image': ['image/jpeg', 'image/png', 'image/gif', 'image/bmp', 'image/tiff', 'image/webp'],
-        'document': ['application/pdf', 'application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-                    'application/vnd.ms-excel', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                    'application/vnd.ms-powerpoint', 'application/vnd.openxmlformats-officedocument.presentationml.presentation'],
-        'audio': ['audio/mpeg', 'audio/mp4', 'audio/x-wav', 'audio/flac', 'audio/ogg'],
-        'video': ['video/mp4', 'video/x-msvideo', 'video/x-matroska', 'video/quicktime', 'video/x-ms-wmv'],
-        'archive': ['application/zip', 'application/x-rar-compressed', 'application/x-7z-compressed', 'application/x-tar'],
-        'executable': ['application/x-msdownload', 'application/x-executable'],
+    # Multipliers for ExifTool's print-converted FileSize
+    FILE_SIZE_UNITS = {
+        'bytes': 1,
+        'kb': 1024,
+        'kib': 1024,
+        'mb': 1024 ** 2,
+        'mib': 1024 ** 2,
+        'gb': 1024 ** 3,
+        'gib': 1024 ** 3,
+        'tb': 1024 ** 4,
+        'tib': 1024 ** 4,
     }
 
-    def __init__(self):
-        """Initialize normalizer"""
-        pass
+    def __init__(self, classifier: Optional[FileTypeClassifier] = None):
+        """
+        Initialize normalizer
 
-    def normalize_exiftool_output(self, exif_data: Dict[str, Any]) -> Dict[str, Any]:
+        Args:
+            classifier: File type registry (shared default if None)
+        """
+        self.classifier = classifier or default_classifier
+
+    def normalize_exiftool_output(self,
+                                  exif_data: Dict[str, Any],
+                                  stat_result: Optional[os.stat_result] = None,
+                                  use_filesystem: bool = True) -> FileRecord:
         """
         Convert ExifTool output to our database schema
 
         Args:
             exif_data: Raw output from ExifTool
+            stat_result: stat() taken during discovery, reused instead of a new stat
+            use_filesystem: Allow stat/header reads when no stat_result is given;
+                otherwise fall back to ExifTool's File:* tags
 
         Returns:
             Normalized file record
@@ -43,28 +59,36 @@ class MetadataNormalizer:
         file_path = exif_data.get('SourceFile', '')
         path_obj = Path(file_path)
 
+        # Discovery hands ExifTool absolute paths; only resolve relative ones
+        if os.path.isabs(file_path):
+            full_path = os.path.normpath(file_path)
+        else:
+            full_path = os.path.abspath(file_path)
+
         # Basic file info
-        record = {
-            'path': str(path_obj.absolute()),
-            'name': path_obj.name,
-            'extension': path_obj.suffix.lower(),
-        }
+        record = FileRecord(
+            path=full_path,
+            name=path_obj.name,
+            extension=path_obj.suffix.lower(),
+        )
 
         # File system metadata
-        try:
-            stat = path_obj.stat()
-            record['size'] = stat.st_size
-            record['created'] = stat.st_ctime
-            record['modified'] = stat.st_mtime
-            record['accessed'] = stat.st_atime
-        except (OSError, FileNotFoundError):
-            record['size'] = exif_data.get('FileSize', 0)
-            record['created'] = None
-            record['modified'] = None
-            record['accessed'] = None
+        if stat_result is None and use_filesystem:
+            try:
+                stat_result = path_obj.stat()
+            except (OSError, FileNotFoundError):
+                pass
+
+        if stat_result is not None:
+            record['size'] = stat_result.st_size
+            record['created'] = stat_result.st_ctime
+            record['modified'] = stat_result.st_mtime
+            record['accessed'] = stat_result.st_atime
+        else:
+            record.update(self._file_info_from_exif(exif_data))
 
         # Determine file type
-        record['file_type'] = self._determine_file_type(exif_data, path_obj)
+        record['file_type'] = self._determine_file_type(exif_data, path_obj, sniff=use_filesystem)
 
         # Extract common fields based on file type
         if record['file_type'] == 'image':
@@ -76,6 +100,12 @@ class MetadataNormalizer:
         elif record['file_type'] == 'video':
             record.update(self._extract_video_metadata(exif_data))
 
+        # GPS position (photos, videos and geotagged documents alike)
+        record['latitude'], record['longitude'] = extract_gps(exif_data)
+
+        # Typed numbers (exposure, duration, resolution, ...) for range filters
+        record.update(extract_typed_values(exif_data))
+
         # Store full metadata as JSON
         record['metadata'] = self._clean_metadata(exif_data)
 
@@ -87,41 +117,97 @@ class MetadataNormalizer:
 
         return record
 
-    def _determine_file_type(self, exif_data: Dict[str, Any], path_obj: Path) -> str:
+    def normalize_batch(self,
+                        metadata_list: List[Dict[str, Any]],
+                        stat_results: Optional[Dict[str, os.stat_result]] = None
+                        ) -> Tuple[List[FileRecord], List[Tuple[str, Exception]]]:
+        """
+        Normalize a whole ExifTool batch without per-file filesystem calls
+
+        File info comes from the discovery stat results where available and
+        from ExifTool's FileSize/FileModifyDate tags otherwise.
+
+        Args:
+            metadata_list: ExifTool output for one batch
+            stat_results: Map of path -> stat_result from discovery
+
+        Returns:
+            Tuple of (records, [(source file, error), ...])
+        """
+        stat_results = stat_results or {}
+        records = []
+        failures = []
+
+        for exif_data in metadata_list:
+            source = exif_data.get('SourceFile', '')
+            try:
+                stat_result = stat_results.get(os.path.normpath(source)) if source else None
+                records.append(self.normalize_exiftool_output(
+                    exif_data, stat_result=stat_result, use_filesystem=False
+                ))
+            except Exception as e:
+                failures.append((source, e))
+
+        return records, failures
+
+    def _file_info_from_exif(self, exif_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Derive size and timestamps from ExifTool's File group tags
+
+        Args:
+            exif_data: ExifTool output
+
+        Returns:
+            Dictionary with size, created, modified, accessed
+        """
+        def tag(name):
+            return exif_data.get(name) or exif_data.get(f'File:{name}')
+
+        return {
+            'size': self._parse_file_size(tag('FileSize')),
+            'created': self._parse_exif_date(tag('FileInodeChangeDate') or tag('FileCreateDate')),
+            'modified': self._parse_exif_date(tag('FileModifyDate')),
+            'accessed': self._parse_exif_date(tag('FileAccessDate')),
+        }
+
+    def _parse_file_size(self, value: Any) -> Optional[int]:
+        """
+        Parse ExifTool FileSize (numeric with -n, e.g. '2.3 MB' without)
+
+        Args:
+            value: FileSize tag value
+
+        Returns:
+            Size in bytes or None
+        """
+        if value is None:
+            return None
+        if isinstance(value, (int, float)):
+            return int(value)
+
+        parts = str(value).split()
+        try:
+            number = float(parts[0])
+        except (ValueError, IndexError):
+            return None
+
+        unit = parts[1].lower() if len(parts) > 1 else 'bytes'
+        return int(number * self.FILE_SIZE_UNITS.get(unit, 1))
+
+    def _determine_file_type(self, exif_data: Dict[str, Any], path_obj: Path, sniff: bool = True) -> str:
         """
         Determine file type from metadata and extension
 
         Args:
             exif_data: ExifTool output
             path_obj: Path object
+            sniff: Read the file header when MIME type and extension are unknown
 
         Returns:
             File type string
         """
-        # Try MIME type first
         mime_type = exif_data.get('MIMEType') or exif_data.get('File:MIMEType')
-        if mime_type:
-            for file_type, mime_list in self.FILE_TYPE_MAP.items():
-                if mime_type in mime_list:
-                    return file_type
-
-        # Fallback to extension-based detection
-        ext = path_obj.suffix.lower()
-        extension_map = {
-            'image': ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.webp', '.raw', '.cr2', '.nef'],
-            'document': ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.txt', '.rtf'],
-            'audio': ['.mp3', '.wav', '.flac', '.m4a', '.aac', '.ogg', '.wma'],
-            'video': ['.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm'],
-            'archive': ['.zip', '.rar', '.7z', '.tar', '.gz', '.bz2'],
-            'executable': ['.exe', '.dll', '.so', '.dylib'],
-            'code': ['.py', '.js', '.java', '.cpp', '.c', '.h', '.cs', '.php', '.rb', '.go', '.rs'],
-        }
-
-        for file_type, extensions in extension_map.items():
-            if ext in extensions:
-                return file_type
-
-        return 'unknown'
+        return self.classifier.classify(path_obj, mime_type=mime_type, sniff=sniff)
 
     def _extract_image_metadata(self, exif_data: Dict[str, Any]) -> Dict[str, Any]:
         """Extract image-specific metadata"""
@@ -131,12 +217,15 @@ class MetadataNormalizer:
         data['camera_make'] = exif_data.get('Make') or exif_data.get('EXIF:Make')
         data['camera_model'] = exif_data.get('Model') or exif_data.get('EXIF:Model')
 
-        # Date taken
+        # Date taken (EXIF 2.31 keeps the UTC offset in a separate tag)
         date_str = (exif_data.get('DateTimeOriginal') or
                    exif_data.get('CreateDate') or
                    exif_data.get('EXIF:DateTimeOriginal'))
+        offset = (exif_data.get('OffsetTimeOriginal') or
+                  exif_data.get('EXIF:OffsetTimeOriginal') or
+                  exif_data.get('OffsetTime'))
         if date_str:
-            data['date_taken'] = self._parse_exif_date(date_str)
+            data['date_taken'] = self._parse_exif_date(date_str, offset)
 
         # Author/Artist
         data['author'] = exif_data.get('Artist') or exif_data.get('Creator') or exif_data.get('EXIF:Artist')
@@ -202,36 +291,18 @@ class MetadataNormalizer:
 
         return data
 
-    def _parse_exif_date(self, date_str: str) -> Optional[float]:
+    def _parse_exif_date(self, date_str: str, offset: Optional[str] = None) -> Optional[float]:
         """
         Parse EXIF date string to timestamp
 
         Args:
             date_str: Date string from EXIF
+            offset: UTC offset tag value (e.g. OffsetTimeOriginal)
 
         Returns:
             Unix timestamp or None
         """
-        if not date_str:
-            return None
-
-        # Common EXIF date formats
-        formats = [
-            '%Y:%m:%d %H:%M:%S',
-            '%Y-%m-%d %H:%M:%S',
-            '%Y:%m:%d %H:%M:%S%z',
-            '%Y-%m-%dT%H:%M:%S',
-            '%Y-%m-%dT%H:%M:%SZ',
-        ]
-
-        for fmt in formats:
-            try:
-                dt = datetime.strptime(date_str[:19], fmt[:19])
-                return dt.timestamp()
-            except (ValueError, TypeError):
-                continue
-
-        return None
+        return parse_exif_date(date_str, offset)
 
     def _clean_metadata(self, exif_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -0,0 +1,607 @@
+"""
+Scan pipeline for MetaFinder
+Runs discovery, extraction, normalization and database writes concurrently
+"""
+
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Iterable, Tuple, Union
+
+from .normalizer import MetadataNormalizer
+from .database import DatabaseManager
+from .progress import ProgressReporter
+from .profiling import percentiles
+
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+def extension_of(path: Union[str, Path]) -> str:
+    """Lower-case extension used for per-extension costs ('(none)' if missing)"""
+    return os.path.splitext(str(path))[1].lower() or '(none)'
+
+
+class StageStats:
+    """Per-stage counters used to locate pipeline bottlenecks"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.bytes = 0             # file bytes handled (from the discovery stat)
+        self.busy = 0.0            # time spent doing work
+        self.waiting_input = 0.0   # time starved by the previous stage
+        self.blocked_output = 0.0  # time held back by the next stage (backpressure)
+        self.durations: List[float] = []  # busy time of each batch
+        self.done = False          # all input processed
+
+    def record(self, seconds: float, items: int, size: int = 0):
+        """Account one batch of work"""
+        self.busy += seconds
+        self.items += items
+        self.bytes += size
+        self.durations.append(seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'items': self.items,
+            'bytes': self.bytes,
+            'busy': self.busy,
+            'waiting_input': self.waiting_input,
+            'blocked_output': self.blocked_output,
+            'batches': len(self.durations),
+            'batch_seconds': percentiles(self.durations),
+        }
+
+
+class ScanControl:
+    """
+    Cooperative cancel/pause token for a running scan
+
+    Set from any thread (GUI buttons, signal handlers); the pipeline
+    checks it between files and batches. Pausing or cancelling only stops
+    new extraction work: batches already extracted are still normalized
+    and written, so no finished work is thrown away.
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set() and not self.cancelled
+
+    def cancel(self):
+        """Stop the scan after the batches already in flight"""
+        self._cancelled.set()
+        self._running.set()  # wake paused stages so they can wind down
+
+    def pause(self):
+        """Hold discovery and extraction at the next batch boundary"""
+        if not self.cancelled:
+            self._running.clear()
+
+    def resume(self):
+        """Continue a paused scan"""
+        self._running.set()
+
+    def wait(self) -> bool:
+        """
+        Block while paused
+
+        Returns:
+            False if the scan was cancelled, True to carry on
+        """
+        self._running.wait()
+        return not self.cancelled
+
+
+class ScanPipeline:
+    """
+    Producer/consumer scan pipeline
+
+    Stages are connected by bounded queues:
+
+        discovery -> [extract] -> extraction -> [normalize] -> normalization
+                  -> [write] -> writer
+
+    A full queue blocks the stage feeding it, so a slow stage throttles the
+    ones before it instead of buffering unbounded work. The writer runs on
+    its own thread with its own SQLite connection, so ExifTool keeps
+    extracting while batches are committed.
+
+    Failed files are kept in the scan_errors table when the run ends (see
+    MetadataScanner.retry_failed); files written successfully leave it.
+    """
+
+    def __init__(self,
+                 extract_batch: Callable[[List[str]], List[Dict[str, Any]]],
+                 db_path: str,
+                 normalizer: Optional[MetadataNormalizer] = None,
+                 image_hasher: Optional[Any] = None,
+                 isolate_failures: bool = True,
+                 batch_size: int = 100,
+                 queue_size: int = 4,
+                 progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 progress_interval: float = 0.25,
+                 control: Optional[ScanControl] = None,
+                 profile: bool = False):
+        """
+        Initialize pipeline
+
+        Args:
+            extract_batch: Function(paths) returning ExifTool metadata dicts
+            db_path: SQLite database file (the writer opens its own connection,
+                so ':memory:' databases are rejected)
+            normalizer: Metadata normalizer (creates default if None)
+            image_hasher: ImageHasher that adds perceptual hashes to image
+                records during normalization (None to skip hashing)
+            isolate_failures: Bisect batches that ExifTool fails on, so only
+                the bad files are lost instead of the whole batch
+            batch_size: Files per extraction batch
+            queue_size: Maximum batches buffered between two stages
+            progress_callback: Function(progress) with rate-limited progress
+                snapshots (see ProgressReporter); called from a ticker thread
+            progress_interval: Seconds between progress snapshots
+            control: Cancel/pause token checked between files and batches
+            profile: Time extraction and normalization per file extension
+                (batches are split by extension, costing extra ExifTool calls)
+        """
+        if str(db_path) == ':memory:' or str(db_path).startswith('file::memory:'):
+            raise ValueError("ScanPipeline needs a database file: the writer opens its own "
+                             "connection, which would get a separate, empty in-memory database")
+
+        self.extract_batch = extract_batch
+        self.db_path = db_path
+        self.normalizer = normalizer or MetadataNormalizer()
+        self.image_hasher = image_hasher
+        self.isolate_failures = isolate_failures
+        self.batch_size = batch_size
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+        self.control = control or ScanControl()
+        self.profile = profile
+
+        self.queues = {
+            'extract': queue.Queue(maxsize=queue_size),
+            'normalize': queue.Queue(maxsize=queue_size),
+            'write': queue.Queue(maxsize=queue_size),
+        }
+        self.high_water = {name: 0 for name in self.queues}
+        self.stages = {name: StageStats(name)
+                       for name in ('discovery', 'extraction', 'normalization', 'writer')}
+
+        self.discovered = 0
+        self.discovery_done = False
+        self.bytes_discovered = 0
+        self.written = 0
+        self.bytes_written = 0
+        self.current_file = ''
+        self.failed = 0
+        self.skipped = 0  # discovered but never extracted because of cancel
+        self.failures: List[Tuple[str, str, str]] = []  # (path, stage, error) of every failed file
+        self.isolation_calls = 0
+        # extension -> files and bytes discovered (+ seconds per stage when profiling)
+        self.extensions: Dict[str, Dict[str, Any]] = {}
+
+        self.source: Optional[Iterable[Any]] = None
+
+        self._lock = threading.Lock()
+        self._abort = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    def run(self, files: Iterable[Union[Path, Tuple[Path, os.stat_result]]]) -> Dict[str, Any]:
+        """
+        Push files through the pipeline and wait for completion
+
+        Args:
+            files: Iterable of file paths or (path, stat_result) tuples from
+                discovery (may be a lazy generator)
+
+        Returns:
+            Dictionary with scan statistics
+        """
+        start = time.perf_counter()
+        self.source = files
+
+        threads = [
+            threading.Thread(target=self._guard, args=(self._extract_stage,), name='metafinder-extract'),
+            threading.Thread(target=self._guard, args=(self._normalize_stage,), name='metafinder-normalize'),
+            threading.Thread(target=self._guard, args=(self._write_stage,), name='metafinder-writer'),
+        ]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        reporter = None
+        if self.progress_callback:
+            reporter = ProgressReporter(self.snapshot, self.progress_callback, self.progress_interval)
+            reporter.start()
+
+        try:
+            # Discovery runs on the calling thread
+            self._guard(self._discover_stage, files)
+
+            for thread in threads:
+                thread.join()
+        finally:
+            if reporter is not None:
+                reporter.stop()
+
+        if self._error is not None:
+            raise self._error
+
+        total = self.discovered
+        return {
+            'scanned': self.written,
+            'failed': self.failed,
+            'total': total,
+            'success_rate': (self.written / total * 100) if total > 0 else 0,
+            'elapsed': time.perf_counter() - start,
+            'cancelled': self.control.cancelled,
+            'skipped': self.skipped,
+            'errors': [(path, error) for path, _stage, error in self.failures],
+            'pipeline': {
+                'stages': {name: stage.to_dict() for name, stage in self.stages.items()},
+                'queue_high_water': dict(self.high_water),
+                'isolation_calls': self.isolation_calls,
+                'bytes_discovered': self.bytes_discovered,
+                'bytes_written': self.bytes_written,
+                'extensions': {extension: dict(cost) for extension, cost in self.extensions.items()},
+                'profiled': self.profile,
+            },
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a point-in-time view of pipeline progress
+
+        Returns:
+            Dictionary with counters, the current stage and queue depths
+        """
+        # A PriorityFeed has walked further than the files handed over so far
+        backlog = getattr(self.source, 'backlog', 0)
+        return {
+            'stage': self.current_stage(),
+            'discovered': self.discovered + backlog,
+            'discovery_done': self.discovery_done or getattr(self.source, 'exhausted', False),
+            'bytes_discovered': self.bytes_discovered,
+            'extracted': self.stages['extraction'].items,
+            'normalized': self.stages['normalization'].items,
+            'written': self.written,
+            'bytes_written': self.bytes_written,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'current_file': self.current_file,
+            'queues': {name: q.qsize() for name, q in self.queues.items()},
+        }
+
+    def current_stage(self) -> str:
+        """
+        Earliest stage that still has work
+
+        Returns:
+            'discovering', 'extracting', 'normalizing', 'writing' or 'done',
+            or 'paused' / 'stopping' while the control token holds the scan
+        """
+        if self.control.paused:
+            return 'paused'
+        if self.control.cancelled and not self.stages['writer'].done:
+            return 'stopping'
+        for name, label in (('discovery', 'discovering'), ('extraction', 'extracting'),
+                            ('normalization', 'normalizing'), ('writer', 'writing')):
+            if not self.stages[name].done:
+                return label
+        return 'done'
+
+    def _guard(self, stage: Callable, *args):
+        """Run a stage, recording the first error and stopping the others"""
+        try:
+            stage(*args)
+        except BaseException as e:
+            with self._lock:
+                if self._error is None:
+                    self._error = e
+            self._abort.set()
+
+    def _put(self, name: str, item: Any, stats: StageStats):
+        """Put into a bounded queue, accounting time blocked by backpressure"""
+        q = self.queues[name]
+        start = time.perf_counter()
+        while not self._abort.is_set():
+            try:
+                q.put(item, timeout=0.2)
+                break
+            except queue.Full:
+                continue
+        stats.blocked_output += time.perf_counter() - start
+        self.high_water[name] = max(self.high_water[name], q.qsize())
+
+    def _get(self, name: str, stats: StageStats) -> Any:
+        """Get from a queue, accounting time starved for input"""
+        q = self.queues[name]
+        start = time.perf_counter()
+        while not self._abort.is_set():
+            try:
+                item = q.get(timeout=0.2)
+                break
+            except queue.Empty:
+                continue
+        else:
+            item = _DONE
+        stats.waiting_input += time.perf_counter() - start
+        return item
+
+    def _discover_stage(self, files: Iterable[Union[Path, Tuple[Path, os.stat_result]]]):
+        """Group discovered files into extraction batches of (path, stat) pairs"""
+        stats = self.stages['discovery']
+        extensions = self.extensions
+        batch = []
+        batch_bytes = 0
+        busy_start = time.perf_counter()
+
+        try:
+            for item in files:
+                if self._abort.is_set():
+                    return
+                if self.control.cancelled:
+                    break
+                item = item if isinstance(item, tuple) else (item, None)
+                batch.append(item)
+                self.discovered += 1
+                size = item[1].st_size if item[1] is not None else 0
+                self.bytes_discovered += size
+                batch_bytes += size
+
+                extension = extension_of(item[0])
+                cost = extensions.get(extension)
+                if cost is None:
+                    cost = extensions[extension] = self._new_cost()
+                cost['files'] += 1
+                cost['bytes'] += size
+
+                if len(batch) >= self.batch_size:
+                    stats.record(time.perf_counter() - busy_start, len(batch), batch_bytes)
+                    busy_start = None
+                    # Pausing holds discovery here; cancelling drops the batch
+                    if not self.control.wait():
+                        break
+                    self._put('extract', batch, stats)
+                    batch = []
+                    batch_bytes = 0
+                    busy_start = time.perf_counter()
+
+            if batch and busy_start is not None:
+                stats.record(time.perf_counter() - busy_start, len(batch), batch_bytes)
+            if batch and self.control.wait():
+                self._put('extract', batch, stats)
+            else:
+                self._skip(batch)
+        finally:
+            self.discovery_done = True
+            stats.done = True
+            self._put('extract', _DONE, stats)
+
+    def _new_cost(self) -> Dict[str, Any]:
+        """Empty per-extension cost entry"""
+        cost = {'files': 0, 'bytes': 0}
+        if self.profile:
+            cost.update({'extraction': 0.0, 'normalization': 0.0})
+        return cost
+
+    def _charge(self, extension: str, stage: str, seconds: float):
+        """Add time to an extension's cost (profiling only)"""
+        cost = self.extensions.get(extension)
+        if cost is None:
+            cost = self.extensions[extension] = self._new_cost()
+        cost[stage] = cost.get(stage, 0.0) + seconds
+
+    def _groups(self, items: List[Any], key: Callable[[Any], str]) -> List[Tuple[Optional[str], List[Any]]]:
+        """Split a batch by file extension when profiling, else keep it whole"""
+        if not self.profile:
+            return [(None, items)]
+        groups: Dict[str, List[Any]] = {}
+        for item in items:
+            groups.setdefault(extension_of(key(item)), []).append(item)
+        return list(groups.items())
+
+    def _skip(self, batch: List[Any]):
+        """Count files dropped by a cancel (discovery and extraction both do)"""
+        with self._lock:
+            self.skipped += len(batch)
+
+    def _record_failures(self, failures: List[Tuple[str, Any]], stage: str):
+        """Count failed files and keep their errors"""
+        with self._lock:
+            self.failed += len(failures)
+            self.failures.extend((str(path), stage, str(error)) for path, error in failures)
+
+    def _isolate_failures(self, batch: List[Tuple[Path, Any]], error: Exception
+                          ) -> Tuple[List[Dict[str, Any]], List[Tuple[Path, Exception]]]:
+        """
+        Pin down the files that made a batch fail by bisection
+
+        The failed batch is split in halves and each half re-extracted;
+        halves that fail again are split further until single files remain.
+        With k bad files among n this costs at most 2k * log2(n) extra
+        ExifTool calls, and every good file's metadata is recovered.
+
+        Args:
+            batch: (path, stat) pairs of the failed batch
+            error: The batch's extraction error
+
+        Returns:
+            Tuple of (metadata of the good files, [(path, error), ...])
+        """
+        metadata_list = []
+        failures = []
+        pending = [(batch, error)]
+
+        while pending:
+            group, group_error = pending.pop()
+            if len(group) == 1:
+                failures.append((group[0][0], group_error))
+                continue
+
+            middle = len(group) // 2
+            for half in (group[:middle], group[middle:]):
+                self.isolation_calls += 1
+                try:
+                    metadata_list.extend(self.extract_batch([str(path) for path, _stat in half]))
+                except Exception as e:
+                    pending.append((half, e))
+
+        return metadata_list, failures
+
+    def _extract_stage(self):
+        """Run ExifTool on each batch"""
+        stats = self.stages['extraction']
+
+        while True:
+            batch = self._get('extract', stats)
+            if batch is _DONE:
+                break
+
+            # Cancelled: drain queued batches without extracting them
+            if not self.control.wait():
+                self._skip(batch)
+                continue
+
+            start = time.perf_counter()
+            metadata_list = []
+            extracted = []
+            for extension, group in self._groups(batch, lambda item: item[0]):
+                group_start = time.perf_counter()
+                group_metadata, group = self._extract(group)
+                if extension is not None:
+                    self._charge(extension, 'extraction', time.perf_counter() - group_start)
+                metadata_list.extend(group_metadata)
+                extracted.extend(group)
+
+            stats.record(time.perf_counter() - start, len(extracted),
+                         sum(stat.st_size for _path, stat in extracted if stat is not None))
+            self._put('normalize', (extracted, metadata_list), stats)
+
+        stats.done = True
+        self._put('normalize', _DONE, stats)
+
+    def _extract(self, batch: List[Tuple[Path, Any]]) -> Tuple[List[Dict[str, Any]], List[Tuple[Path, Any]]]:
+        """
+        Extract one batch, isolating the files ExifTool fails on
+
+        Args:
+            batch: (path, stat) pairs
+
+        Returns:
+            Tuple of (metadata list, (path, stat) pairs that extracted)
+        """
+        try:
+            return self.extract_batch([str(path) for path, _stat in batch]), batch
+        except Exception as e:
+            if not self.isolate_failures or len(batch) == 1:
+                print(f"❌ Batch extraction failed: {e}")
+                self._record_failures([(path, e) for path, _stat in batch], 'extraction')
+                return [], []
+
+            metadata_list, failures = self._isolate_failures(batch, e)
+            for path, error in failures:
+                print(f"❌ Extraction failed for {Path(path).name}: {error}")
+            self._record_failures(failures, 'extraction')
+
+            # Only the files that extracted go on to normalization
+            failed_paths = {path for path, _error in failures}
+            return metadata_list, [item for item in batch if item[0] not in failed_paths]
+
+    def _normalize_stage(self):
+        """Convert ExifTool output into database records"""
+        stats = self.stages['normalization']
+
+        while True:
+            item = self._get('normalize', stats)
+            if item is _DONE:
+                break
+
+            batch, metadata_list = item
+            start = time.perf_counter()
+
+            # Reuse discovery stats; files without one fall back to ExifTool's File tags
+            stat_results = {os.path.normpath(str(path)): stat
+                            for path, stat in batch if stat is not None}
+
+            records = []
+            for extension, group in self._groups(metadata_list, lambda data: data.get('SourceFile', '')):
+                group_start = time.perf_counter()
+                group_records, failures = self.normalizer.normalize_batch(group, stat_results)
+
+                for source, error in failures:
+                    print(f"❌ Error processing {Path(source).name}: {error}")
+                self._record_failures(failures, 'normalization')
+
+                if self.image_hasher is not None:
+                    self.image_hasher.hash_records(group_records)
+
+                if extension is not None:
+                    self._charge(extension, 'normalization', time.perf_counter() - group_start)
+                records.extend(group_records)
+
+            # ExifTool silently drops unreadable files from its output
+            if len(metadata_list) < len(batch):
+                returned = {os.path.normpath(str(item.get('SourceFile', ''))) for item in metadata_list}
+                self._record_failures([(path, 'no metadata returned by ExifTool')
+                                       for path, _stat in batch
+                                       if os.path.normpath(str(path)) not in returned],
+                                      'extraction')
+
+            stats.record(time.perf_counter() - start, len(records),
+                         sum(record.get('size') or 0 for record in records))
+            self._put('write', records, stats)
+
+        stats.done = True
+        self._put('write', _DONE, stats)
+
+    def _write_stage(self):
+        """Commit record batches on a dedicated connection"""
+        stats = self.stages['writer']
+        # sqlite3 connections may only be used by the thread that opened them
+        db = DatabaseManager(self.db_path)
+
+        try:
+            while True:
+                records = self._get('write', stats)
+                if records is _DONE:
+                    break
+
+                start = time.perf_counter()
+                written = db.insert_files(records)
+                size = sum(record.get('size') or 0 for record in records)
+                stats.record(time.perf_counter() - start, written, size)
+
+                # Plain counter updates; ProgressReporter samples them
+                self.written += written
+                self.bytes_written += size
+                if records:
+                    self.current_file = records[-1].get('name') or ''
+
+        finally:
+            # Normally every failure is recorded before the last batch reaches
+            # the writer. After an abort the other stages may still be running,
+            # but the failures seen so far are the ones users will want to retry.
+            try:
+                with self._lock:
+                    failures = list(self.failures)
+                if failures:
+                    db.record_scan_errors(failures)
+            except Exception as e:
+                print(f"⚠️  Could not record {len(failures)} scan errors: {e}")
+            finally:
+                stats.done = True
+                db.close()
@@ -0,0 +1,161 @@
+"""
+Scan profiling for MetaFinder
+Summarizes per-stage timings and per-extension costs of a scan
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, Sequence
+
+
+# Pipeline stages in processing order
+STAGES = ('discovery', 'extraction', 'normalization', 'writer')
+
+
+def percentiles(durations: Sequence[float]) -> Dict[str, Optional[float]]:
+    """
+    Summarize durations with nearest-rank percentiles
+
+    Args:
+        durations: Durations in seconds
+
+    Returns:
+        Dictionary with p50, p90, p99 and max (None if there are no durations)
+    """
+    if not durations:
+        return {'p50': None, 'p90': None, 'p99': None, 'max': None}
+
+    ordered = sorted(durations)
+    last = len(ordered) - 1
+
+    def rank(p):
+        return ordered[min(last, int(round(p / 100 * last)))]
+
+    return {'p50': rank(50), 'p90': rank(90), 'p99': rank(99), 'max': ordered[-1]}
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024.0:
+            return f"{size:.1f} {unit}"
+        size /= 1024.0
+    return f"{size:.1f} TB"
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value * 1000:.1f}" if value is not None else "-"
+
+
+def bottleneck(stats: Dict[str, Any]) -> Optional[str]:
+    """
+    Stage that spent the most time working
+
+    Args:
+        stats: Scan statistics (from ScanPipeline.run)
+
+    Returns:
+        Stage name, or None if nothing was timed
+    """
+    stages = stats.get('pipeline', {}).get('stages', {})
+    busiest = max(stages, key=lambda name: stages[name]['busy'], default=None)
+    if busiest is None or stages[busiest]['busy'] <= 0:
+        return None
+    return busiest
+
+
+def format_profile(stats: Dict[str, Any], top: int = 10) -> str:
+    """
+    Human-readable profile report of a scan (used by 'scan --profile')
+
+    Args:
+        stats: Scan statistics (from ScanPipeline.run)
+        top: Extensions listed in the cost breakdown
+
+    Returns:
+        Multi-line report
+    """
+    pipeline = stats['pipeline']
+    stages = pipeline['stages']
+    elapsed = stats.get('elapsed') or 0.0
+
+    lines = [
+        f"⏱️  Scan profile: {stats['total']:,} files, "
+        f"{_format_bytes(pipeline.get('bytes_discovered', 0))} in {elapsed:.2f}s",
+        "",
+        f"   {'stage':<14} {'busy':>8} {'of wall':>8} {'files/s':>9} {'MB/s':>8}   "
+        f"batch ms p50 / p90 / p99 / max",
+    ]
+    for name in STAGES:
+        stage = stages.get(name)
+        if stage is None:
+            continue
+        busy = stage['busy']
+        rate = stage['items'] / busy if busy > 0 else 0.0
+        throughput = stage['bytes'] / busy / 1024 ** 2 if busy > 0 else 0.0
+        share = busy / elapsed * 100 if elapsed > 0 else 0.0
+        timings = stage['batch_seconds']
+        lines.append(
+            f"   {name:<14} {busy:7.2f}s {share:7.1f}% {rate:9,.0f} {throughput:8.1f}   "
+            f"{_ms(timings['p50'])} / {_ms(timings['p90'])} / {_ms(timings['p99'])} / {_ms(timings['max'])}"
+        )
+
+    slowest = bottleneck(stats)
+    if slowest:
+        stage = stages[slowest]
+        lines.append(f"   Bottleneck: {slowest} (starved {stage['waiting_input']:.2f}s, "
+                     f"blocked {stage['blocked_output']:.2f}s)")
+
+    extensions = pipeline.get('extensions', {})
+    if extensions:
+        totals = {name: sum(ext.get(name, 0.0) for ext in extensions.values())
+                  for name in ('extraction', 'normalization')}
+        ranked = sorted(extensions.items(),
+                        key=lambda item: (item[1].get('extraction', 0.0), item[1]['bytes']),
+                        reverse=True)
+
+        lines += ["", f"   {'extension':<10} {'files':>9} {'size':>10}   {'extraction':>18}   {'normalization':>18}"]
+        for extension, cost in ranked[:top]:
+            columns = []
+            for name in ('extraction', 'normalization'):
+                if name in cost and totals[name] > 0:
+                    columns.append(f"{cost[name]:8.2f}s ({cost[name] / totals[name] * 100:5.1f}%)")
+                else:
+                    columns.append(f"{'-':>18}")
+            lines.append(f"   {extension:<10} {cost['files']:9,} {_format_bytes(cost['bytes']):>10}   "
+                         f"{columns[0]:>18}   {columns[1]:>18}")
+        if len(ranked) > top:
+            lines.append(f"   ... {len(ranked) - top} more extensions")
+        if not pipeline.get('profiled'):
+            lines.append("   (per-extension times are only measured with profiling enabled)")
+
+    return "\n".join(lines)
+
+
+def write_metrics(stats: Dict[str, Any], path: str, extra: Optional[Dict[str, Any]] = None) -> Path:
+    """
+    Write scan statistics to a JSON metrics file
+
+    The per-file error list is replaced by its length, so the file stays
+    small however many files failed.
+
+    Args:
+        stats: Scan statistics (from ScanPipeline.run)
+        path: Output file
+        extra: Additional top-level values (e.g. the scanned folder)
+
+    Returns:
+        Path of the written file
+    """
+    metrics = {key: value for key, value in stats.items() if key != 'errors'}
+    metrics['error_count'] = len(stats.get('errors', []))
+    metrics['bottleneck'] = bottleneck(stats)
+    metrics['generated'] = datetime.now().isoformat(timespec='seconds')
+    if extra:
+        metrics.update(extra)
+
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(metrics, f, indent=2)
+    return output
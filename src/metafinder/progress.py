@@ -0,0 +1,170 @@
+"""
+Scan progress reporting for MetaFinder
+Coalesces pipeline counters into rate-limited progress snapshots
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Callable
+
+
+class ProgressReporter:
+    """
+    Polls a counter source at a fixed rate and reports rich snapshots
+
+    The scan stages only bump counters; they never call back per file.
+    A ticker thread samples the source every `interval` seconds and adds
+    throughput (files/s, bytes/s over a sliding window), elapsed time and
+    ETA, so the callback runs a few times per second however fast files
+    are processed. A final snapshot is always reported by stop().
+    """
+
+    def __init__(self,
+                 source: Callable[[], Dict[str, Any]],
+                 callback: Callable[[Dict[str, Any]], None],
+                 interval: float = 0.25,
+                 window: float = 5.0):
+        """
+        Initialize reporter
+
+        Args:
+            source: Function returning raw counters (see ScanPipeline.snapshot)
+            callback: Function(progress) receiving each snapshot
+            interval: Seconds between snapshots
+            window: Seconds of history used for the throughput rates
+        """
+        self.source = source
+        self.callback = callback
+        self.interval = interval
+        self.window = window
+
+        self.started = time.perf_counter()
+        self._samples: deque = deque()  # (time, files processed, bytes processed)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the ticker thread"""
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='metafinder-progress', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the ticker and report the final snapshot"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.report()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.report()
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Sample the source and report one snapshot now
+
+        Returns:
+            The reported snapshot
+        """
+        progress = self.build(self.source(), time.perf_counter())
+        self.callback(progress)
+        return progress
+
+    def build(self, counters: Dict[str, Any], now: float) -> Dict[str, Any]:
+        """
+        Add elapsed time, throughput, percentage and ETA to raw counters
+
+        Args:
+            counters: Raw counters with at least 'discovered', 'discovery_done',
+                'written', 'failed' and 'bytes_written'
+            now: Current time.perf_counter() value
+
+        Returns:
+            Progress snapshot (a copy of counters plus derived values)
+        """
+        processed = counters['written'] + counters['failed']
+        processed_bytes = counters.get('bytes_written', 0)
+
+        samples = self._samples
+        samples.append((now, processed, processed_bytes))
+        while len(samples) > 2 and now - samples[0][0] > self.window:
+            samples.popleft()
+
+        # Sliding-window rates; fall back to the whole run for the first samples
+        first_time, first_files, first_bytes = samples[0]
+        if now - first_time < self.interval:
+            first_time, first_files, first_bytes = self.started, 0, 0
+        span = now - first_time
+        files_per_second = (processed - first_files) / span if span > 0 else 0.0
+        bytes_per_second = (processed_bytes - first_bytes) / span if span > 0 else 0.0
+
+        total = max(counters['discovered'], processed)
+        remaining = total - processed
+        eta = None
+        if counters['discovery_done']:
+            if remaining == 0:
+                eta = 0.0
+            elif files_per_second > 0:
+                eta = remaining / files_per_second
+
+        progress = dict(counters)
+        progress.update({
+            'processed': processed,
+            'total': total,
+            'percent': processed / total * 100 if total else 0.0,
+            'elapsed': now - self.started,
+            'files_per_second': files_per_second,
+            'bytes_per_second': bytes_per_second,
+            'eta': eta,
+        })
+        return progress
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+def _format_rate(bytes_per_second: float) -> str:
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if bytes_per_second < 1024.0:
+            return f"{bytes_per_second:.1f} {unit}/s"
+        bytes_per_second /= 1024.0
+    return f"{bytes_per_second:.1f} TB/s"
+
+
+def format_progress(progress: Dict[str, Any]) -> str:
+    """
+    One-line summary of a progress snapshot (shared by CLI and GUI)
+
+    Args:
+        progress: Snapshot from ProgressReporter
+
+    Returns:
+        e.g. '1,200/5,000 (24.0%) · 310 files/s · 42.5 MB/s · ETA 0:12 · extracting'
+    """
+    total = f"{progress['total']:,}" if progress['discovery_done'] else f"{progress['total']:,}+"
+    parts = [
+        f"{progress['processed']:,}/{total} ({progress['percent']:.1f}%)",
+        f"{progress['files_per_second']:.0f} files/s",
+        _format_rate(progress['bytes_per_second']),
+        f"ETA {_format_duration(progress['eta'])}" if progress['eta'] is not None else "ETA --",
+        progress.get('stage', ''),
+    ]
+    if progress['failed']:
+        parts.append(f"{progress['failed']:,} failed")
+    return " · ".join(part for part in parts if part)
@@ -0,0 +1,125 @@
+"""
+Background query runner for MetaFinder
+Keeps interactive searches off the UI thread and cancels superseded ones
+"""
+
+import threading
+from typing import Any, Callable, Optional
+
+from .database import DatabaseManager
+
+
+# Query function: receives the runner's own DatabaseManager, returns a result
+QueryFunction = Callable[[DatabaseManager], Any]
+
+
+class QueryRunner:
+    """
+    Runs database queries on a single worker thread, latest request wins
+
+    Every submit() supersedes the previous request: a query that has not
+    started yet is dropped, and one that is running is aborted from
+    SQLite's progress handler, so typing quickly never queues up work.
+    Results (and errors) are only delivered for the most recent request;
+    callbacks run on the worker thread, so GUI callers marshal them with
+    after() and re-check is_current() there.
+    """
+
+    # SQLite virtual machine steps between cancellation checks
+    PROGRESS_STEPS = 1000
+
+    def __init__(self,
+                 db_path: str,
+                 on_result: Callable[[int, Any], None],
+                 on_error: Optional[Callable[[int, str], None]] = None):
+        """
+        Initialize runner and start its worker thread
+
+        Args:
+            db_path: Database file (the worker opens its own connection,
+                since sqlite3 connections are bound to their creating thread)
+            on_result: Function(generation, result) for the latest query
+            on_error: Function(generation, message) if the latest query fails
+        """
+        self.db_path = db_path
+        self.on_result = on_result
+        self.on_error = on_error
+
+        self.generation = 0
+        self._pending: Optional[QueryFunction] = None
+        self._stopped = False
+        self._condition = threading.Condition()
+
+        self._thread = threading.Thread(target=self._run, name='metafinder-query', daemon=True)
+        self._thread.start()
+
+    def submit(self, query: QueryFunction) -> int:
+        """
+        Run a query, superseding any earlier one
+
+        Args:
+            query: Function(db) returning the result to deliver
+
+        Returns:
+            Generation number of this request
+        """
+        with self._condition:
+            self.generation += 1
+            self._pending = query
+            self._condition.notify()
+            return self.generation
+
+    def cancel(self):
+        """Abandon the pending and running queries without starting a new one"""
+        with self._condition:
+            self.generation += 1
+            self._pending = None
+
+    def is_current(self, generation: int) -> bool:
+        """Whether a generation is still the latest request"""
+        return generation == self.generation
+
+    def close(self):
+        """Cancel outstanding work and stop the worker thread"""
+        with self._condition:
+            self._stopped = True
+            self.generation += 1
+            self._pending = None
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self):
+        """Worker loop: run the latest request, drop superseded results"""
+        db = DatabaseManager(self.db_path)
+        running = {'generation': 0}
+
+        # Returning non-zero aborts the running statement (OperationalError: interrupted)
+        db.conn.set_progress_handler(
+            lambda: running['generation'] != self.generation,
+            self.PROGRESS_STEPS
+        )
+
+        try:
+            while True:
+                with self._condition:
+                    while self._pending is None and not self._stopped:
+                        self._condition.wait()
+                    if self._stopped:
+                        return
+                    query = self._pending
+                    self._pending = None
+                    running['generation'] = self.generation
+
+                generation = running['generation']
+                try:
+                    result = query(db)
+                except Exception as e:
+                    # A superseded query fails with 'interrupted'; only report live ones
+                    if self.is_current(generation) and self.on_error:
+                        self.on_error(generation, str(e))
+                    continue
+
+                if self.is_current(generation):
+                    self.on_result(generation, result)
+        finally:
+            db.close()
@@ -0,0 +1,130 @@
+"""
+Record type for MetaFinder
+Compact, slotted file record with a dict-compatible interface
+"""
+
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+
+class FileRecord:
+    """
+    One indexed file
+
+    Uses __slots__ instead of a per-record dict, which cuts the memory of
+    large result lists (GUI results, scan batches) several times over.
+    Supports the mapping operations existing callers use (record['name'],
+    record.get(), update(), dict(record), 'x' in record), so it can stand
+    in for the plain dicts used before.
+
+    Keys outside FIELDS (e.g. columns added by later schema versions) are
+    kept in a small overflow dict.
+    """
+
+    FIELDS: Tuple[str, ...] = (
+        'id', 'path', 'name', 'extension', 'size',
+        'created', 'modified', 'accessed',
+        'file_type', 'author', 'title', 'date_taken',
+        'camera_make', 'camera_model',
+        'metadata', 'searchable_text', 'scan_date', 'file_hash',
+        'phash', 'latitude', 'longitude',
+        'exposure_time', 'f_number', 'focal_length', 'duration_s',
+        'width', 'height', 'bpm', 'page_count', 'bitrate',
+    )
+
+    __slots__ = FIELDS + ('_extra',)
+
+    _FIELD_SET = frozenset(FIELDS)
+
+    def __init__(self, **values):
+        """
+        Initialize record (unset fields are None)
+
+        Args:
+            **values: Field values
+        """
+        for field in self.FIELDS:
+            setattr(self, field, None)
+        self._extra: Optional[Dict[str, Any]] = None
+        if values:
+            self.update(values)
+
+    @classmethod
+    def from_row(cls, row) -> 'FileRecord':
+        """
+        Build a record from a sqlite3.Row (or any mapping with keys())
+
+        Args:
+            row: Database row
+
+        Returns:
+            FileRecord
+        """
+        record = cls()
+        for key in row.keys():
+            record[key] = row[key]
+        return record
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._FIELD_SET:
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self._FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._FIELD_SET or (self._extra is not None and key in self._extra)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.FIELDS) + (len(self._extra) if self._extra else 0)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (FileRecord, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    # Mutable and compared by value like a dict, so unhashable like one too
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"FileRecord(path={self.path!r}, file_type={self.file_type!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a field value (None if unset), or default if the key is unknown"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        """Field names (fixed fields first, then overflow keys)"""
+        if self._extra:
+            return list(self.FIELDS) + list(self._extra)
+        return list(self.FIELDS)
+
+    def values(self):
+        """Field values in keys() order"""
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        """(name, value) pairs in keys() order"""
+        return [(key, self[key]) for key in self.keys()]
+
+    def update(self, values: Dict[str, Any]):
+        """Set several fields from a mapping"""
+        for key, value in values.items():
+            self[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a plain dict"""
+        return dict(self.items())
@@ -4,19 +4,22 @@ Uses PyExifTool to extract metadata from files
 """
 
 import os
+import json
+import shutil
+import importlib.util
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator, Tuple, Union
 import subprocess
 import sys
 
-try:
-    import exiftool
-    EXIFTOOL_AVAILABLE = True
-except ImportError:
-    EXIFTOOL_AVAILABLE = False
+# PyExifTool is imported when a scan starts; checking for it is enough here
+EXIFTOOL_AVAILABLE = importlib.util.find_spec('exiftool') is not None
 
 from .normalizer import MetadataNormalizer
 from .database import DatabaseManager
+from .pipeline import ScanPipeline, ScanControl
+from .scheduler import ScanPriority, PriorityFeed
+from .similarity import ImageHasher, PIL_AVAILABLE
 
 
 class MetadataScanner:
@@ -24,12 +27,17 @@ class MetadataScanner:
     Scans folders and extracts metadata using PyExifTool
     """
 
-    def __init__(self, db_manager: Optional[DatabaseManager] = None):
+    def __init__(self,
+                 db_manager: Optional[DatabaseManager] = None,
+                 batch_size: int = 100,
+                 isolate_failures: bool = True):
         """
         Initialize scanner
 
         Args:
             db_manager: Database manager instance (creates default if None)
+            batch_size: Files per ExifTool call
+            isolate_failures: Bisect failed batches to save their good files
         """
         if not EXIFTOOL_AVAILABLE:
             raise ImportError(
@@ -40,6 +48,8 @@ class MetadataScanner:
 
         self.db = db_manager or DatabaseManager()
         self.normalizer = MetadataNormalizer()
+        self.batch_size = batch_size
+        self.isolate_failures = isolate_failures
         self.exiftool_path = self._find_exiftool()
         self._verify_exiftool()
 
@@ -50,35 +60,15 @@ class MetadataScanner:
         Returns:
             Path to exiftool executable
         """
-        # Check bundled version first (in vendor/bin/)
-        bundled_paths = [
-            Path(__file__).parent.parent.parent / 'vendor' / 'bin' / 'exiftool.exe',  # Windows
-            Path(__file__).parent.parent.parent / 'vendor' / 'bin' / 'exiftool',      # Unix
-        ]
-
-        for path in bundled_paths:
-            if path.exists():
-                print(f"✅ Using bundled ExifTool: {path}")
-                return str(path)
-
-        # Fall back to system PATH
-        return 'exiftool'
+        path = find_exiftool()
+        if path != 'exiftool':
+            print(f"✅ Using bundled ExifTool: {path}")
+        return path
 
     def _verify_exiftool(self):
         """Verify ExifTool binary is installed and working"""
-        try:
-            result = subprocess.run(
-                [self.exiftool_path, '-ver'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            version = float(result.stdout.strip())
-            if version < 12.15:
-                print(f"⚠️  Warning: ExifTool {version} is older than recommended (12.15+)")
-            else:
-                print(f"✅ ExifTool {version} ready")
-        except FileNotFoundError:
+        version = probe_exiftool(self.exiftool_path, toolchain_cache(self.db.db_path))
+        if version is None:
             raise RuntimeError(
                 "ExifTool binary not found!\n\n"
                 "Quick fix: Place exiftool.exe in vendor/bin/ folder\n"
@@ -88,96 +78,120 @@ class MetadataScanner:
                 "  - macOS: brew install exiftool\n"
                 "  - Linux: apt install libimage-exiftool-perl"
             )
-        except subprocess.TimeoutExpired:
-            raise RuntimeError("ExifTool check timed out")
+        if version < 12.15:
+            print(f"⚠️  Warning: ExifTool {version} is older than recommended (12.15+)")
+        else:
+            print(f"✅ ExifTool {version} ready")
 
     def scan_folder(self,
                    folder_path: str,
                    recursive: bool = True,
                    file_extensions: Optional[List[str]] = None,
-                   progress_callback: Optional[Callable[[int, int, str], None]] = None) -> Dict[str, Any]:
+                   progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                   file_types: Optional[List[str]] = None,
+                   control: Optional[ScanControl] = None,
+                   profile: bool = False,
+                   priority: Optional[ScanPriority] = None) -> Dict[str, Any]:
         """
         Scan folder and extract metadata from all files
 
+        Discovery, extraction, normalization and database writes run as
+        concurrent pipeline stages (see ScanPipeline).
+
         Args:
             folder_path: Path to folder to scan
             recursive: Scan subdirectories
             file_extensions: List of extensions to include (e.g., ['.jpg', '.pdf'])
-            progress_callback: Function(current, total, filename) for progress updates
+            progress_callback: Function(progress) with rate-limited snapshots: counts,
+                files/s, bytes/s, ETA, stage and failures (see ProgressReporter)
+            file_types: Only extract these file types (classified before ExifTool runs)
+            control: Token to pause or cancel the scan from another thread;
+                files extracted before a cancel are still written
+            profile: Also time extraction and normalization per file extension
+                (stage timings, bytes and percentiles are always in stats['pipeline'])
+            priority: Scan order policy (pinned folders, preferred types, newest
+                first); None scans in discovery order
 
         Returns:
-            Dictionary with scan statistics
+            Dictionary with scan statistics ('cancelled' is True if stopped early)
         """
-        folder = Path(folder_path)
+        # Absolute paths keep discovery consistent with pinned folders and stored paths
+        folder = Path(os.path.abspath(folder_path))
         if not folder.exists() or not folder.is_dir():
             raise ValueError(f"Invalid folder path: {folder_path}")
 
         print(f"🔍 Discovering files in {folder_path}...")
-
-        # Discover files
-        files = self._discover_files(folder, recursive, file_extensions)
-        total_files = len(files)
-
-        if total_files == 0:
-            print("❌ No files found to scan")
-            return {'scanned': 0, 'failed': 0, 'total': 0}
-
-        print(f"📂 Found {total_files} files")
         print(f"🚀 Starting metadata extraction with PyExifTool...")
 
-        # Process in batches for better performance
-        batch_size = 100
-        scanned = 0
-        failed = 0
+        # Files are streamed into the pipeline as they are discovered,
+        # together with their stat so the normalizer doesn't stat again
+        files = self._iter_file_entries(folder, recursive, file_extensions, file_types)
+        if priority is not None:
+            files = PriorityFeed(
+                self._iter_pinned_first(folder, recursive, file_extensions, file_types, priority),
+                priority
+            )
 
         try:
-            with exiftool.ExifToolHelper(executable=self.exiftool_path) as et:
-                for i in range(0, total_files, batch_size):
-                    batch = files[i:i + batch_size]
-                    batch_paths = [str(f) for f in batch]
-
-                    try:
-                        # Extract metadata for batch (single call!)
-                        metadata_list = et.get_metadata(batch_paths)
-
-                        # Process and store each file
-                        for j, metadata in enumerate(metadata_list):
-                            file_path = batch[j]
-
-                            if progress_callback:
-                                progress_callback(scanned + j + 1, total_files, file_path.name)
-
-                            try:
-                                # Normalize and store
-                                record = self.normalizer.normalize_exiftool_output(metadata)
-                                self.db.insert_file(record)
-                                scanned += 1
-                            except Exception as e:
-                                print(f"❌ Error processing {file_path.name}: {e}")
-                                failed += 1
-
-                    except Exception as e:
-                        print(f"❌ Batch extraction failed: {e}")
-                        failed += len(batch)
-
+            stats = self._run_pipeline(files, progress_callback, control, profile)
         except Exception as e:
             print(f"❌ Scanner error: {e}")
             raise
 
-        stats = {
-            'scanned': scanned,
-            'failed': failed,
-            'total': total_files,
-            'success_rate': (scanned / total_files * 100) if total_files > 0 else 0
-        }
+        if stats['total'] == 0:
+            print("❌ No files found to scan")
+            return stats
 
-        print(f"\n✅ Scan complete!")
-        print(f"   📊 {scanned}/{total_files} files processed ({stats['success_rate']:.1f}% success)")
-        if failed > 0:
-            print(f"   ⚠️  {failed} files failed")
+        if stats['cancelled']:
+            print(f"\n⏹️  Scan stopped: {stats['skipped']} files left unscanned")
+        else:
+            print(f"\n✅ Scan complete!")
+        print(f"   📊 {stats['scanned']}/{stats['total']} files processed ({stats['success_rate']:.1f}% success)")
+        if stats['failed'] > 0:
+            print(f"   ⚠️  {stats['failed']} files failed")
 
         return stats
 
+    def _run_pipeline(self,
+                      files: Iterable[Union[Path, Tuple[Path, os.stat_result]]],
+                      progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                      control: Optional[ScanControl] = None,
+                      profile: bool = False) -> Dict[str, Any]:
+        """
+        Run files through the extraction pipeline
+
+        Args:
+            files: Iterable of file paths or (path, stat_result) tuples
+            progress_callback: Function(progress) with rate-limited snapshots: counts,
+                files/s, bytes/s, ETA, stage and failures (see ProgressReporter)
+            control: Cancel/pause token
+            profile: Time extraction and normalization per file extension
+
+        Returns:
+            Scan statistics
+        """
+        import exiftool
+
+        # Perceptual hashes are only computed when Pillow is installed
+        image_hasher = ImageHasher() if PIL_AVAILABLE else None
+        try:
+            with exiftool.ExifToolHelper(executable=self.exiftool_path) as et:
+                pipeline = ScanPipeline(
+                    et.get_metadata,
+                    str(self.db.db_path),
+                    normalizer=self.normalizer,
+                    image_hasher=image_hasher,
+                    isolate_failures=self.isolate_failures,
+                    batch_size=self.batch_size,
+                    progress_callback=progress_callback,
+                    control=control,
+                    profile=profile
+                )
+                return pipeline.run(files)
+        finally:
+            if image_hasher is not None:
+                image_hasher.close()
+
     def scan_single_file(self, file_path: str) -> Optional[Dict[str, Any]]:
         """
         Scan a single file and return its metadata
@@ -192,6 +206,8 @@ class MetadataScanner:
         if not path.exists() or not path.is_file():
             raise ValueError(f"Invalid file path: {file_path}")
 
+        import exiftool
+
         try:
             with exiftool.ExifToolHelper(executable=self.exiftool_path) as et:
                 metadata_list = et.get_metadata([str(path)])
@@ -217,23 +233,108 @@ class MetadataScanner:
         Returns:
             List of file paths
         """
-        files = []
+        return list(self._iter_files(folder, recursive, file_extensions))
+
+    def _iter_files(self,
+                    folder: Path,
+                    recursive: bool,
+                    file_extensions: Optional[List[str]] = None,
+                    file_types: Optional[List[str]] = None) -> Iterator[Path]:
+        """
+        Lazily yield files in folder as they are found
+
+        Args:
+            folder: Folder path
+            recursive: Scan subdirectories
+            file_extensions: Filter by extensions
+            file_types: Filter by file type (extension lookup, header sniff fallback)
+
+        Returns:
+            Iterator of file paths
+        """
+        for path, _stat in self._iter_file_entries(folder, recursive, file_extensions, file_types):
+            yield path
+
+    def _iter_file_entries(self,
+                           folder: Path,
+                           recursive: bool,
+                           file_extensions: Optional[List[str]] = None,
+                           file_types: Optional[List[str]] = None) -> Iterator[Tuple[Path, os.stat_result]]:
+        """
+        Lazily yield files together with the stat taken during discovery
+
+        Uses os.scandir, so directory listings provide the file/dir check
+        and each file is stat'ed exactly once. The stat result travels
+        with the path so the normalizer doesn't have to stat again.
+
+        Args:
+            folder: Folder path
+            recursive: Scan subdirectories
+            file_extensions: Filter by extensions
+            file_types: Filter by file type (extension lookup, header sniff fallback)
 
+        Returns:
+            Iterator of (path, stat_result) tuples
+        """
+        classifier = self.normalizer.classifier
+        wanted = set(file_types) if file_types else None
+
+        stack = [str(folder)]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if recursive:
+                                    stack.append(entry.path)
+                                continue
+                            if not entry.is_file():
+                                continue
+
+                            # Filter by extension if specified
+                            if file_extensions:
+                                if os.path.splitext(entry.name)[1].lower() not in file_extensions:
+                                    continue
+
+                            path = Path(entry.path)
+                            if wanted and classifier.classify(path) not in wanted:
+                                continue
+
+                            yield path, entry.stat()
+                        except OSError:
+                            continue
+            except OSError as e:
+                print(f"⚠️  Cannot read {directory}: {e}")
+
+    def _iter_pinned_first(self,
+                           folder: Path,
+                           recursive: bool,
+                           file_extensions: Optional[List[str]],
+                           file_types: Optional[List[str]],
+                           priority: ScanPriority) -> Iterator[Tuple[Path, os.stat_result]]:
+        """
+        Discover pinned folders inside folder first, then the rest of it
+
+        Returns:
+            Iterator of (path, stat_result) tuples, each file once
+        """
+        pinned = []
         if recursive:
-            pattern = '**/*'
-        else:
-            pattern = '*'
+            inside = ScanPriority(pinned=[str(folder)])
+            for candidate in sorted(priority.pinned):
+                # Nested pinned folders are covered by their parent's walk
+                if inside.is_pinned(candidate) and not ScanPriority(pinned=pinned).is_pinned(candidate):
+                    pinned.append(candidate)
 
-        for item in folder.glob(pattern):
-            if item.is_file():
-                # Filter by extension if specified
-                if file_extensions:
-                    if item.suffix.lower() in file_extensions:
-                        files.append(item)
-                else:
-                    files.append(item)
+        for pinned_folder in pinned:
+            yield from self._iter_file_entries(Path(pinned_folder), recursive, file_extensions, file_types)
 
-        return files
+        for path, stat in self._iter_file_entries(folder, recursive, file_extensions, file_types):
+            if pinned and priority.is_pinned(str(path)):
+                continue
+            yield path, stat
 
     def rescan_changed_files(self, folder_path: str) -> Dict[str, Any]:
         """
@@ -246,21 +347,19 @@ class MetadataScanner:
             Scan statistics
         """
         folder = Path(folder_path)
-        files = self._discover_files(folder, recursive=True)
 
         changed_files = []
-        for file in files:
+        for file, stat in self._iter_file_entries(folder, recursive=True):
             # Check if file exists in database
             existing = self.db.get_file_by_path(str(file.absolute()))
 
             if not existing:
                 # New file
-                changed_files.append(file)
+                changed_files.append((file, stat))
             else:
-                # Check if modified
-                stat = file.stat()
-                if stat.st_mtime > existing['modified']:
-                    changed_files.append(file)
+                # Check if modified (stat comes from discovery)
+                if existing['modified'] is None or stat.st_mtime > existing['modified']:
+                    changed_files.append((file, stat))
 
         if not changed_files:
             print("✅ No changed files found")
@@ -271,68 +370,181 @@ class MetadataScanner:
         # Scan changed files
         return self._scan_file_list(changed_files)
 
-    def _scan_file_list(self, files: List[Path]) -> Dict[str, Any]:
-        """Internal method to scan a list of files"""
-        total_files = len(files)
-        scanned = 0
-        failed = 0
+    def scan_files(self, file_paths: List[str]) -> Dict[str, Any]:
+        """
+        Extract and store metadata for an explicit list of files
 
-        batch_size = 100
+        Each file is stat'ed here, like during discovery, so the index gets
+        the exact modification time rather than ExifTool's whole seconds
+        (rescan_changed_files compares against it).
 
-        try:
-            with exiftool.ExifToolHelper(executable=self.exiftool_path) as et:
-                for i in range(0, total_files, batch_size):
-                    batch = files[i:i + batch_size]
-                    batch_paths = [str(f) for f in batch]
-
-                    try:
-                        metadata_list = et.get_metadata(batch_paths)
-
-                        for j, metadata in enumerate(metadata_list):
-                            try:
-                                record = self.normalizer.normalize_exiftool_output(metadata)
-                                self.db.insert_file(record)
-                                scanned += 1
-                            except Exception as e:
-                                print(f"❌ Error: {e}")
-                                failed += 1
-
-                    except Exception as e:
-                        print(f"❌ Batch failed: {e}")
-                        failed += len(batch)
+        Args:
+            file_paths: Paths of files to (re)index
+
+        Returns:
+            Scan statistics
+        """
+        files = []
+        for file_path in file_paths:
+            path = Path(file_path)
+            try:
+                files.append((path, path.stat()))
+            except OSError:
+                files.append(path)  # gone or unreadable; extraction reports it
+        return self._scan_file_list(files)
+
+    def retry_failed(self, max_attempts: int = 5, force: bool = False) -> Dict[str, Any]:
+        """
+        Rescan files recorded in scan_errors whose retry backoff has expired
+
+        Transient failures (locked files, network shares dropping out) are
+        picked up without a full rescan. Each failed retry doubles the
+        file's wait; files that no longer exist are forgotten.
+
+        Args:
+            max_attempts: Give up on files that already failed this many times
+            force: Retry every recorded file now, ignoring the backoff
+
+        Returns:
+            Scan statistics plus 'gone' (files dropped) and 'waiting'
+            (failures left for a later retry)
+        """
+        errors = self.db.get_scan_errors(due=not force, max_attempts=max_attempts)
+
+        files = []
+        gone = []
+        for error in errors:
+            path = Path(error['path'])
+            try:
+                files.append((path, path.stat()))
+            except OSError:
+                gone.append(error['path'])
+        if gone:
+            self.db.clear_scan_errors(gone)
+
+        stats = {'scanned': 0, 'failed': 0, 'total': 0, 'success_rate': 0}
+        if files:
+            print(f"🔁 Retrying {len(files)} failed files...")
+            try:
+                stats = self._run_pipeline(files)
+            except Exception as e:
+                # The run never got to record its failures; count the attempt anyway
+                print(f"❌ Scanner error: {e}")
+                self.db.record_scan_errors([(str(path), 'extraction', str(e)) for path, _stat in files])
+                stats = {'scanned': 0, 'failed': len(files), 'total': len(files), 'success_rate': 0}
+
+        stats['gone'] = len(gone)
+        stats['waiting'] = self.db.count_scan_errors()
+        return stats
 
+    def _scan_file_list(self, files: List[Union[Path, Tuple[Path, os.stat_result]]]) -> Dict[str, Any]:
+        """Internal method to scan a list of files"""
+        try:
+            return self._run_pipeline(files)
         except Exception as e:
             print(f"❌ Scanner error: {e}")
+            return {
+                'scanned': 0,
+                'failed': len(files),
+                'total': len(files),
+                'success_rate': 0
+            }
 
-        return {
-            'scanned': scanned,
-            'failed': failed,
-            'total': total_files,
-            'success_rate': (scanned / total_files * 100) if total_files > 0 else 0
-        }
 
+def find_exiftool() -> str:
+    """
+    Locate the ExifTool binary (bundled vendor/bin copy first, then PATH)
 
-def check_requirements() -> Dict[str, bool]:
+    Returns:
+        Path to the executable, or 'exiftool' if none was found
     """
-    Check if all requirements are installed
+    vendor_bin = Path(__file__).parent.parent.parent / 'vendor' / 'bin'
+    for path in (vendor_bin / 'exiftool.exe', vendor_bin / 'exiftool'):
+        if path.exists():
+            return str(path)
+    return 'exiftool'
+
+
+def toolchain_cache(db_path: Union[str, Path]) -> Optional[Path]:
+    """
+    Probe cache file kept next to a database (like the thumbnail cache)
+
+    Args:
+        db_path: Database file path
 
     Returns:
-        Dictionary with requirement status
+        Cache file path, or None for in-memory databases
+    """
+    if str(db_path) == ':memory:' or str(db_path).startswith('file::memory:'):
+        return None
+    return Path(db_path).parent / 'toolchain.json'
+
+
+def probe_exiftool(executable: Optional[str] = None,
+                   cache_path: Optional[Path] = None) -> Optional[float]:
     """
-    status = {}
+    Get the ExifTool version, running `exiftool -ver` only when needed
 
-    # Check PyExifTool
+    Successful probes are cached by the binary's resolved path, mtime and
+    size, so an upgraded or replaced binary is probed again.
+
+    Args:
+        executable: Binary path or name (default: find_exiftool())
+        cache_path: JSON cache file (None to always probe)
+
+    Returns:
+        Version number, or None if ExifTool is missing or broken
+    """
+    resolved = shutil.which(executable or find_exiftool())
+    if resolved is None:
+        return None
+    resolved = os.path.realpath(resolved)
     try:
-        import exiftool
-        status['pyexiftool'] = True
-    except ImportError:
-        status['pyexiftool'] = False
+        stat = os.stat(resolved)
+    except OSError:
+        return None
+    signature = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    cache = {}
+    if cache_path is not None:
+        try:
+            cache = json.loads(Path(cache_path).read_text())
+        except (OSError, ValueError):
+            cache = {}
+        entry = cache.get(resolved)
+        if isinstance(entry, dict) and all(entry.get(k) == v for k, v in signature.items()):
+            return entry.get('version')
 
-    # Check ExifTool binary
     try:
-        result = subprocess.run(['exiftool', '-ver'], capture_output=True, timeout=5)
-        status['exiftool_binary'] = result.returncode == 0
-    except (FileNotFoundError, subprocess.TimeoutExpired):
-        status['exiftool_binary'] = False
+        result = subprocess.run([resolved, '-ver'], capture_output=True, text=True, timeout=5)
+        version = float(result.stdout.strip()) if result.returncode == 0 else None
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        version = None
+
+    if version is not None and cache_path is not None:
+        cache[resolved] = dict(signature, version=version)
+        try:
+            Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+            Path(cache_path).write_text(json.dumps(cache, indent=2))
+        except OSError:
+            pass
+
+    return version
+
+
+def check_requirements(cache_path: Optional[Path] = None) -> Dict[str, bool]:
+    """
+    Check if all requirements are installed
+
+    Neither imports PyExifTool nor (with a warm cache) starts ExifTool.
+
+    Args:
+        cache_path: Probe cache file (see toolchain_cache(); None to always probe)
 
-    return status
+    Returns:
+        Dictionary with requirement status
+    """
+    return {
+        'pyexiftool': EXIFTOOL_AVAILABLE,
+        'exiftool_binary': probe_exiftool(cache_path=cache_path) is not None,
+    }
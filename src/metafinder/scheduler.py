@@ -0,0 +1,166 @@
+"""
+Scan scheduling for MetaFinder
+Orders discovered files so the most valuable ones are indexed first
+"""
+
+import heapq
+import itertools
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Iterable, Iterator, Tuple
+
+from .classifier import FileTypeClassifier, default_classifier
+
+
+# A discovered file: path and the stat taken during discovery
+Entry = Tuple[Path, os.stat_result]
+
+
+class ScanPriority:
+    """
+    Ranks discovered files: pinned folders, then preferred file types, then newest
+
+    Each criterion is optional; files that tie on all of them keep
+    discovery order.
+    """
+
+    def __init__(self,
+                 pinned: Optional[List[str]] = None,
+                 file_types: Optional[List[str]] = None,
+                 recent_first: bool = True,
+                 classifier: Optional[FileTypeClassifier] = None):
+        """
+        Initialize priority policy
+
+        Args:
+            pinned: Folders whose files go before everything else
+            file_types: Preferred file types, most wanted first (e.g. ['image', 'document']);
+                other types follow
+            recent_first: Newest modification time first
+            classifier: File type registry (shared default if None)
+        """
+        self.pinned = [os.path.normcase(os.path.abspath(folder)) for folder in pinned or []]
+        self.file_types = {file_type: rank for rank, file_type in enumerate(file_types or [])}
+        self.recent_first = recent_first
+        self.classifier = classifier or default_classifier
+
+    def is_pinned(self, path: str) -> bool:
+        """Whether a path (absolute, or relative to the working directory) lies in a pinned folder"""
+        path = os.path.normcase(os.path.abspath(path))
+        return any(path == folder or path.startswith(folder.rstrip(os.sep) + os.sep)
+                   for folder in self.pinned)
+
+    def key(self, path: Path, stat: os.stat_result) -> Tuple[int, int, float]:
+        """
+        Sort key of a discovered file (smaller is scanned first)
+
+        Args:
+            path: File path
+            stat: Stat from discovery
+
+        Returns:
+            Tuple of (pinned rank, file type rank, negated modification time)
+        """
+        pinned = 0 if self.pinned and self.is_pinned(str(path)) else 1
+        type_rank = 0
+        if self.file_types:
+            # Extension lookup only; sniffing headers would slow discovery down
+            file_type = self.classifier.classify(path, sniff=False)
+            type_rank = self.file_types.get(file_type, len(self.file_types))
+        recency = -stat.st_mtime if self.recent_first else 0.0
+        return pinned, type_rank, recency
+
+
+class PriorityFeed:
+    """
+    Iterable of discovered files, highest priority first
+
+    Discovery runs on its own thread and fills a heap while the scan
+    consumes it. Walking a tree is far faster than extracting metadata,
+    so after a few seconds the heap holds most of the tree and files come
+    out in global priority order; before that, the best files found so
+    far go first. The heap is capped at `window` entries (discovery waits
+    when it is full), which bounds memory on very large trees at the
+    cost of ordering only within the window.
+    """
+
+    def __init__(self, entries: Iterable[Entry], priority: ScanPriority, window: int = 200_000):
+        """
+        Initialize feed (discovery starts on first iteration)
+
+        Args:
+            entries: (path, stat) tuples, e.g. from MetadataScanner discovery
+            priority: Ranking policy
+            window: Maximum files buffered between discovery and the scan
+        """
+        self.entries = entries
+        self.priority = priority
+        self.window = window
+
+        self.exhausted = False  # discovery has walked the whole tree
+        self.discovered = 0
+        self.bytes_discovered = 0
+
+        self._heap: List[Tuple[Tuple[int, int, float], int, Entry]] = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def backlog(self) -> int:
+        """Files discovered but not yet handed to the scan"""
+        return len(self._heap)
+
+    def __iter__(self) -> Iterator[Entry]:
+        self._thread = threading.Thread(target=self._discover, name='metafinder-discovery', daemon=True)
+        self._thread.start()
+
+        try:
+            while True:
+                with self._condition:
+                    while not self._heap and not self.exhausted:
+                        self._condition.wait()
+                    if self._error is not None:
+                        raise self._error
+                    if not self._heap:
+                        return
+                    _key, _order, entry = heapq.heappop(self._heap)
+                    if len(self._heap) == self.window - 1:
+                        self._condition.notify_all()  # discovery may be waiting for room
+                yield entry
+        finally:
+            # Also reached when the scan stops iterating early (cancel)
+            self.close()
+
+    def close(self):
+        """Stop discovery and drop buffered files"""
+        with self._condition:
+            self._closed = True
+            self._heap.clear()
+            self._condition.notify_all()
+
+    def _discover(self):
+        """Discovery thread: rank each file and push it onto the heap"""
+        key = self.priority.key
+        order = itertools.count()  # keeps discovery order among equal keys
+        try:
+            for path, stat in self.entries:
+                entry_key = key(path, stat)
+                with self._condition:
+                    while len(self._heap) >= self.window and not self._closed:
+                        self._condition.wait()
+                    if self._closed:
+                        return
+                    heapq.heappush(self._heap, (entry_key, next(order), (path, stat)))
+                    self.discovered += 1
+                    self.bytes_discovered += stat.st_size
+                    if len(self._heap) == 1:
+                        self._condition.notify_all()  # the scan may be waiting for files
+        except BaseException as e:
+            self._error = e
+        finally:
+            with self._condition:
+                self.exhausted = True
+                self._condition.notify_all()
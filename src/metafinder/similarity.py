@@ -0,0 +1,353 @@
+"""
+Perceptual image hashing for MetaFinder
+Finds resized, re-encoded and lightly edited copies of images
+"""
+
+import os
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Iterable, Tuple
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+from .database import DatabaseManager
+from .records import FileRecord
+
+
+# Bits per side of the difference hash (hash_size ** 2 bits in total)
+HASH_SIZE = 8
+
+
+def dhash(path: str, hash_size: int = HASH_SIZE) -> int:
+    """
+    Compute the difference hash (dHash) of an image
+
+    The image is shrunk to (hash_size + 1) x hash_size grayscale pixels and
+    each bit records whether a pixel is brighter than its right neighbour.
+    Scaling, recompression and small colour changes barely move the hash,
+    so copies end up a few bits apart.
+
+    Args:
+        path: Image file path
+        hash_size: Bits per side
+
+    Returns:
+        Hash as an unsigned integer
+    """
+    if not PIL_AVAILABLE:
+        raise ImportError("Pillow is not installed. Install it with: pip install Pillow")
+
+    with Image.open(path) as image:
+        # Let the JPEG decoder downscale while decoding - much cheaper than full size
+        image.draft('L', (hash_size * 8, hash_size * 8))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+        pixels = list(image.getdata())
+
+    value = 0
+    width = hash_size + 1
+    for row in range(hash_size):
+        offset = row * width
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def format_hash(value: int) -> str:
+    """Render a hash as the fixed-width hex string stored in files.phash"""
+    return format(value, f'0{HASH_SIZE * HASH_SIZE // 4}x')
+
+
+def parse_hash(text: str) -> int:
+    """Parse a stored phash value"""
+    return int(text, 16)
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return (a ^ b).bit_count()
+
+
+class _BKNode:
+    """BK-tree node: one hash, the items sharing it, children by distance"""
+
+    __slots__ = ('value', 'items', 'children')
+
+    def __init__(self, value: int, item: Any):
+        self.value = value
+        self.items = [item]
+        self.children: Dict[int, '_BKNode'] = {}
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over Hamming distance
+
+    A query with radius r only descends into children whose edge distance
+    d satisfies |d - dist(query, node)| <= r (triangle inequality), so
+    small-radius lookups visit a fraction of the tree instead of every
+    hash.
+    """
+
+    def __init__(self):
+        self.root: Optional[_BKNode] = None
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, value: int, item: Any):
+        """
+        Insert a hash
+
+        Args:
+            value: Hash value
+            item: Payload returned by search (e.g. a file id)
+        """
+        self.size += 1
+        if self.root is None:
+            self.root = _BKNode(value, item)
+            return
+
+        node = self.root
+        while True:
+            distance = hamming(value, node.value)
+            if distance == 0:
+                node.items.append(item)
+                return
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _BKNode(value, item)
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, Any]]:
+        """
+        Find all items within a Hamming radius
+
+        Args:
+            value: Query hash
+            max_distance: Maximum number of differing bits
+
+        Returns:
+            List of (distance, item) sorted by distance
+        """
+        results = []
+        if self.root is None:
+            return results
+
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node.value)
+            if distance <= max_distance:
+                results.extend((distance, item) for item in node.items)
+
+            low = distance - max_distance
+            high = distance + max_distance
+            for edge, child in node.children.items():
+                if low <= edge <= high:
+                    stack.append(child)
+
+        results.sort(key=lambda match: match[0])
+        return results
+
+
+def _safe_dhash(path: str) -> Optional[int]:
+    """dhash() that returns None for unreadable or unsupported images"""
+    try:
+        return dhash(path)
+    except Exception:
+        return None
+
+
+class ImageHasher:
+    """
+    Computes perceptual hashes on a worker pool
+
+    Pillow releases the GIL while decoding and resizing, so a thread pool
+    keeps several cores busy without pickling images between processes.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Initialize hasher
+
+        Args:
+            workers: Worker threads (default: CPU count)
+        """
+        if not PIL_AVAILABLE:
+            raise ImportError("Pillow is not installed. Install it with: pip install Pillow")
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='metafinder-hash')
+
+    def hash_paths(self, paths: Iterable[str]) -> List[Optional[int]]:
+        """
+        Hash several images in parallel
+
+        Args:
+            paths: Image file paths
+
+        Returns:
+            Hashes in input order (None where the image could not be read)
+        """
+        return list(self.pool.map(_safe_dhash, paths))
+
+    def hash_records(self, records: List[FileRecord]) -> int:
+        """
+        Set the phash field of the image records in a scan batch
+
+        Args:
+            records: Normalized file records
+
+        Returns:
+            Number of images hashed
+        """
+        images = [record for record in records if record.get('file_type') == 'image']
+        hashed = 0
+        for record, value in zip(images, self.hash_paths([record['path'] for record in images])):
+            if value is not None:
+                record['phash'] = format_hash(value)
+                hashed += 1
+        return hashed
+
+    def close(self):
+        """Shut down the worker pool"""
+        self.pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class SimilarityIndex:
+    """
+    Near-duplicate image lookup over the stored perceptual hashes
+
+    Building the BK-tree reads every hash and costs more than one linear
+    pass over them, so it only pays off when several queries reuse it
+    (call load() first, or pass a cached tree). Without a tree, a query
+    compares against each stored hash once.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, tree: Optional[BKTree] = None):
+        """
+        Initialize index
+
+        Args:
+            db_manager: Database manager to read hashes from
+            tree: Previously loaded BK-tree to reuse (e.g. from another thread's
+                index over the same database)
+        """
+        self.db = db_manager
+        self.tree = tree
+
+    def load(self) -> int:
+        """
+        (Re)build the BK-tree from the database
+
+        Returns:
+            Number of hashes indexed
+        """
+        tree = BKTree()
+        for file_id, phash in self.db.iter_phashes():
+            tree.add(parse_hash(phash), file_id)
+        self.tree = tree
+        return len(tree)
+
+    def find_similar(self,
+                     phash: int,
+                     max_distance: int = 10,
+                     limit: int = 50,
+                     exclude_id: Optional[int] = None) -> List[Tuple[int, FileRecord]]:
+        """
+        Find images whose hash is close to the given one
+
+        Args:
+            phash: Query hash
+            max_distance: Maximum Hamming distance (0-64; ~10 catches re-encodes)
+            limit: Maximum results
+            exclude_id: File id to leave out (usually the query image itself)
+
+        Returns:
+            List of (distance, FileRecord) sorted by distance
+        """
+        if self.tree is not None:
+            candidates = self.tree.search(phash, max_distance)
+        else:
+            candidates = [(distance, file_id)
+                          for file_id, distance in ((file_id, hamming(phash, parse_hash(value)))
+                                                    for file_id, value in self.db.iter_phashes())
+                          if distance <= max_distance]
+            candidates.sort(key=lambda match: match[0])
+
+        matches = [(distance, file_id) for distance, file_id in candidates
+                   if file_id != exclude_id][:limit]
+
+        records = {record['id']: record
+                   for record in self.db.get_files_by_ids([file_id for _, file_id in matches])}
+        return [(distance, records[file_id]) for distance, file_id in matches if file_id in records]
+
+    def find_similar_to_file(self,
+                             path: str,
+                             max_distance: int = 10,
+                             limit: int = 50) -> List[Tuple[int, FileRecord]]:
+        """
+        Find images similar to a file (indexed or not)
+
+        Args:
+            path: Image file path
+            max_distance: Maximum Hamming distance
+            limit: Maximum results
+
+        Returns:
+            List of (distance, FileRecord) sorted by distance
+        """
+        record = self.db.get_file_by_path(str(Path(path).absolute()))
+        if record and record.get('phash'):
+            return self.find_similar(parse_hash(record['phash']), max_distance, limit,
+                                     exclude_id=record['id'])
+
+        if not Path(path).is_file():
+            raise ValueError(f"File not found: {path}")
+        exclude_id = record['id'] if record else None
+        return self.find_similar(dhash(path), max_distance, limit, exclude_id=exclude_id)
+
+    def backfill(self,
+                 workers: Optional[int] = None,
+                 batch_size: int = 500,
+                 progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """
+        Hash indexed images that were scanned without a perceptual hash
+
+        Args:
+            workers: Hashing threads (default: CPU count)
+            batch_size: Images hashed per database update
+            progress_callback: Function(done, total) after every batch
+
+        Returns:
+            Dictionary with hashed, failed and total counts
+        """
+        pending = [(row['id'], row['path'])
+                   for row in self.db.iter_files(fields=['id', 'path', 'phash'], file_type='image')
+                   if row['phash'] is None]
+        hashed = 0
+
+        with ImageHasher(workers) as hasher:
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                values = hasher.hash_paths([path for _, path in batch])
+                updates = [(format_hash(value), file_id)
+                           for (file_id, _), value in zip(batch, values) if value is not None]
+                hashed += self.db.set_phashes(updates)
+                if progress_callback:
+                    progress_callback(start + len(batch), len(pending))
+
+        self.tree = None
+        return {'hashed': hashed, 'failed': len(pending) - hashed, 'total': len(pending)}
@@ -0,0 +1,354 @@
+"""
+Thumbnail service for MetaFinder
+Generates image previews on a worker pool with an on-disk LRU cache
+"""
+
+import hashlib
+import importlib.util
+import io
+import os
+import struct
+import threading
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Dict, Any, Optional, Callable
+
+# Pillow is imported by the workers on the first render, not at GUI startup
+PIL_AVAILABLE = importlib.util.find_spec('PIL') is not None
+
+
+# Longest side of a thumbnail in pixels (fits a result card)
+THUMBNAIL_SIZE = 64
+
+# EXIF IFD1 tags locating the embedded JPEG thumbnail
+_THUMBNAIL_OFFSET = 0x0201
+_THUMBNAIL_LENGTH = 0x0202
+
+# Embedded thumbnails whose aspect ratio differs more than this are letterboxed
+_ASPECT_TOLERANCE = 0.05
+
+
+def exif_thumbnail(exif: bytes) -> Optional[bytes]:
+    """
+    Locate the JPEG thumbnail embedded in an EXIF block
+
+    Cameras store a small preview (typically 160x120) in IFD1. Reading it
+    avoids decoding a multi-megapixel image at all.
+
+    Args:
+        exif: Raw EXIF data (with or without the 'Exif\\0\\0' prefix)
+
+    Returns:
+        JPEG bytes, or None if there is no embedded thumbnail
+    """
+    tiff = exif[6:] if exif.startswith(b'Exif\x00\x00') else exif
+    if tiff[:2] == b'II':
+        endian = '<'
+    elif tiff[:2] == b'MM':
+        endian = '>'
+    else:
+        return None
+
+    try:
+        # Skip IFD0 to reach the offset of IFD1
+        ifd0 = struct.unpack_from(endian + 'I', tiff, 4)[0]
+        count = struct.unpack_from(endian + 'H', tiff, ifd0)[0]
+        ifd1 = struct.unpack_from(endian + 'I', tiff, ifd0 + 2 + 12 * count)[0]
+        if not ifd1:
+            return None
+
+        tags = {}
+        count = struct.unpack_from(endian + 'H', tiff, ifd1)[0]
+        for i in range(count):
+            tag, _type, _count, value = struct.unpack_from(endian + 'HHII', tiff, ifd1 + 2 + 12 * i)
+            tags[tag] = value
+    except struct.error:
+        return None
+
+    offset = tags.get(_THUMBNAIL_OFFSET)
+    length = tags.get(_THUMBNAIL_LENGTH)
+    if not offset or not length or offset + length > len(tiff):
+        return None
+    return tiff[offset:offset + length]
+
+
+def _orientation_transpose() -> Dict[int, Any]:
+    """EXIF Orientation value -> transpose that shows the image upright"""
+    from PIL import Image
+
+    return {
+        2: Image.Transpose.FLIP_LEFT_RIGHT,
+        3: Image.Transpose.ROTATE_180,
+        4: Image.Transpose.FLIP_TOP_BOTTOM,
+        5: Image.Transpose.TRANSPOSE,
+        6: Image.Transpose.ROTATE_270,
+        7: Image.Transpose.TRANSVERSE,
+        8: Image.Transpose.ROTATE_90,
+    }
+
+
+def render_thumbnail(path: str, size: int = THUMBNAIL_SIZE) -> bytes:
+    """
+    Render a JPEG thumbnail of an image
+
+    Uses the embedded EXIF thumbnail when it is large enough and has the
+    image's aspect ratio, and otherwise lets the JPEG decoder downscale
+    while decoding (draft mode) before resizing.
+
+    Args:
+        path: Image file path
+        size: Longest side in pixels
+
+    Returns:
+        JPEG bytes
+    """
+    if not PIL_AVAILABLE:
+        raise ImportError("Pillow is not installed. Install it with: pip install Pillow")
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as image:
+        thumbnail = None
+
+        embedded = exif_thumbnail(image.info.get('exif', b''))
+        if embedded:
+            try:
+                candidate = Image.open(io.BytesIO(embedded))
+                candidate.load()
+                width, height = image.size
+                aspect = (candidate.width / candidate.height) / (width / height)
+                if max(candidate.size) >= size and abs(aspect - 1) <= _ASPECT_TOLERANCE:
+                    # The preview is stored unrotated, like the main image
+                    method = _orientation_transpose().get(image.getexif().get(0x0112))
+                    thumbnail = candidate.transpose(method) if method is not None else candidate
+            except Exception:
+                thumbnail = None
+
+        if thumbnail is None:
+            image.draft('RGB', (size * 2, size * 2))
+            thumbnail = ImageOps.exif_transpose(image)
+
+        thumbnail = thumbnail.convert('RGB')
+        thumbnail.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+        output = io.BytesIO()
+        thumbnail.save(output, 'JPEG', quality=85)
+        return output.getvalue()
+
+
+class ThumbnailCache:
+    """
+    Thumbnail files on disk, evicted least recently used first
+
+    Entries are keyed by path, modification time and size, so an edited
+    file gets a fresh thumbnail and the stale one ages out. Recency is
+    kept in file mtimes (touched on every hit), so the LRU order survives
+    restarts.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 200 * 1024 ** 2):
+        """
+        Initialize cache (creates the directory if needed)
+
+        Args:
+            cache_dir: Directory holding the thumbnail files
+            max_bytes: Total size cap; oldest entries are removed beyond it
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()  # key -> size in bytes, oldest first
+        self.total_bytes = 0
+        self._load_index()
+
+    @staticmethod
+    def make_key(path: str, modified: Optional[float], size: Optional[int],
+                 thumbnail_size: int = THUMBNAIL_SIZE) -> str:
+        """Cache key of one file version at one thumbnail size"""
+        text = f"{path}\0{modified}\0{size}\0{thumbnail_size}"
+        return hashlib.sha1(text.encode('utf-8', 'surrogatepass')).hexdigest()
+
+    def _file(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.jpg"
+
+    def _load_index(self):
+        """Rebuild the LRU order from the files on disk"""
+        found = []
+        for entry in self.cache_dir.glob('*/*.jpg'):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            found.append((stat.st_mtime, entry.stem, stat.st_size))
+
+        for _mtime, key, size in sorted(found):
+            self._entries[key] = size
+            self.total_bytes += size
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        Look up a thumbnail and mark it recently used
+
+        Returns:
+            Path of the thumbnail file, or None on a miss
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+
+        path = self._file(key)
+        try:
+            os.utime(path)
+        except OSError:
+            # Deleted behind our back
+            with self._lock:
+                self.total_bytes -= self._entries.pop(key, 0)
+            return None
+        return path
+
+    def put(self, key: str, data: bytes) -> Path:
+        """
+        Store a thumbnail, evicting old entries beyond the size cap
+
+        Returns:
+            Path of the thumbnail file
+        """
+        path = self._file(key)
+        path.parent.mkdir(exist_ok=True)
+        temp = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        temp.write_bytes(data)
+        os.replace(temp, path)
+
+        evicted = []
+        with self._lock:
+            self.total_bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self.total_bytes -= old_size
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            try:
+                self._file(old_key).unlink()
+            except OSError:
+                pass
+        return path
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ThumbnailService:
+    """
+    Serves thumbnails to the GUI from worker threads
+
+    Requests are handled newest first: while a user scrolls, the cards
+    currently in view are served before the ones already scrolled past,
+    and the oldest requests are dropped once too many are waiting.
+    """
+
+    def __init__(self,
+                 cache_dir: str,
+                 size: int = THUMBNAIL_SIZE,
+                 max_bytes: int = 200 * 1024 ** 2,
+                 workers: Optional[int] = None,
+                 max_pending: int = 256,
+                 render: Optional[Callable[[str, int], bytes]] = None):
+        """
+        Initialize service and start its workers
+
+        Args:
+            cache_dir: Directory of the on-disk cache
+            size: Longest thumbnail side in pixels
+            max_bytes: Disk cache size cap
+            workers: Worker threads (default: CPU count, at most 4)
+            max_pending: Requests kept waiting before the oldest are dropped
+            render: Function(path, size) returning JPEG bytes (default: render_thumbnail)
+        """
+        self.cache = ThumbnailCache(cache_dir, max_bytes)
+        self.size = size
+        self.max_pending = max_pending
+        self.render = render or render_thumbnail
+
+        self.failed = set()  # keys that could not be rendered this session
+        self._pending: deque = deque()  # (key, path), newest on the right
+        self._callbacks: Dict[str, list] = {}
+        self._condition = threading.Condition()
+        self._stopped = False
+
+        workers = workers or min(4, os.cpu_count() or 1)
+        self._threads = [
+            threading.Thread(target=self._run, name=f'metafinder-thumbnail-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def request(self,
+                path: str,
+                modified: Optional[float],
+                file_size: Optional[int],
+                callback: Callable[[str, Optional[Path]], None]):
+        """
+        Ask for the thumbnail of a file
+
+        Args:
+            path: Image file path
+            modified: File modification time (part of the cache key)
+            file_size: File size in bytes (part of the cache key)
+            callback: Function(path, thumbnail_file or None), called on a
+                worker thread once the thumbnail is ready or has failed
+        """
+        key = ThumbnailCache.make_key(path, modified, file_size, self.size)
+        if key in self.failed:
+            callback(path, None)
+            return
+
+        with self._condition:
+            waiting = self._callbacks.get(key)
+            if waiting is not None:
+                waiting.append(callback)
+                return
+            self._callbacks[key] = [callback]
+            self._pending.append((key, path))
+
+            # Drop the stalest requests; their cards are long out of view
+            while len(self._pending) > self.max_pending:
+                old_key, _old_path = self._pending.popleft()
+                self._callbacks.pop(old_key, None)
+
+            self._condition.notify()
+
+    def close(self):
+        """Stop the workers (pending requests are dropped)"""
+        with self._condition:
+            self._stopped = True
+            self._pending.clear()
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self):
+        """Worker loop: serve the newest request from cache or render it"""
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                key, path = self._pending.pop()
+
+            thumbnail = self.cache.get(key)
+            if thumbnail is None:
+                try:
+                    thumbnail = self.cache.put(key, self.render(path, self.size))
+                except Exception:
+                    self.failed.add(key)
+
+            with self._condition:
+                callbacks = self._callbacks.pop(key, [])
+            for callback in callbacks:
+                callback(path, thumbnail)
@@ -0,0 +1,213 @@
+"""
+Typed value parsing for MetaFinder
+Converts ExifTool value strings into numbers for indexed range filters
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple, Callable
+
+
+_NUMBER_RE = re.compile(r'[-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?')
+
+# 1/250, 1/250 s
+_FRACTION_RE = re.compile(r'\s*(\d+(?:\.\d+)?)\s*/\s*(\d+(?:\.\d+)?)')
+
+# 0:03:45 (approx), 1:02:03.5, 3:45
+_CLOCK_RE = re.compile(r'\s*(\d+):(\d{1,2})(?::(\d{1,2}(?:\.\d+)?))?')
+
+# 3840x2160 (print-converted) or 3840 2160 (-n)
+_SIZE_RE = re.compile(r'\s*(\d+)\s*[x×\s]\s*(\d+)')
+
+# Multipliers for print-converted bitrates (e.g. '128 kbps')
+_BITRATE_UNITS = {
+    'bps': 1,
+    'kbps': 1000,
+    'mbps': 1000 ** 2,
+    'gbps': 1000 ** 3,
+}
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+@lru_cache(maxsize=4096)
+def _parse_number_text(text: str) -> Optional[float]:
+    match = _NUMBER_RE.search(text)
+    return float(match.group()) if match else None
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """
+    First number in a value ('f/5.6' -> 5.6, '24.0 mm' -> 24.0)
+
+    Args:
+        value: ExifTool value (number or string)
+
+    Returns:
+        float or None
+    """
+    if _is_number(value):
+        return float(value)
+    if isinstance(value, str):
+        return _parse_number_text(value)
+    return None
+
+
+def parse_integer(value: Any) -> Optional[int]:
+    """parse_number() rounded to an int"""
+    number = parse_number(value)
+    return int(round(number)) if number is not None else None
+
+
+@lru_cache(maxsize=4096)
+def _parse_exposure_text(text: str) -> Optional[float]:
+    match = _FRACTION_RE.match(text)
+    if match:
+        denominator = float(match.group(2))
+        return float(match.group(1)) / denominator if denominator else None
+    return _parse_number_text(text)
+
+
+def parse_exposure_time(value: Any) -> Optional[float]:
+    """
+    Exposure time in seconds ('1/250' -> 0.004, '2' -> 2.0)
+
+    Args:
+        value: ExposureTime / ShutterSpeed value
+
+    Returns:
+        Seconds or None
+    """
+    if _is_number(value):
+        return float(value)
+    if isinstance(value, str):
+        return _parse_exposure_text(value)
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _parse_duration_text(text: str) -> Optional[float]:
+    match = _CLOCK_RE.match(text)
+    if match:
+        first, second, third = match.groups()
+        if third is None:
+            # m:ss
+            return int(first) * 60 + int(second)
+        return int(first) * 3600 + int(second) * 60 + float(third)
+    # '12.34 s (approx)'
+    return _parse_number_text(text)
+
+
+def parse_duration(value: Any) -> Optional[float]:
+    """
+    Duration in seconds ('0:03:45 (approx)' -> 225.0, '12.3 s' -> 12.3)
+
+    Args:
+        value: Duration value
+
+    Returns:
+        Seconds or None
+    """
+    if _is_number(value):
+        return float(value)
+    if isinstance(value, str):
+        return _parse_duration_text(value)
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _parse_bitrate_text(text: str) -> Optional[int]:
+    parts = text.split()
+    number = _parse_number_text(text)
+    if number is None:
+        return None
+    unit = parts[1].lower() if len(parts) > 1 else 'bps'
+    return int(round(number * _BITRATE_UNITS.get(unit, 1)))
+
+
+def parse_bitrate(value: Any) -> Optional[int]:
+    """
+    Bitrate in bits per second ('128 kbps' -> 128000)
+
+    Args:
+        value: Bitrate value
+
+    Returns:
+        Bits per second or None
+    """
+    if _is_number(value):
+        return int(round(value))
+    if isinstance(value, str):
+        return _parse_bitrate_text(value)
+    return None
+
+
+def parse_image_size(value: Any) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Width and height from an ImageSize value ('3840x2160' or '3840 2160')
+
+    Returns:
+        Tuple of (width, height); (None, None) if unparseable
+    """
+    if not isinstance(value, str):
+        return None, None
+    match = _SIZE_RE.match(value)
+    if not match:
+        return None, None
+    return int(match.group(1)), int(match.group(2))
+
+
+# Typed field -> (candidate tags, most reliable first, converter)
+TYPED_FIELDS: Dict[str, Tuple[Tuple[str, ...], Callable[[Any], Any]]] = {
+    'exposure_time': (('EXIF:ExposureTime', 'ExposureTime', 'XMP:ExposureTime',
+                       'Composite:ShutterSpeed', 'ShutterSpeed'), parse_exposure_time),
+    'f_number': (('EXIF:FNumber', 'FNumber', 'XMP:FNumber',
+                  'Composite:Aperture', 'Aperture'), parse_number),
+    'focal_length': (('EXIF:FocalLength', 'FocalLength', 'XMP:FocalLength'), parse_number),
+    'duration_s': (('Composite:Duration', 'QuickTime:Duration', 'Matroska:Duration',
+                    'RIFF:Duration', 'MPEG:Duration', 'Duration'), parse_duration),
+    'width': (('File:ImageWidth', 'EXIF:ExifImageWidth', 'QuickTime:ImageWidth',
+               'PNG:ImageWidth', 'Matroska:ImageWidth', 'ImageWidth'), parse_integer),
+    'height': (('File:ImageHeight', 'EXIF:ExifImageHeight', 'QuickTime:ImageHeight',
+                'PNG:ImageHeight', 'Matroska:ImageHeight', 'ImageHeight'), parse_integer),
+    'bpm': (('ID3:BeatsPerMinute', 'ItemList:BeatsPerMinute', 'BeatsPerMinute',
+             'Vorbis:BPM', 'XMP:Tempo', 'Tempo'), parse_number),
+    'page_count': (('PDF:PageCount', 'PageCount', 'XML:Pages', 'FlashPix:Pages',
+                    'XMP:NPages', 'Pages'), parse_integer),
+    'bitrate': (('Composite:AvgBitrate', 'QuickTime:AvgBitrate', 'AvgBitrate',
+                 'MPEG:AudioBitrate', 'AudioBitrate', 'Bitrate'), parse_bitrate),
+}
+
+NUMERIC_FIELDS: Tuple[str, ...] = tuple(TYPED_FIELDS)
+
+
+def extract_typed_values(exif_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parse the typed numeric fields of a file
+
+    Args:
+        exif_data: ExifTool output
+
+    Returns:
+        Dictionary with every field in NUMERIC_FIELDS (None where absent)
+    """
+    values = {}
+    for field, (tags, converter) in TYPED_FIELDS.items():
+        result = None
+        for tag in tags:
+            value = exif_data.get(tag)
+            if value is not None and value != '':
+                result = converter(value)
+                if result is not None:
+                    break
+        values[field] = result
+
+    # Composite:ImageSize covers formats without separate width/height tags
+    if values['width'] is None or values['height'] is None:
+        width, height = parse_image_size(exif_data.get('Composite:ImageSize') or exif_data.get('ImageSize'))
+        if width is not None:
+            values['width'], values['height'] = width, height
+
+    return values
@@ -0,0 +1,397 @@
+"""
+Folder watcher for MetaFinder
+Keeps the index fresh from filesystem events instead of full rescans
+"""
+
+import os
+import sys
+import time
+import select
+import struct
+import threading
+import ctypes
+import ctypes.util
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Tuple, Set
+
+from .database import DatabaseManager
+from .maintenance import IndexMaintainer
+
+
+# Event kinds reported by the backends
+CHANGED = 'changed'
+DELETED = 'deleted'
+DELETED_DIR = 'deleted_dir'
+RESYNC = 'resync'  # events were lost; the path is the root to re-check
+
+Event = Tuple[str, str]
+
+
+class InotifyBackend:
+    """
+    Linux inotify event source (via ctypes, no extra dependencies)
+
+    Watches every directory below the root and translates raw inotify
+    events into (kind, path) tuples.
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+
+    WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+                  IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR)
+
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, root: str):
+        """
+        Initialize inotify watches for a folder tree
+
+        Args:
+            root: Absolute folder path
+
+        Raises:
+            OSError: If inotify is unavailable or the watch limit is hit
+        """
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.root = root
+        self.watches: Dict[int, str] = {}
+        self._add_tree(root)
+
+    def _add_watch(self, path: str):
+        """Add a single directory watch"""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch failed for {path}: {os.strerror(errno)}")
+        self.watches[wd] = path
+
+    def _add_tree(self, root: str) -> List[str]:
+        """
+        Watch a directory and all its subdirectories
+
+        Returns:
+            Files found in the tree (used when a folder appears)
+        """
+        files = []
+        for dirpath, _dirnames, filenames in os.walk(root):
+            try:
+                self._add_watch(dirpath)
+            except FileNotFoundError:
+                continue
+            files.extend(os.path.join(dirpath, name) for name in filenames)
+        return files
+
+    def _remove_tree(self, root: str):
+        """Drop watches for a directory that moved away or was deleted"""
+        prefix = root + os.sep
+        for wd, path in list(self.watches.items()):
+            if path == root or path.startswith(prefix):
+                self._libc.inotify_rm_watch(self.fd, wd)
+                del self.watches[wd]
+
+    def poll(self, timeout: float) -> List[Event]:
+        """
+        Wait up to timeout seconds for events
+
+        Args:
+            timeout: Maximum wait in seconds
+
+        Returns:
+            List of (kind, path) events
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                # Kernel queue overflowed - events were lost, resync everything
+                # (deletions included, which re-reporting the files can't show)
+                events.extend((CHANGED, path) for path in self._add_tree(self.root))
+                events.append((RESYNC, self.root))
+                continue
+
+            if mask & self.IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+
+            path = os.path.join(directory, name)
+
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    events.extend((CHANGED, file) for file in self._add_tree(path))
+                elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                    self._remove_tree(path)
+                    events.append((DELETED_DIR, path))
+            elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                events.append((DELETED, path))
+            elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE):
+                events.append((CHANGED, path))
+
+        return events
+
+    def close(self):
+        """Release the inotify file descriptor"""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingBackend:
+    """
+    Portable fallback that diffs periodic (mtime, size) snapshots
+    """
+
+    def __init__(self, root: str, interval: float = 5.0):
+        """
+        Initialize polling snapshot
+
+        Args:
+            root: Absolute folder path
+            interval: Seconds between snapshots
+        """
+        self.root = root
+        self.interval = interval
+        self._snapshot = self._take_snapshot()
+        self._next_poll = time.monotonic() + interval
+
+    def _take_snapshot(self) -> Dict[str, Tuple[float, int]]:
+        """Record (mtime, size) for every file below root"""
+        snapshot = {}
+        for dirpath, _dirnames, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout: float) -> List[Event]:
+        """
+        Wait until the next snapshot is due (or timeout) and diff it
+
+        Args:
+            timeout: Maximum wait in seconds
+
+        Returns:
+            List of (kind, path) events
+        """
+        wait = self._next_poll - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return []
+        if wait > 0:
+            time.sleep(wait)
+
+        current = self._take_snapshot()
+        self._next_poll = time.monotonic() + self.interval
+
+        events = [(CHANGED, path) for path, state in current.items()
+                  if self._snapshot.get(path) != state]
+        events.extend((DELETED, path) for path in self._snapshot if path not in current)
+
+        self._snapshot = current
+        return events
+
+    def close(self):
+        """Nothing to release"""
+        pass
+
+
+class FolderWatcher:
+    """
+    Watches a folder and incrementally re-indexes changed files
+
+    Bursts of events are coalesced: changes are collected until the folder
+    has been quiet for `debounce` seconds (or `max_delay` has passed since
+    the first pending event), then flushed as one batched extraction and
+    one bulk delete.
+    """
+
+    def __init__(self,
+                 scanner,
+                 folder_path: str,
+                 debounce: float = 2.0,
+                 max_delay: float = 30.0,
+                 poll_interval: float = 5.0,
+                 use_inotify: Optional[bool] = None,
+                 file_extensions: Optional[List[str]] = None):
+        """
+        Initialize watcher
+
+        Args:
+            scanner: MetadataScanner used for extraction and storage
+            folder_path: Folder to watch (recursively)
+            debounce: Quiet period before pending changes are flushed
+            max_delay: Upper bound on how long a change may stay pending
+            poll_interval: Snapshot interval for the polling backend
+            use_inotify: Force (True) or disable (False) inotify; auto if None
+            file_extensions: Only index files with these extensions
+        """
+        folder = Path(folder_path)
+        if not folder.exists() or not folder.is_dir():
+            raise ValueError(f"Invalid folder path: {folder_path}")
+
+        self.scanner = scanner
+        self.db: DatabaseManager = scanner.db
+        self.root = str(folder.absolute())
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.file_extensions = file_extensions
+
+        self.backend = None
+        if use_inotify is not False:
+            try:
+                self.backend = InotifyBackend(self.root)
+            except (OSError, AttributeError) as e:
+                if use_inotify:
+                    raise
+                print(f"⚠️  inotify unavailable ({e}), falling back to polling")
+
+        if self.backend is None:
+            self.backend = PollingBackend(self.root, poll_interval)
+
+        self.backend_name = 'inotify' if isinstance(self.backend, InotifyBackend) else 'polling'
+
+        self._pending: Dict[str, str] = {}
+        self._deleted_dirs: Set[str] = set()
+        self._resync = False
+        self._first_event = None
+        self._last_event = None
+
+    def run(self,
+            stop_event: Optional[threading.Event] = None,
+            on_flush: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Process events until stop_event is set
+
+        Args:
+            stop_event: Event that ends the loop when set
+            on_flush: Function(stats) called after every flush
+        """
+        stop_event = stop_event or threading.Event()
+
+        try:
+            while not stop_event.is_set():
+                for kind, path in self.backend.poll(timeout=0.5):
+                    self._queue_event(kind, path)
+
+                if self._flush_due():
+                    stats = self.flush()
+                    if on_flush:
+                        on_flush(stats)
+        finally:
+            # Don't lose changes that were still waiting for the debounce
+            if self._pending or self._deleted_dirs or self._resync:
+                stats = self.flush()
+                if on_flush:
+                    on_flush(stats)
+            self.backend.close()
+
+    def _queue_event(self, kind: str, path: str):
+        """Coalesce an event into the pending set (latest kind wins)"""
+        if kind == RESYNC:
+            self._resync = True
+        elif kind == DELETED_DIR:
+            self._deleted_dirs.add(path)
+            prefix = path + os.sep
+            for pending in [p for p in self._pending if p.startswith(prefix)]:
+                del self._pending[pending]
+        else:
+            if self.file_extensions and Path(path).suffix.lower() not in self.file_extensions:
+                return
+            self._pending[path] = kind
+
+        now = time.monotonic()
+        if self._first_event is None:
+            self._first_event = now
+        self._last_event = now
+
+    def _flush_due(self) -> bool:
+        """Check whether the pending batch should be flushed"""
+        if self._first_event is None:
+            return False
+        now = time.monotonic()
+        return (now - self._last_event >= self.debounce or
+                now - self._first_event >= self.max_delay)
+
+    def flush(self) -> Dict[str, Any]:
+        """
+        Apply pending deletions and re-index pending changes
+
+        Returns:
+            Dictionary with flush statistics
+        """
+        pending, self._pending = self._pending, {}
+        deleted_dirs, self._deleted_dirs = self._deleted_dirs, set()
+        resync, self._resync = self._resync, False
+        self._first_event = None
+        self._last_event = None
+
+        start = time.perf_counter()
+
+        # Folder deletions first, so files re-created inside them survive
+        stale_ids = []
+        for directory in deleted_dirs:
+            stale_ids.extend(row_id for row_id, _path in self.db.iter_paths_under(directory))
+        deleted = self.db.delete_files(stale_ids) if stale_ids else 0
+
+        if resync:
+            deleted += IndexMaintainer(self.db).prune(self.root)['deleted']
+
+        changed = []
+        removed = []
+        for path, kind in pending.items():
+            if kind == CHANGED and os.path.isfile(path):
+                changed.append(path)
+            else:
+                removed.append(path)
+
+        if removed:
+            deleted += self.db.delete_files_by_path(removed)
+
+        scan_stats = {'scanned': 0, 'failed': 0}
+        if changed:
+            scan_stats = self.scanner.scan_files(changed)
+
+        return {
+            'changed': len(changed),
+            'indexed': scan_stats['scanned'],
+            'failed': scan_stats['failed'],
+            'deleted': deleted,
+            'elapsed': time.perf_counter() - start,
+        }
@@ -0,0 +1,28 @@
+"""
+Shared pytest setup for the MetaFinder unit tests
+"""
+
+import sys
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    """Database with the original files table, before any migration"""
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE files (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                 "path TEXT UNIQUE NOT NULL, name TEXT NOT NULL, extension TEXT, "
+                 "size INTEGER, created REAL, modified REAL, accessed REAL, "
+                 "file_type TEXT, author TEXT, title TEXT, date_taken REAL, "
+                 "camera_make TEXT, camera_model TEXT, metadata TEXT, "
+                 "searchable_text TEXT, scan_date REAL, file_hash TEXT)")
+    conn.commit()
+    conn.close()
+    return path
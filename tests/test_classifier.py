@@ -0,0 +1,36 @@
+"""
+Tests for the file type registry and header sniffing
+"""
+
+from pathlib import Path
+
+import pytest
+
+from metafinder.classifier import default_classifier as classifier
+
+
+def test_mime_and_extension_lookups():
+    assert classifier.from_mime('image/JPEG') == 'image'
+    assert classifier.from_extension('.PDF') == 'document'
+    assert classifier.classify(Path('/x/song.mp3')) == 'audio'
+
+
+@pytest.mark.parametrize('name, header, expected', [
+    ('photo_noext', b'\xff\xd8\xff\xe0' + b'\0' * 16, 'image'),
+    ('report.dat', b'%PDF-1.7\n', 'document'),
+    ('clip', b'\0\0\0\x18ftypisom', 'video'),
+    ('voice', b'RIFF\0\0\0\0WAVEfmt ', 'audio'),
+    ('bundle.bin', b'\0' * 257 + b'ustar', 'archive'),
+])
+def test_header_sniffing(tmp_path, name, header, expected):
+    path = tmp_path / name
+    path.write_bytes(header)
+    assert classifier.classify(path) == expected
+
+
+def test_mislabeled_file_needs_verify(tmp_path):
+    # A PNG saved as .txt: trusted extension by default, real format with verify
+    mislabeled = tmp_path / "fake.txt"
+    mislabeled.write_bytes(b'\x89PNG\r\n\x1a\n')
+    assert classifier.classify(mislabeled) == 'document'
+    assert classifier.classify(mislabeled, verify=True) == 'image'
@@ -0,0 +1,241 @@
+"""
+Tests for DatabaseManager storage, search and aggregation
+"""
+
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from metafinder.database import DatabaseManager
+
+
+METADATA = {
+    'EXIF:DateTimeOriginal': '2024:05:01 10:00:00',
+    'Composite:ImageSize': '4000x3000',
+    'EXIF:Make': 'Canon',
+}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "test.db")
+
+
+@pytest.fixture
+def db(db_path):
+    db = DatabaseManager(db_path)
+    yield db
+    db.close()
+
+
+def test_metadata_keys_interned(db):
+    db.insert_files([{'path': '/p/a.jpg', 'name': 'a.jpg', 'metadata': METADATA}])
+
+    raw = db.conn.execute("SELECT metadata FROM files WHERE path = '/p/a.jpg'").fetchone()[0]
+    assert 'DateTimeOriginal' not in raw
+    assert len(raw) < len(json.dumps(METADATA))
+    assert db.get_file_by_path('/p/a.jpg')['metadata'] == METADATA
+
+
+def test_key_dictionary_shared_between_connections(db, db_path):
+    db.insert_files([{'path': '/p/a.jpg', 'name': 'a.jpg', 'metadata': METADATA}])
+
+    other = DatabaseManager(db_path)
+    other.insert_file({'path': '/p/b.jpg', 'name': 'b.jpg',
+                       'metadata': {'EXIF:Make': 'Nikon', 'XMP:Rating': 5}})
+    assert other.get_key_id('EXIF:Make') == db.get_key_id('EXIF:Make')
+    other.close()
+
+    assert db.get_file_by_path('/p/b.jpg')['metadata'] == {'EXIF:Make': 'Nikon', 'XMP:Rating': 5}
+    assert db.get_metadata_keys() == sorted(list(METADATA) + ['XMP:Rating'])
+
+
+def test_rows_stored_before_interning_decode(db):
+    db.conn.execute(
+        "INSERT INTO files (path, name, metadata) VALUES (?, ?, ?)",
+        ('/p/legacy.jpg', 'legacy.jpg', json.dumps({'File:Comment': 'old'}))
+    )
+    db.conn.commit()
+    assert db.get_file_by_path('/p/legacy.jpg')['metadata'] == {'File:Comment': 'old'}
+    assert db.get_metadata_keys() == ['File:Comment']
+
+
+def ts(*args):
+    return datetime(*args).timestamp()
+
+
+@pytest.fixture
+def timeline_db(db):
+    db.insert_files([
+        {'path': f'/p/{i}.jpg', 'name': f'{i}.jpg',
+         'file_type': 'image' if i % 3 else 'video',
+         'camera_make': 'Canon' if i % 2 else 'Nikon',
+         'date_taken': ts(2023 + i % 2, 1 + i % 12, 1 + i % 28),
+         'modified': ts(2024, 6, 1)}
+        for i in range(60)
+    ])
+    return db
+
+
+def test_timeline_buckets_and_drill_down(timeline_db):
+    db = timeline_db
+    assert db.get_timeline() == {'2023': 30, '2024': 30}
+    assert db.get_timeline('modified') == {'2024': 60}
+    months = db.get_timeline(granularity='month', period='2024', file_type='image')
+    assert sum(months.values()) == 20 and all(key.startswith('2024-') for key in months)
+    days = db.get_timeline(granularity='day', period='2024-02')
+    assert list(days) == ['2024-02-02', '2024-02-10', '2024-02-14', '2024-02-22', '2024-02-26']
+
+
+def test_timeline_with_filters_outside_the_rollup(timeline_db):
+    # Filters the rollup does not cover fall back to grouping files
+    by_camera = timeline_db.get_timeline(granularity='month', period='2024', camera_make='Canon')
+    assert sum(by_camera.values()) == 30
+
+
+def test_timeline_rollup_maintained_at_ingest(timeline_db, db_path):
+    db = timeline_db
+    db.delete_files([1, 2])
+    db.insert_file({'path': '/p/3.jpg', 'name': '3.jpg', 'file_type': 'image',
+                    'date_taken': ts(2020, 1, 1)})
+    db.conn.execute("UPDATE files SET date_taken = ? WHERE path = '/p/4.jpg'", (ts(2020, 2, 2),))
+    db.conn.commit()
+    expected = {'2020': 2, '2023': 28, '2024': 28}
+    assert db.get_timeline() == expected
+    db.rebuild_timeline()
+    assert db.get_timeline() == expected
+
+    # A rollup of local-time days from an older version is rebuilt as UTC slots
+    with db.conn:
+        db.conn.execute("DROP TABLE timeline")
+        db.conn.execute("CREATE TABLE timeline (field TEXT NOT NULL, day TEXT NOT NULL, "
+                        "file_type TEXT NOT NULL, count INTEGER NOT NULL, "
+                        "PRIMARY KEY (field, day, file_type)) WITHOUT ROWID")
+    reopened = DatabaseManager(db_path)
+    assert reopened.get_timeline() == expected
+    reopened.close()
+
+
+@pytest.fixture
+def set_tz(monkeypatch):
+    if not hasattr(time, 'tzset'):
+        pytest.skip("time.tzset is not available on this platform")
+
+    def set_tz(name):
+        monkeypatch.setenv('TZ', name)
+        time.tzset()
+
+    yield set_tz
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_timeline_independent_of_writer_time_zone(db, set_tz):
+    # A row added under one time zone and removed under another leaves no residue
+    set_tz('UTC')
+    db.insert_file({'path': '/p/late.jpg', 'name': 'late.jpg', 'file_type': 'image',
+                    'date_taken': ts(2024, 3, 31, 23, 30)})
+    assert db.get_timeline(granularity='day') == {'2024-03-31': 1}
+
+    set_tz('Asia/Kolkata')  # UTC+05:30
+    assert db.get_timeline(granularity='day') == {'2024-04-01': 1}
+    assert db.get_timeline(granularity='day', period='2024-04') == {'2024-04-01': 1}
+    db.delete_files_by_path(['/p/late.jpg'])
+    assert db.get_timeline() == {}
+    assert db.conn.execute("SELECT COUNT(*) FROM timeline WHERE count != 0").fetchone()[0] == 0
+
+
+@pytest.fixture
+def paging_db(db):
+    # Duplicate timestamps need a tie-breaker for stable pages
+    db.insert_files([
+        {'path': f'/p/{i}.jpg', 'name': f'{i}.jpg',
+         'file_type': 'image' if i % 4 else 'video', 'modified': float(i // 10)}
+        for i in range(250)
+    ])
+    return db
+
+
+def test_offset_pages_cover_all_rows_once(paging_db):
+    db = paging_db
+    assert db.count_files() == 250
+    ids = []
+    for offset in range(0, 250, 60):
+        ids.extend(record['id'] for record in db.search_files(limit=60, offset=offset))
+    assert len(set(ids)) == 250
+    assert ids == [record['id'] for record in db.search_files(limit=250)]
+
+
+def test_count_and_pages_with_filters(paging_db):
+    assert paging_db.count_files(file_type='video') == 63
+    videos = paging_db.search_files(file_type='video', limit=50, offset=50)
+    assert len(videos) == 13 and all(v['file_type'] == 'video' for v in videos)
+
+
+def test_keyset_pages_match_offset_pages(paging_db):
+    # Undated rows sort after every dated one
+    db = paging_db
+    db.insert_files([{'path': f'/p/undated_{i}.jpg', 'name': f'undated_{i}.jpg',
+                      'file_type': 'image', 'modified': None} for i in range(30)])
+    expected = [record['id'] for record in db.search_files(limit=300)]
+    assert len(expected) == 280
+
+    ids = []
+    page = db.search_files(limit=60)
+    while page:
+        ids.extend(record['id'] for record in page)
+        page = db.search_files(limit=60, after=db.page_key(page[-1]))
+    assert ids == expected
+
+    anchor = db.search_files(limit=100)[-1]
+    for offset in (0, 50, 140, 150, 175, 179, 200):
+        page = db.search_files(limit=20, offset=offset, after=db.page_key(anchor))
+        assert [record['id'] for record in page] == expected[100 + offset:120 + offset], offset
+
+
+def test_keyset_seek_uses_modified_index(db):
+    plan = " ".join(row[3] for row in db.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM files WHERE (modified, id) < (?, ?) "
+        "ORDER BY modified DESC, id DESC LIMIT 10", (1.0, 5)))
+    assert 'idx_modified' in plan and 'TEMP B-TREE' not in plan
+
+
+def test_text_query_matches_every_term(db):
+    db.insert_files([
+        {'path': '/p/invoice_2024.pdf', 'name': 'invoice_2024.pdf', 'author': 'ACME Corp'},
+        {'path': '/p/invoice_2023.pdf', 'name': 'invoice_2023.pdf', 'title': '100% paid'},
+        {'path': '/p/notes.txt', 'name': 'notes.txt', 'searchable_text': 'acme invoice draft'},
+    ])
+
+    def names(**filters):
+        return sorted(record['name'] for record in db.search_files(**filters))
+
+    assert names(text_query='INVOICE') == ['invoice_2023.pdf', 'invoice_2024.pdf', 'notes.txt']
+    assert names(text_query='invoice acme') == ['invoice_2024.pdf', 'notes.txt']
+    # LIKE wildcards in the query are matched literally
+    assert names(text_query='100%') == ['invoice_2023.pdf']
+    assert names(text_query='_2') == ['invoice_2023.pdf', 'invoice_2024.pdf']
+    assert db.count_files(text_query='invoice 2023') == 1
+
+
+def test_scan_error_backoff_and_attempt_limit(db):
+    db.record_scan_errors([('/share/locked.pdf', 'extraction', 'file is locked')], when=1000.0)
+    error = db.get_scan_errors()[0]
+    assert error['attempts'] == 1 and db.get_statistics()['scan_errors'] == 1
+
+    # Backoff doubles per attempt: due 60s after the 1st failure, 120s after the 2nd
+    assert not db.get_scan_errors(due=True, now=1059)
+    assert db.get_scan_errors(due=True, now=1060)
+    db.record_scan_errors([('/share/locked.pdf', 'extraction', 'still locked')], when=1060.0)
+    again = db.get_scan_errors()[0]
+    assert again['attempts'] == 2 and again['next_attempt'] == 1060 + 120
+    assert not db.get_scan_errors(due=True, now=1179)
+    assert not db.get_scan_errors(due=True, max_attempts=2, now=10 ** 6)
+
+
+def test_clear_scan_errors(db):
+    db.record_scan_errors([('/gone.pdf', 'normalization', 'x')])
+    assert db.clear_scan_errors(['/gone.pdf']) == 1
+    assert db.count_scan_errors() == 0
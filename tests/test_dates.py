@@ -0,0 +1,42 @@
+"""
+Tests for EXIF date parsing
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from metafinder.dates import parse_exif_date
+from metafinder.normalizer import MetadataNormalizer
+
+
+UTC_NOON = datetime(2024, 1, 15, 12, 0, tzinfo=timezone.utc).timestamp()
+
+
+@pytest.mark.parametrize('value, offset', [
+    ('2024:01:15 14:00:00+02:00', None),
+    ('2024-01-15T12:00:00Z', None),
+    ('2024:01:15 06:30:00', '-05:30'),
+])
+def test_offsets_applied(value, offset):
+    assert parse_exif_date(value, offset) == UTC_NOON
+
+
+def test_naive_dates_are_local_time():
+    assert parse_exif_date('2024:01:15 14:30:00') == datetime(2024, 1, 15, 14, 30).timestamp()
+    assert parse_exif_date('2024:01:15 14:30:00.25') == datetime(2024, 1, 15, 14, 30, 0, 250000).timestamp()
+
+
+@pytest.mark.parametrize('value', ['0000:00:00 00:00:00', '2024:13:45 00:00:00', 'not a date'])
+def test_invalid_dates(value):
+    assert parse_exif_date(value) is None
+
+
+def test_offset_time_original_applied_to_date_taken():
+    record = MetadataNormalizer().normalize_exiftool_output({
+        'SourceFile': '/test/travel.jpg',
+        'MIMEType': 'image/jpeg',
+        'DateTimeOriginal': '2024:01:15 21:00:00',
+        'OffsetTimeOriginal': '+09:00',
+    })
+    assert record['date_taken'] == UTC_NOON
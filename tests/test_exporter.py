@@ -0,0 +1,58 @@
+"""
+Tests for streaming CSV/JSON Lines export
+"""
+
+import csv
+import json
+
+import pytest
+
+from metafinder.database import DatabaseManager
+from metafinder.exporter import ResultExporter
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "export.db"))
+    for i in range(25):
+        db.insert_file({
+            'path': f'/test/photo_{i}.jpg',
+            'name': f'photo_{i}.jpg',
+            'extension': '.jpg',
+            'size': 1000 + i,
+            'file_type': 'image' if i % 5 else 'document',
+            'metadata': {'EXIF:Make': 'Canon', 'EXIF:ISO': i},
+        })
+    yield db
+    db.close()
+
+
+def test_csv_flattened_metadata(db, tmp_path):
+    csv_path = str(tmp_path / "out.csv")
+    stats = ResultExporter(db).export(csv_path, file_type='image', flatten_metadata=True)
+
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert stats['rows'] == 20 and len(rows) == 20
+    assert rows[0]['meta:EXIF:Make'] == 'Canon'
+
+
+def test_jsonl_selected_fields(db, tmp_path):
+    jsonl_path = str(tmp_path / "out.jsonl")
+    stats = ResultExporter(db).export(jsonl_path, fields=['path', 'size', 'metadata'])
+
+    with open(jsonl_path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert stats['format'] == 'jsonl' and len(records) == 25
+    assert set(records[0]) == {'path', 'size', 'metadata'}
+
+
+def test_csv_metadata_column_uses_tag_names(db, tmp_path):
+    db.insert_file({'path': '/test/bare.txt', 'name': 'bare.txt'})
+    csv_path = str(tmp_path / "meta.csv")
+    ResultExporter(db).export(csv_path, fields=['name', 'metadata'])
+
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        rows = {row['name']: row['metadata'] for row in csv.DictReader(f)}
+    assert json.loads(rows['photo_3.jpg']) == {'EXIF:Make': 'Canon', 'EXIF:ISO': 3}
+    assert json.loads(rows['bare.txt']) == {}
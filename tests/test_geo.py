@@ -0,0 +1,74 @@
+"""
+Tests for GPS parsing and spatial search filters
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from metafinder.database import DatabaseManager
+from metafinder.geo import extract_gps, distance_km
+
+
+PLACES = {
+    'eiffel.jpg': (48.8584, 2.2945),
+    'louvre.jpg': (48.8606, 2.3376),
+    'london.jpg': (51.5007, -0.1246),
+    'fiji.jpg': (-17.7134, 178.0650),
+    'samoa.jpg': (-13.7590, -172.1046),
+    'nogps.jpg': (None, None),
+}
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "gps.db"))
+    db.insert_files([{'path': f'/p/{name}', 'name': name, 'latitude': lat, 'longitude': lon}
+                     for name, (lat, lon) in PLACES.items()])
+    yield db
+    db.close()
+
+
+def names(db, **filters):
+    return sorted(record['name'] for record in db.search_files(**filters))
+
+
+def test_coordinate_parsing():
+    # Numeric (-n) tags with refs, print-converted DMS and position pairs
+    assert extract_gps({'EXIF:GPSLatitude': 33.8568, 'EXIF:GPSLatitudeRef': 'S',
+                        'EXIF:GPSLongitude': 151.2153, 'EXIF:GPSLongitudeRef': 'E'}) == (-33.8568, 151.2153)
+    lat, lon = extract_gps({'Composite:GPSPosition': '48 deg 51\' 30.00" N, 2 deg 17\' 40.00" E'})
+    assert lat == pytest.approx(48.858333, abs=1e-5) and lon == pytest.approx(2.294444, abs=1e-5)
+    assert extract_gps({'QuickTime:GPSCoordinates': '40.6892 -74.0445 10'}) == (40.6892, -74.0445)
+    assert extract_gps({'EXIF:GPSLatitude': 0, 'EXIF:GPSLongitude': 0}) == (None, None)
+    assert 340 < distance_km(48.8566, 2.3522, 51.5074, -0.1278) < 345
+
+
+def test_radius_and_bbox_filters(db):
+    assert names(db, near=(48.8566, 2.3522, 10)) == ['eiffel.jpg', 'louvre.jpg']
+    assert names(db, near=(48.8566, 2.3522, 400)) == ['eiffel.jpg', 'london.jpg', 'louvre.jpg']
+    assert names(db, bbox=(48.85, 2.30, 48.87, 2.34)) == ['louvre.jpg']
+    # Box across the antimeridian
+    assert names(db, bbox=(-20, 175, -10, -170)) == ['fiji.jpg', 'samoa.jpg']
+
+
+def test_reinsert_replaces_spatial_entry(db):
+    db.insert_file({'path': '/p/eiffel.jpg', 'name': 'eiffel.jpg'})
+    assert names(db, near=(48.8566, 2.3522, 10)) == ['louvre.jpg']
+    assert db.conn.execute("SELECT COUNT(*) FROM files_geo").fetchone()[0] == 4
+
+
+def test_old_databases_backfilled(legacy_db):
+    # Databases from before the GPS columns are backfilled from stored metadata
+    conn = sqlite3.connect(legacy_db)
+    conn.execute("INSERT INTO files (path, name, metadata) VALUES (?, ?, ?)",
+                 ('/p/old.jpg', 'old.jpg', json.dumps({'Composite:GPSPosition': '48.8584 2.2945',
+                                                      'EXIF:FNumber': 'f/2.8'})))
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(legacy_db)
+    assert [r['name'] for r in db.search_files(near=(48.8584, 2.2945, 1))] == ['old.jpg']
+    assert db.get_file_by_path('/p/old.jpg')['f_number'] == 2.8
+    db.close()
@@ -0,0 +1,99 @@
+"""
+Tests for importing pre-extracted ExifTool JSON dumps
+"""
+
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from metafinder.database import DatabaseManager
+from metafinder.importer import DumpImporter, iter_json_objects
+
+
+OBJECTS = [
+    {'SourceFile': f'/archive/img_{i}.jpg', 'MIMEType': 'image/jpeg', 'Make': 'Nikon'}
+    for i in range(50)
+]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "import.db"))
+    yield db
+    db.close()
+
+
+def test_parse_across_chunk_boundaries():
+    # Tiny chunks force objects to straddle refill boundaries
+    array = json.dumps(OBJECTS, indent=1)
+    assert list(iter_json_objects(io.StringIO(array), chunk_size=7)) == OBJECTS
+    jsonl = '\n'.join(json.dumps(obj) for obj in OBJECTS)
+    assert list(iter_json_objects(io.StringIO(jsonl), chunk_size=7)) == OBJECTS
+
+
+def test_import_dump(db, tmp_path):
+    dump_path = tmp_path / "dump.json"
+    dump_path.write_text(json.dumps(OBJECTS + [{'NoSource': True}]), encoding='utf-8')
+
+    stats = DumpImporter(db, batch_size=16).import_dump(str(dump_path))
+    assert stats['imported'] == 50 and stats['failed'] == 1
+    assert db.get_statistics()['total_files'] == 50
+
+
+def test_relative_paths_resolve_against_dump(db, tmp_path):
+    # Relative paths resolve against the dump's folder (or --base), not the cwd
+    (tmp_path / "site").mkdir()
+    dump_path = tmp_path / "site" / "relative.jsonl"
+    dump_path.write_text('\n'.join(json.dumps(obj) for obj in [
+        {'SourceFile': 'photos/a.jpg'}, {'SourceFile': 'C:/Archive/b.jpg'},
+    ]), encoding='utf-8')
+
+    DumpImporter(db).import_dump(str(dump_path))
+    assert db.get_file_by_path(str(tmp_path / "site" / "photos" / "a.jpg"))
+
+    DumpImporter(db).import_dump(str(dump_path), base_dir='/mnt/archive')
+    assert db.get_file_by_path(str(Path('/mnt/archive/photos/a.jpg').absolute()))
+    assert not db.get_file_by_path(str(tmp_path / "site" / "C:" / "Archive" / "b.jpg"))
+
+
+def test_nested_object_truncated_far_from_chunk_end():
+    # The decoder can fail well before the end of a cut-off nested value
+    nested = [{'SourceFile': '/a.jpg', 'Keywords': [['tag'] * 40] * 5, 'Regions': {'List': [{'Name': 'x' * 90}] * 3}}]
+    assert list(iter_json_objects(io.StringIO(json.dumps(nested)), chunk_size=100)) == nested
+
+
+class CountingReader(io.StringIO):
+    def __init__(self, text):
+        super().__init__(text)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+def test_large_object_refills_geometrically():
+    # A 100k object read 7 characters at a time must not take ~15k refills
+    big = {'SourceFile': '/a.jpg', 'Comment': 'x' * 100_000}
+    reader = CountingReader(json.dumps(big))
+    assert list(iter_json_objects(reader, chunk_size=7)) == [big]
+    assert reader.reads < 30
+
+
+def test_malformed_object_fails_at_offset():
+    broken = '{"SourceFile": "/a.jpg"}\n{"SourceFile": oops}\n' + '{"SourceFile": "/b.jpg"}\n' * 1000
+    with pytest.raises(ValueError, match='Malformed JSON at character 40'):
+        list(iter_json_objects(io.StringIO(broken), chunk_size=64))
+
+    # The object size limit stops it buffering the rest of the dump
+    reader = io.StringIO(broken)
+    with pytest.raises(ValueError, match='at character 40'):
+        list(iter_json_objects(reader, chunk_size=64, max_object_size=1000))
+    assert reader.tell() < 5000
+
+
+def test_oversized_object_rejected():
+    with pytest.raises(ValueError, match='larger than'):
+        list(iter_json_objects(io.StringIO('{"SourceFile": "' + 'x' * 5000), max_object_size=1000))
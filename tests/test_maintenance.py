@@ -0,0 +1,28 @@
+"""
+Tests for index maintenance (pruning vanished files)
+"""
+
+from metafinder.database import DatabaseManager
+from metafinder.maintenance import IndexMaintainer
+
+
+def test_prune_removes_vanished_files(tmp_path):
+    root = tmp_path / "files"
+    root.mkdir()
+    db = DatabaseManager(str(tmp_path / "prune.db"))
+
+    for i in range(10):
+        path = root / f"file_{i}.txt"
+        path.write_text("x")
+        db.insert_file({'path': str(path.absolute()), 'name': path.name})
+
+    # Sibling folder sharing the prefix must not be touched
+    db.insert_file({'path': str(root.absolute()) + "_other/gone.txt", 'name': 'gone.txt'})
+
+    for i in range(4):
+        (root / f"file_{i}.txt").unlink()
+
+    stats = IndexMaintainer(db).prune(str(root), optimize=True, vacuum=True)
+    assert stats['indexed'] == 10 and stats['deleted'] == 4
+    assert db.get_statistics()['total_files'] == 7
+    db.close()
@@ -0,0 +1,41 @@
+"""
+Tests for batch normalization of ExifTool output
+"""
+
+import os
+from pathlib import Path
+
+from metafinder.normalizer import MetadataNormalizer
+
+
+def test_batch_reuses_discovery_stats(tmp_path):
+    on_disk = tmp_path / "scanned.jpg"
+    on_disk.write_bytes(b'\xff\xd8\xff' + b'\0' * 97)
+    batch = [
+        {'SourceFile': str(on_disk), 'File:MIMEType': 'image/jpeg'},
+        {'SourceFile': '/remote/archive/clip.mov', 'File:FileSize': 2048,
+         'File:FileModifyDate': '2024:01:15 12:00:00+00:00'},
+        {'SourceFile': '/remote/archive/notes.txt', 'FileSize': '1.5 kB'},
+    ]
+    stat_results = {os.path.normpath(str(on_disk)): on_disk.stat()}
+
+    records, failures = MetadataNormalizer().normalize_batch(batch, stat_results)
+    assert not failures and len(records) == 3
+    assert records[0]['size'] == 100 and records[0]['modified'] == on_disk.stat().st_mtime
+    # Files without a discovery stat fall back to ExifTool's File tags
+    assert records[1]['size'] == 2048 and records[1]['modified'] == 1705320000.0
+    assert records[2]['size'] == 1536
+
+
+def test_source_paths_used_without_resolving(monkeypatch):
+    # Absolute SourceFile values are stored as given, without a cwd lookup
+    resolved = []
+    monkeypatch.setattr(Path, 'absolute', lambda self: resolved.append(self) or self)
+    records, failures = MetadataNormalizer().normalize_batch(
+        [{'SourceFile': '/remote/archive/clip.mov'}], {})
+    assert not failures and records[0]['path'] == os.path.normpath('/remote/archive/clip.mov')
+    assert resolved == []
+
+    record = MetadataNormalizer().normalize_exiftool_output({'SourceFile': 'relative/clip.mov'},
+                                                            use_filesystem=False)
+    assert record['path'] == os.path.abspath('relative/clip.mov')
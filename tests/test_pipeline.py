@@ -0,0 +1,163 @@
+"""
+Tests for the concurrent scan pipeline, using stand-in extractors
+"""
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from metafinder.database import DatabaseManager
+from metafinder.pipeline import ScanPipeline, ScanControl
+
+
+def extract_batch(paths):
+    # Mimic ExifTool: fail a whole batch, drop one unreadable file
+    if any(p.endswith('bad_batch.jpg') for p in paths):
+        raise RuntimeError("exiftool exited with status 1")
+    return [{'SourceFile': p, 'MIMEType': 'image/jpeg'}
+            for p in paths if not p.endswith('unreadable.jpg')]
+
+
+def test_scan_writes_batches_and_counts_failures(tmp_path):
+    files = [Path("/photos/unreadable.jpg")]
+    files += [Path(f"/photos/img_{i}.jpg") for i in range(95)]
+    files += [Path("/photos/bad_batch.jpg")]
+
+    db_path = str(tmp_path / "pipeline.db")
+    snapshots = []
+    stats = ScanPipeline(extract_batch, db_path, batch_size=10, queue_size=2,
+                         isolate_failures=False,
+                         progress_callback=snapshots.append).run(iter(files))
+
+    # One file dropped from the first batch, last batch of 7 fails as a whole
+    assert stats['total'] == 97 and stats['scanned'] == 89 and stats['failed'] == 8
+    assert ('/photos/unreadable.jpg', 'no metadata returned by ExifTool') in stats['errors']
+    assert snapshots and set(snapshots[-1]['queues']) == {'extract', 'normalize', 'write'}
+    assert snapshots[-1]['stage'] == 'done' and snapshots[-1]['processed'] == 97
+
+    db = DatabaseManager(db_path)
+    assert db.get_statistics()['total_files'] == 89
+    db.close()
+
+
+@pytest.mark.parametrize('db_path', [':memory:', 'file::memory:?cache=shared'])
+def test_in_memory_database_rejected(db_path):
+    # The writer's own connection would get a fresh, empty in-memory database
+    with pytest.raises(ValueError):
+        ScanPipeline(extract_batch, db_path)
+
+
+def test_failure_isolation_saves_good_files(tmp_path):
+    # Bisection saves the good files of batches ExifTool fails on
+    def fragile_extract(paths):
+        bad = [p for p in paths if 'corrupt' in p]
+        if bad:
+            raise RuntimeError(f"exiftool choked on {bad[0]}")
+        return [{'SourceFile': p, 'MIMEType': 'image/jpeg'} for p in paths]
+
+    files = [Path(f"/photos/img_{i}.jpg") for i in range(128)]
+    files[5] = Path("/photos/corrupt_a.jpg")
+    files[77] = Path("/photos/corrupt_b.jpg")
+
+    stats = ScanPipeline(fragile_extract, str(tmp_path / "isolate.db"), batch_size=64).run(files)
+
+    assert stats['scanned'] == 126 and stats['failed'] == 2
+    assert sorted(path for path, _ in stats['errors']) == ['/photos/corrupt_a.jpg',
+                                                          '/photos/corrupt_b.jpg']
+    # One bad file per 64-file batch: 2 halves per level, log2(64) = 6 levels
+    assert stats['pipeline']['isolation_calls'] == 2 * 2 * 6
+
+
+def test_cancel_keeps_finished_batches(tmp_path):
+    # Stop extracting, but write every batch already extracted
+    control = ScanControl()
+
+    def cancelling_extract(paths):
+        if any(p.endswith('img_35.jpg') for p in paths):
+            control.cancel()
+        return [{'SourceFile': p, 'MIMEType': 'image/jpeg'} for p in paths]
+
+    files = [Path(f"/photos/img_{i}.jpg") for i in range(200)]
+    db_path = str(tmp_path / "cancel.db")
+    stats = ScanPipeline(cancelling_extract, db_path, batch_size=10, queue_size=2,
+                         control=control).run(iter(files))
+
+    assert stats['cancelled'] and stats['scanned'] == 40
+    assert stats['scanned'] + stats['skipped'] == stats['total'] < 200
+    db = DatabaseManager(db_path)
+    assert db.get_statistics()['total_files'] == 40
+    db.close()
+
+
+def test_pause_holds_extraction_until_resumed(tmp_path):
+    control = ScanControl()
+    control.pause()
+    extracted = []
+
+    def recording_extract(paths):
+        extracted.extend(paths)
+        return [{'SourceFile': p, 'MIMEType': 'image/jpeg'} for p in paths]
+
+    files = [Path(f"/photos/img_{i}.jpg") for i in range(50)]
+    pipeline = ScanPipeline(recording_extract, str(tmp_path / "pause.db"),
+                            batch_size=10, control=control)
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(pipeline.run(files)))
+    thread.start()
+    time.sleep(0.3)
+    assert not extracted and pipeline.current_stage() == 'paused'
+
+    control.resume()
+    thread.join(10)
+    assert result['scanned'] == 50 and not result['cancelled']
+
+
+class LockedFiles:
+    """Extractor that fails every batch containing a locked file"""
+
+    def __init__(self, *locked):
+        self.locked = set(locked)
+
+    def __call__(self, paths):
+        if any(p in self.locked for p in paths):
+            raise RuntimeError("file is locked")
+        return [{'SourceFile': p, 'MIMEType': 'application/pdf'} for p in paths]
+
+
+DOCUMENTS = [Path(f"/share/doc_{i}.pdf") for i in range(7)] + [Path("/share/locked.pdf")]
+
+
+def test_failures_recorded_and_cleared_on_success(tmp_path):
+    db_path = str(tmp_path / "errors.db")
+    extract = LockedFiles('/share/locked.pdf')
+    stats = ScanPipeline(extract, db_path, batch_size=4).run(DOCUMENTS)
+    assert stats['failed'] == 1
+
+    db = DatabaseManager(db_path)
+    errors = db.get_scan_errors()
+    assert len(errors) == 1 and errors[0]['path'] == '/share/locked.pdf'
+    assert errors[0]['stage'] == 'extraction' and 'locked' in errors[0]['error']
+    assert errors[0]['attempts'] == 1
+
+    # The file unlocks: a successful scan clears its record
+    extract.locked.clear()
+    ScanPipeline(extract, db_path).run([Path("/share/locked.pdf")])
+    assert db.count_scan_errors() == 0
+    db.close()
+
+
+def test_aborted_scan_still_records_failures(tmp_path):
+    class BrokenHasher:
+        def hash_records(self, records):
+            raise RuntimeError("hasher crashed")
+
+    db_path = str(tmp_path / "errors.db")
+    with pytest.raises(RuntimeError, match='hasher crashed'):
+        ScanPipeline(LockedFiles('/share/locked.pdf'), db_path, image_hasher=BrokenHasher(),
+                     batch_size=4).run(DOCUMENTS[::-1])  # locked file in the first batch
+
+    db = DatabaseManager(db_path)
+    assert [error['path'] for error in db.get_scan_errors()] == ['/share/locked.pdf']
+    db.close()
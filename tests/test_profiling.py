@@ -0,0 +1,74 @@
+"""
+Tests for per-stage scan timings, per-extension costs and metrics files
+"""
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from metafinder.pipeline import ScanPipeline
+from metafinder.profiling import percentiles, format_profile, write_metrics
+
+
+FILES = [Path(f"/photos/img_{i}.{'cr2' if i % 4 == 0 else 'jpg'}") for i in range(80)]
+
+
+def extract_batch(paths):
+    # RAW files are the expensive ones
+    time.sleep(0.002 * sum(p.endswith('.cr2') for p in paths))
+    return [{'SourceFile': p, 'MIMEType': 'image/jpeg', 'File:FileSize': 1000}
+            for p in paths]
+
+
+def test_percentiles():
+    assert percentiles([]) == {'p50': None, 'p90': None, 'p99': None, 'max': None}
+    timings = percentiles([i / 100 for i in range(1, 101)])
+    assert timings['p50'] == 0.51 and timings['p99'] == 0.99 and timings['max'] == 1.0
+
+
+def test_profiled_scan(tmp_path):
+    stats = ScanPipeline(extract_batch, str(tmp_path / "profile.db"),
+                         batch_size=20, profile=True).run(FILES)
+    pipeline = stats['pipeline']
+
+    extraction = pipeline['stages']['extraction']
+    assert extraction['items'] == 80 and extraction['batches'] == 4
+    assert extraction['batch_seconds']['p50'] > 0
+    assert pipeline['stages']['writer']['bytes'] == 80 * 1000
+
+    raw, jpg = pipeline['extensions']['.cr2'], pipeline['extensions']['.jpg']
+    assert raw['files'] == 20 and jpg['files'] == 60
+    assert raw['extraction'] > jpg['extraction']
+    assert raw['normalization'] > 0 and jpg['normalization'] > 0
+
+    report = format_profile(stats)
+    assert 'extraction' in report and '.cr2' in report and 'Bottleneck' in report
+
+
+@pytest.fixture
+def plain_stats(tmp_path):
+    return ScanPipeline(extract_batch, str(tmp_path / "plain.db"), batch_size=20).run(FILES)
+
+
+def test_unprofiled_scan_keeps_stage_timings(plain_stats):
+    # File counts per extension, but no per-extension times
+    assert plain_stats['pipeline']['extensions']['.cr2'] == {'files': 20, 'bytes': 0}
+    assert plain_stats['pipeline']['stages']['normalization']['batches'] == 4
+
+
+def test_metrics_file(plain_stats, tmp_path):
+    path = write_metrics(plain_stats, str(tmp_path / "metrics" / "scan.json"), {'folder': '/photos'})
+    with open(path) as f:
+        metrics = json.load(f)
+    assert metrics['folder'] == '/photos' and metrics['error_count'] == 0
+    assert 'errors' not in metrics and metrics['bottleneck'] in plain_stats['pipeline']['stages']
+
+
+def test_metrics_file_without_pipeline_stats(tmp_path):
+    # Scans that never started the pipeline still produce a file
+    empty = {'scanned': 0, 'failed': 0, 'total': 0, 'success_rate': 0}
+    with open(write_metrics(empty, str(tmp_path / "empty.json"))) as f:
+        metrics = json.load(f)
+    assert metrics['total'] == 0 and metrics['bottleneck'] is None
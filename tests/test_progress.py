@@ -0,0 +1,44 @@
+"""
+Tests for rate-limited progress snapshots
+"""
+
+import time
+
+from metafinder.progress import ProgressReporter, format_progress
+
+
+def test_updates_coalesce_into_few_snapshots():
+    counters = {'discovered': 0, 'discovery_done': False, 'written': 0,
+                'failed': 0, 'bytes_written': 0, 'stage': 'discovering'}
+    snapshots = []
+    reporter = ProgressReporter(lambda: dict(counters), snapshots.append, interval=0.05)
+
+    # Ten thousand per-file updates must not turn into ten thousand callbacks
+    with reporter:
+        for i in range(10000):
+            counters['discovered'] += 1
+            counters['written'] += 1
+            counters['bytes_written'] += 1000
+            if i % 1000 == 0:
+                time.sleep(0.01)
+        counters.update(discovery_done=True, stage='done', failed=2, discovered=10002)
+
+    assert 1 <= len(snapshots) < 100
+    final = snapshots[-1]
+    assert final['processed'] == final['total'] == 10002 and final['eta'] == 0.0
+    assert final['percent'] == 100.0 and final['files_per_second'] > 0
+
+
+def test_rates_and_eta_from_two_samples():
+    reporter = ProgressReporter(lambda: {}, lambda progress: None, interval=0.25)
+    reporter.started = 0.0
+    reporter.build({'discovered': 1000, 'discovery_done': True, 'written': 100,
+                    'failed': 0, 'bytes_written': 10 ** 6}, 1.0)
+    progress = reporter.build({'discovered': 1000, 'discovery_done': True, 'written': 290,
+                               'failed': 10, 'bytes_written': 3 * 10 ** 6, 'stage': 'extracting'}, 2.0)
+    assert progress['files_per_second'] == 200 and progress['bytes_per_second'] == 2 * 10 ** 6
+    assert progress['eta'] == 3.5 and progress['percent'] == 30.0
+
+    line = format_progress(progress)
+    assert '300/1,000 (30.0%)' in line and '200 files/s' in line and 'ETA 0:04' in line
+    assert 'extracting' in line and '10 failed' in line
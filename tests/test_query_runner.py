@@ -0,0 +1,40 @@
+"""
+Tests for the cancellable, latest-wins background query worker
+"""
+
+import threading
+import time
+
+from metafinder.database import DatabaseManager
+from metafinder.query_runner import QueryRunner
+
+
+SLOW_SQL = ("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) "
+            "SELECT COUNT(*) FROM n WHERE i < 1e12")
+
+
+def test_new_query_aborts_the_one_in_flight(tmp_path):
+    db_path = str(tmp_path / "query.db")
+    db = DatabaseManager(db_path)
+    db.insert_files([{'path': f'/p/invoice_{i}.pdf', 'name': f'invoice_{i}.pdf'} for i in range(3)])
+    db.close()
+
+    delivered = []
+    done = threading.Event()
+
+    def on_result(generation, result):
+        delivered.append((generation, result))
+        done.set()
+
+    runner = QueryRunner(db_path, on_result)
+    try:
+        started = time.perf_counter()
+        runner.submit(lambda db: db.conn.execute(SLOW_SQL).fetchone()[0])
+        time.sleep(0.2)
+        latest = runner.submit(lambda db: db.count_files(text_query='invoice'))
+        assert done.wait(10), "Latest query never finished"
+        assert time.perf_counter() - started < 10
+        # Only the latest query is delivered
+        assert delivered == [(latest, 3)]
+    finally:
+        runner.close()
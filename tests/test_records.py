@@ -0,0 +1,36 @@
+"""
+Tests for the slotted FileRecord type
+"""
+
+import pytest
+
+from metafinder.records import FileRecord
+
+
+@pytest.fixture
+def record():
+    record = FileRecord(path='/a/b.jpg', name='b.jpg', size=10)
+    record.update({'author': 'Ann', 'custom_column': 42})
+    record['title'] = 'Sunset'
+    return record
+
+
+def test_mapping_interface(record):
+    assert record['name'] == 'b.jpg' and record.get('author') == 'Ann'
+    assert record['custom_column'] == 42 and 'custom_column' in record
+    assert dict(record)['title'] == 'Sunset'
+    assert not hasattr(record, '__dict__')
+    with pytest.raises(KeyError):
+        record['missing']
+
+
+def test_get_returns_stored_none(record):
+    assert record.get('camera_make', 'n/a') is None
+    record['camera_model'] = None
+    assert record.get('camera_model', 'n/a') is None
+    assert record.get('no_such_field', 'n/a') == 'n/a'
+
+
+def test_unhashable(record):
+    with pytest.raises(TypeError):
+        hash(record)
@@ -0,0 +1,79 @@
+"""
+Tests for MetadataScanner and the ExifTool toolchain probe (no ExifTool needed)
+"""
+
+import os
+import sys
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from metafinder.scanner import MetadataScanner, probe_exiftool, toolchain_cache
+
+
+def test_explicit_file_lists_are_stated(tmp_path):
+    # Explicit file lists (watch mode) carry a stat too, so the stored
+    # mtime is exact and rescans don't see the file as changed
+    on_disk = tmp_path / "scanned.jpg"
+    on_disk.write_bytes(b'\xff\xd8\xff')
+
+    scanner = MetadataScanner.__new__(MetadataScanner)
+    scanner._scan_file_list = lambda files: files
+    files = scanner.scan_files([str(on_disk), str(tmp_path / "vanished.jpg")])
+    assert files[0] == (on_disk, on_disk.stat()) and files[1] == tmp_path / "vanished.jpg"
+
+
+@pytest.fixture
+def fake_exiftool(tmp_path):
+    """Stand-in binary that counts how often it is run"""
+    runs = tmp_path / "runs"
+    binary = tmp_path / "exiftool"
+
+    def install(version):
+        binary.write_text(f"#!/bin/sh\necho run >> '{runs}'\necho {version}\n")
+        binary.chmod(0o755)
+        return binary
+
+    install.runs = lambda: runs.read_text().count('run')
+    return install
+
+
+def test_probe_result_cached(fake_exiftool, tmp_path):
+    binary = fake_exiftool('12.70')
+    cache = tmp_path / "toolchain.json"
+    assert probe_exiftool(str(binary), cache) == 12.70
+    assert probe_exiftool(str(binary), cache) == 12.70
+    assert fake_exiftool.runs() == 1
+
+
+def test_replaced_binary_probed_again(fake_exiftool, tmp_path):
+    cache = tmp_path / "toolchain.json"
+    probe_exiftool(str(fake_exiftool('12.70')), cache)
+
+    # A new mtime/size means a different binary
+    binary = fake_exiftool('13.01')
+    os.utime(binary, (1, 1))
+    assert probe_exiftool(str(binary), cache) == 13.01
+    assert fake_exiftool.runs() == 2
+    assert probe_exiftool(str(tmp_path / "missing"), cache) is None
+
+
+def test_cache_lives_next_to_the_database(fake_exiftool, tmp_path, monkeypatch):
+    assert toolchain_cache(tmp_path / "db" / "metafinder.db") == tmp_path / "db" / "toolchain.json"
+    assert toolchain_cache(':memory:') is None
+
+    # Without a cache path nothing is written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    assert probe_exiftool(str(fake_exiftool('12.70'))) == 12.70
+    assert not (tmp_path / "data").exists() and not (tmp_path / "toolchain.json").exists()
+
+
+def test_package_import_is_lazy():
+    # Importing the package must not load the scanner, PyExifTool or Pillow
+    src = str(Path(__file__).parent.parent / 'src')
+    code = ("import sys; sys.path.insert(0, %r); from metafinder import DatabaseManager; "
+            "print(sorted(m for m in ('metafinder.scanner', 'exiftool', 'PIL') if m in sys.modules))"
+            % src)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True).stdout
+    assert output.strip() == '[]'
@@ -0,0 +1,97 @@
+"""
+Tests for prioritized scan ordering
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from metafinder.normalizer import MetadataNormalizer
+from metafinder.pipeline import ScanPipeline
+from metafinder.scanner import MetadataScanner
+from metafinder.scheduler import ScanPriority, PriorityFeed
+
+
+ROOT = os.path.abspath('/library')
+
+
+def entry(path, mtime, size=100):
+    return Path(path), os.stat_result((0o100644, 0, 0, 1, 0, 0, size, mtime, mtime, mtime))
+
+
+ENTRIES = ([entry(os.path.join(ROOT, 'old', f'scan_{i}.pdf'), 1_000_000 + i) for i in range(20)] +
+           [entry(os.path.join(ROOT, 'new', f'photo_{i}.jpg'), 1_700_000_000 + i) for i in range(5)] +
+           [entry(os.path.join(ROOT, 'pinned', 'notes.txt'), 1)])
+
+NEWEST_PHOTOS = [f'photo_{i}.jpg' for i in range(4, -1, -1)]
+
+
+def names(feed):
+    return [path.name for path, _stat in feed]
+
+
+def test_newest_first():
+    ordered = names(PriorityFeed(iter(ENTRIES), ScanPriority()))
+    assert ordered[:5] == NEWEST_PHOTOS
+    assert ordered[-1] == 'notes.txt' and len(ordered) == len(ENTRIES)
+
+
+def test_pinned_beats_type_beats_recency():
+    priority = ScanPriority(pinned=[os.path.join(ROOT, 'pinned')], file_types=['document'])
+    ordered = names(PriorityFeed(iter(ENTRIES), priority))
+    assert ordered[0] == 'notes.txt' and ordered[1] == 'scan_19.pdf'
+    assert ordered[-5:] == NEWEST_PHOTOS
+    assert not priority.is_pinned(os.path.join(ROOT, 'pinned_other', 'x.txt'))
+
+
+def test_small_window_yields_every_file_once():
+    feed = PriorityFeed(iter(ENTRIES), ScanPriority(), window=3)
+    assert sorted(names(feed)) == sorted(path.name for path, _stat in ENTRIES)
+    assert feed.exhausted and feed.discovered == len(ENTRIES) and feed.backlog == 0
+
+
+def test_early_stop_ends_discovery_thread():
+    # Stopping early (scan cancelled) stops the discovery thread
+    feed = PriorityFeed(iter(ENTRIES * 100), ScanPriority(), window=10)
+    for _item in feed:
+        break
+    feed._thread.join(timeout=2)
+    assert not feed._thread.is_alive()
+
+
+def test_discovery_errors_propagate():
+    def broken_walk():
+        yield ENTRIES[0]
+        raise OSError("share went away")
+
+    with pytest.raises(OSError):
+        list(PriorityFeed(broken_walk(), ScanPriority()))
+
+
+def test_pinned_folder_under_relative_root(tmp_path, monkeypatch):
+    # Pinned discovery under a relative scan root yields each file once
+    for name in ('a/x.txt', 'b/y.txt'):
+        (tmp_path / 'root' / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / 'root' / name).write_text(name)
+    monkeypatch.chdir(tmp_path)
+
+    scanner = MetadataScanner.__new__(MetadataScanner)  # discovery only, no ExifTool
+    scanner.normalizer = MetadataNormalizer()
+    priority = ScanPriority(pinned=[os.path.join('root', 'a')])
+    found = [os.path.abspath(path) for path, _stat in
+             scanner._iter_pinned_first(Path('root'), True, None, None, priority)]
+    assert len(found) == len(set(found)) == 2
+    assert os.path.basename(found[0]) == 'x.txt'
+
+
+def test_pipeline_consumes_prioritized_feed(tmp_path):
+    extracted = []
+
+    def extract_batch(paths):
+        extracted.extend(Path(p).name for p in paths)
+        return [{'SourceFile': p} for p in paths]
+
+    stats = ScanPipeline(extract_batch, str(tmp_path / "priority.db"), batch_size=4,
+                         queue_size=1).run(PriorityFeed(iter(ENTRIES), ScanPriority()))
+    assert stats['scanned'] == len(ENTRIES) and extracted[0] == 'photo_4.jpg'
@@ -0,0 +1,65 @@
+"""
+Tests for perceptual hash storage and near-duplicate lookup
+"""
+
+import random
+import sqlite3
+
+import pytest
+
+from metafinder.database import DatabaseManager
+from metafinder.similarity import BKTree, SimilarityIndex, hamming, format_hash
+
+
+BASE = 0x0F0F_F0F0_1234_ABCD
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "similar.db"))
+    db.insert_files([
+        {'path': '/p/original.jpg', 'name': 'original.jpg', 'file_type': 'image',
+         'phash': format_hash(BASE)},
+        {'path': '/p/resized.jpg', 'name': 'resized.jpg', 'file_type': 'image',
+         'phash': format_hash(BASE ^ 0b11)},
+        {'path': '/p/other.jpg', 'name': 'other.jpg', 'file_type': 'image',
+         'phash': format_hash(~BASE & (2 ** 64 - 1))},
+        {'path': '/p/unhashed.jpg', 'name': 'unhashed.jpg', 'file_type': 'image'},
+    ])
+    yield db
+    db.close()
+
+
+def test_bktree_matches_linear_scan():
+    rng = random.Random(7)
+    hashes = [rng.getrandbits(64) for _ in range(2000)]
+    tree = BKTree()
+    for i, value in enumerate(hashes):
+        tree.add(value, i)
+
+    query = hashes[0] ^ 0b1011  # three bits away from item 0
+    expected = sorted((hamming(query, value), i) for i, value in enumerate(hashes)
+                      if hamming(query, value) <= 12)
+    assert sorted(tree.search(query, 12)) == expected and expected[0] == (3, 0)
+
+
+def test_old_databases_get_phash_column(legacy_db):
+    DatabaseManager(legacy_db).close()
+    conn = sqlite3.connect(legacy_db)
+    assert 'phash' in [row[1] for row in conn.execute("PRAGMA table_info(files)")]
+    conn.close()
+
+
+def test_near_duplicate_lookup(db):
+    index = SimilarityIndex(db)
+    assert index.load() == 3
+    results = index.find_similar_to_file('/p/original.jpg', max_distance=8)
+    assert [(d, r['name']) for d, r in results] == [(2, 'resized.jpg')]
+
+
+def test_one_off_query_scans_linearly(db):
+    loaded = SimilarityIndex(db)
+    loaded.load()
+    single = SimilarityIndex(db)
+    assert single.find_similar(BASE, max_distance=64) == loaded.find_similar(BASE, max_distance=64)
+    assert single.tree is None
@@ -0,0 +1,84 @@
+"""
+Tests for the thumbnail cache and background thumbnail service
+"""
+
+import struct
+import threading
+
+import pytest
+
+from metafinder.thumbnails import ThumbnailCache, ThumbnailService, exif_thumbnail
+
+
+def test_embedded_exif_thumbnail_located():
+    # EXIF block: empty IFD0 -> IFD1 with the thumbnail offset/length tags
+    preview = b'\xff\xd8 fake jpeg \xff\xd9'
+    ifd1 = struct.pack('<H', 2) + struct.pack('<HHII', 0x0201, 4, 1, 44) + \
+        struct.pack('<HHII', 0x0202, 4, 1, len(preview)) + struct.pack('<I', 0)
+    tiff = b'II*\x00' + struct.pack('<I', 8) + struct.pack('<HI', 0, 14) + ifd1
+    assert len(tiff) == 44
+    assert exif_thumbnail(b'Exif\x00\x00' + tiff + preview) == preview
+    assert exif_thumbnail(b'II*\x00' + struct.pack('<I', 8) + struct.pack('<HI', 0, 0)) is None
+    assert exif_thumbnail(b'garbage') is None
+
+
+def test_disk_cache_lru_cap(tmp_path):
+    cache = ThumbnailCache(str(tmp_path / "cache"), max_bytes=2500)
+    keys = [ThumbnailCache.make_key(f'/p/{i}.jpg', 1.0, 100) for i in range(4)]
+    # Keyed by path, mtime and size
+    assert keys[0] != ThumbnailCache.make_key('/p/0.jpg', 2.0, 100)
+
+    for key in keys[:2]:
+        cache.put(key, b'x' * 1000)
+    assert cache.get(keys[0]) is not None  # 0 is now more recent than 1
+    cache.put(keys[2], b'x' * 1000)
+    assert cache.get(keys[1]) is None and cache.get(keys[0]) is not None
+    assert cache.total_bytes == 2000 and len(cache) == 2
+
+    # LRU order survives a restart
+    reopened = ThumbnailCache(str(tmp_path / "cache"), max_bytes=2500)
+    assert len(reopened) == 2 and reopened.total_bytes == 2000
+
+
+@pytest.fixture
+def renders():
+    return []
+
+
+@pytest.fixture
+def service(tmp_path, renders):
+    def render(path, size):
+        renders.append(path)
+        if 'broken' in path:
+            raise OSError("cannot identify image file")
+        return path.encode() * 10
+
+    service = ThumbnailService(str(tmp_path / "service"), workers=2, render=render)
+    yield service
+    service.close()
+
+
+def test_service_renders_caches_and_shares_requests(service, renders):
+    results = {}
+    done = threading.Event()
+
+    def callback(path, thumbnail_file):
+        results.setdefault(path, []).append(thumbnail_file)
+        if sum(len(v) for v in results.values()) == 4:
+            done.set()
+
+    service.request('/p/a.jpg', 1.0, 10, callback)
+    service.request('/p/a.jpg', 1.0, 10, callback)
+    service.request('/p/b.jpg', 1.0, 10, callback)
+    service.request('/p/broken.jpg', 1.0, 10, callback)
+    assert done.wait(10)
+    assert results['/p/a.jpg'][0].read_bytes() == b'/p/a.jpg' * 10
+    assert results['/p/broken.jpg'] == [None]
+    assert renders.count('/p/a.jpg') == 1
+
+    # Cache hits and known failures skip rendering
+    renders.clear()
+    hit = threading.Event()
+    service.request('/p/b.jpg', 1.0, 10, lambda path, f: hit.set())
+    service.request('/p/broken.jpg', 1.0, 10, lambda path, f: None)
+    assert hit.wait(10) and renders == []
@@ -0,0 +1,68 @@
+"""
+Tests for typed value parsing and numeric range filters
+"""
+
+import pytest
+
+from metafinder.database import DatabaseManager
+from metafinder.normalizer import MetadataNormalizer
+from metafinder.values import (parse_exposure_time, parse_number, parse_duration,
+                               parse_bitrate, extract_typed_values)
+
+
+def test_value_converters():
+    assert parse_exposure_time('1/250') == 0.004 and parse_exposure_time(0.5) == 0.5
+    assert parse_number('f/5.6') == 5.6
+    assert parse_number('24.0 mm (35 mm equivalent: 38.0 mm)') == 24.0
+    assert parse_duration('0:03:45 (approx)') == 225 and parse_duration('3:45') == 225
+    assert parse_duration('12.5 s (approx)') == 12.5
+    assert parse_bitrate('128 kbps') == 128000
+    values = extract_typed_values({'Composite:ImageSize': '3840x2160', 'PDF:PageCount': 52})
+    assert (values['width'], values['height'], values['page_count']) == (3840, 2160, 52)
+
+
+@pytest.fixture
+def clip():
+    return MetadataNormalizer().normalize_exiftool_output({
+        'SourceFile': '/media/clip.mp4',
+        'File:MIMEType': 'video/mp4',
+        'QuickTime:ImageWidth': 3840,
+        'QuickTime:ImageHeight': 2160,
+        'QuickTime:Duration': '0:12:05',
+    }, use_filesystem=False)
+
+
+@pytest.fixture
+def db(tmp_path, clip):
+    db = DatabaseManager(str(tmp_path / "typed.db"))
+    db.insert_files([
+        clip,
+        {'path': '/media/short.mp4', 'name': 'short.mp4', 'width': 3840, 'height': 2160,
+         'duration_s': 30.0},
+        {'path': '/music/a.mp3', 'name': 'a.mp3', 'bpm': 150.0},
+        {'path': '/music/b.mp3', 'name': 'b.mp3', 'bpm': 95.0},
+    ])
+    yield db
+    db.close()
+
+
+def test_normalizer_fills_typed_fields(clip):
+    assert (clip['width'], clip['height'], clip['duration_s']) == (3840, 2160, 725)
+
+
+def test_range_filters(db):
+    long_4k = db.search_files(ranges={'width': (3840, None), 'duration_s': (600, None)})
+    assert [r['name'] for r in long_4k] == ['clip.mp4']
+    assert [r['name'] for r in db.search_files(ranges={'bpm': (140, 160)})] == ['a.mp3']
+
+
+def test_range_filters_use_indexes(db):
+    where, params = db._build_filter_clause(ranges={'bpm': (140, 160)})
+    plan = ' '.join(row[3] for row in db.conn.execute(
+        f"EXPLAIN QUERY PLAN SELECT id FROM files WHERE {where}", params))
+    assert 'idx_bpm' in plan
+
+
+def test_unknown_range_column_rejected(db):
+    with pytest.raises(ValueError):
+        db.search_files(ranges={'size; DROP TABLE files': (1, None)})
@@ -0,0 +1,88 @@
+"""
+Tests for the folder watcher (event coalescing and incremental indexing)
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from metafinder.database import DatabaseManager
+from metafinder.watcher import FolderWatcher, DELETED_DIR, CHANGED, RESYNC
+
+
+class RecordingScanner:
+    """Stands in for MetadataScanner so no ExifTool is needed"""
+
+    def __init__(self, db):
+        self.db = db
+        self.batches = []
+
+    def scan_files(self, paths):
+        self.batches.append(sorted(paths))
+        self.db.insert_files([{'path': p, 'name': Path(p).name} for p in paths])
+        return {'scanned': len(paths), 'failed': 0}
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "watch.db"))
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "watched"
+    (root / "sub").mkdir(parents=True)
+    return root
+
+
+@pytest.mark.parametrize('use_inotify', [None, False], ids=['auto', 'polling'])
+def test_events_coalesce_into_one_batch(db, root, use_inotify):
+    scanner = RecordingScanner(db)
+    watcher = FolderWatcher(scanner, str(root), debounce=0.2,
+                            poll_interval=0.1, use_inotify=use_inotify)
+    try:
+        for i in range(5):
+            path = root / "sub" / f"file_{i}.txt"
+            path.write_text("v1")
+            path.write_text("v2")
+
+        deadline = time.monotonic() + 5
+        while not scanner.batches and time.monotonic() < deadline:
+            for kind, path in watcher.backend.poll(timeout=0.1):
+                watcher._queue_event(kind, path)
+            if watcher._flush_due():
+                watcher.flush()
+    finally:
+        watcher.backend.close()
+
+    # Ten writes to five files coalesce into one batch of five
+    assert len(scanner.batches) == 1 and len(scanner.batches[0]) == 5
+
+
+def test_deleted_dir_removes_rows_below_it(db, root):
+    watcher = FolderWatcher(RecordingScanner(db), str(root), use_inotify=False)
+    sub = (root / "sub").absolute()
+    db.insert_files([{'path': str(sub / f"file_{i}.txt"), 'name': f"file_{i}.txt"} for i in range(5)])
+
+    watcher._queue_event(DELETED_DIR, str(sub))
+    stats = watcher.flush()
+    watcher.backend.close()
+    assert stats['deleted'] == 5
+
+
+def test_resync_prunes_deletions_without_events(db, root):
+    # After lost events (inotify overflow) a resync prunes vanished files
+    watcher = FolderWatcher(RecordingScanner(db), str(root), use_inotify=False)
+    lost = root / "lost.txt"
+    lost.write_text("x")
+    watcher._queue_event(CHANGED, str(lost.absolute()))
+    watcher.flush()
+
+    lost.unlink()
+    watcher._queue_event(RESYNC, watcher.root)
+    stats = watcher.flush()
+    watcher.backend.close()
+    assert stats['deleted'] == 1 and db.get_file_by_path(str(lost.absolute())) is None